@@ -0,0 +1,212 @@
+"""
+批量模式：一份思绪对多份 JD 并发定制，每份 JD 产出 HTML/PDF/JSON，外加汇总 manifest。
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass
+
+from .context import ResumeBuild, StatusCallback
+from .orchestrator import build_resume_batch_async
+from .resume_prompts import ResumePrompts
+from .utils import load_text, save_build_async, save_text
+
+JD_SUFFIXES = (".txt", ".md")
+MANIFEST_NAME = "manifest.json"
+CHECKPOINT_DIR = "checkpoints"
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    jd_text: str
+    template_name: str = "swiss_single_column.html"
+
+
+@dataclass
+class BatchResult:
+    job_id: str
+    ok: bool
+    template_name: str
+    elapsed_s: float  # 自批次开始到该任务完成
+    match_score: int | None = None
+    html_path: str | None = None
+    pdf_path: str | None = None
+    json_path: str | None = None
+    error: str | None = None
+    # LLM token 用量（各步骤合计；cached_tokens 为命中服务端前缀缓存的输入）
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    # LLM 调用韧性：重试次数、发起的对冲请求数
+    retries: int = 0
+    hedges: int = 0
+
+
+def _safe_id(raw: str) -> str:
+    return re.sub(r"[^\w.-]+", "_", raw).strip("_") or "job"
+
+
+def load_jobs_from_dir(jd_dir: str, template_name: str = "swiss_single_column.html") -> list[BatchJob]:
+    """目录下每个 .txt/.md 文件为一份 JD，文件名（去后缀）即任务 id。"""
+    if not os.path.isdir(jd_dir):
+        raise FileNotFoundError(f"JD 目录不存在: {jd_dir}")
+    jobs = []
+    for name in sorted(os.listdir(jd_dir)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() in JD_SUFFIXES:
+            jobs.append(
+                BatchJob(_safe_id(stem), load_text(os.path.join(jd_dir, name)), template_name)
+            )
+    return jobs
+
+
+def load_jobs_from_file(jobs_file: str, template_name: str = "swiss_single_column.html") -> list[BatchJob]:
+    """JSONL：每行 {"id"?, "jd" | "jd_path", "template"?}；jd_path 相对该文件所在目录。"""
+    base_dir = os.path.dirname(os.path.abspath(jobs_file))
+    jobs = []
+    for lineno, line in enumerate(load_text(jobs_file).splitlines(), start=1):
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        if "jd" in item:
+            jd_text = item["jd"]
+        elif "jd_path" in item:
+            jd_text = load_text(os.path.join(base_dir, item["jd_path"]))
+        else:
+            raise ValueError(f"{jobs_file}:{lineno} 缺少 jd 或 jd_path 字段")
+        job_id = item.get("id") or os.path.splitext(os.path.basename(item.get("jd_path", "")))[0]
+        jobs.append(
+            BatchJob(
+                _safe_id(str(job_id or f"job{lineno}")),
+                jd_text,
+                item.get("template", template_name),
+            )
+        )
+    return jobs
+
+
+def load_jobs_from_index(
+    index_path: str,
+    raw_thoughts: str,
+    top_k: int = 20,
+    template_name: str = "swiss_single_column.html",
+) -> list[BatchJob]:
+    """从 JD 语料索引（jd_search）中按 BM25 取与思绪最相关的 top_k 份，按相关度排序。"""
+    from .jd_search import JDIndex
+
+    if not os.path.exists(index_path):
+        raise FileNotFoundError(f"JD 索引不存在: {index_path}（先运行 resume-jd index <目录|JSONL>）")
+    hits = JDIndex.load(index_path).search(raw_thoughts, top_k)
+    return [BatchJob(_safe_id(hit.doc_id), hit.read(), template_name) for hit in hits]
+
+
+def _dedupe_ids(jobs: list[BatchJob]) -> None:
+    seen: dict[str, int] = {}
+    for job in jobs:
+        n = seen.get(job.job_id, 0)
+        seen[job.job_id] = n + 1
+        if n:
+            job.job_id = f"{job.job_id}_{n + 1}"
+
+
+async def run_batch_async(
+    jobs: list[BatchJob],
+    raw_thoughts: str,
+    model_name: str,
+    prompts: ResumePrompts,
+    output_dir: str,
+    *,
+    max_concurrency: int = 4,
+    export_pdf: bool = True,
+    status: StatusCallback | None = None,
+    deadline_s: float | None = None,
+    resume: bool = False,
+    n_drafts: int = 1,
+    draft_temperatures: list[float] | None = None,
+) -> list[BatchResult]:
+    """并发跑完所有任务，产物边完成边落盘，最后写 manifest.json。
+
+    各任务每个阶段的检查点写在 output_dir/checkpoints/<id>.ckpt.json.gz；resume 时从中断处继续。
+    """
+    _dedupe_ids(jobs)
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    results: list[BatchResult | None] = [None] * len(jobs)
+
+    async def _write(index: int, outcome: ResumeBuild | BaseException) -> None:
+        job = jobs[index]
+        elapsed = round(time.perf_counter() - started, 2)
+        if isinstance(outcome, BaseException):
+            results[index] = BatchResult(
+                job_id=job.job_id,
+                ok=False,
+                template_name=job.template_name,
+                elapsed_s=elapsed,
+                error=str(outcome),
+            )
+            return
+        res = BatchResult(
+            job_id=job.job_id,
+            ok=True,
+            template_name=outcome.template_name,
+            elapsed_s=elapsed,
+            match_score=outcome.resume.match_score,
+            input_tokens=sum(t.input_tokens for t in outcome.tokens.values()),
+            cached_tokens=sum(t.cached_tokens for t in outcome.tokens.values()),
+            output_tokens=sum(t.output_tokens for t in outcome.tokens.values()),
+            retries=outcome.llm_stats.retries,
+            hedges=outcome.llm_stats.hedges,
+        )
+        try:
+            paths = await save_build_async(
+                outcome,
+                os.path.join(output_dir, f"{job.job_id}.html"),
+                write_pdf=export_pdf,
+            )
+            res.html_path, res.pdf_path, res.json_path = (
+                paths["html"],
+                paths.get("pdf"),
+                paths.get("json"),
+            )
+        except Exception as e:
+            res.ok, res.error = False, f"导出失败: {e}"
+        results[index] = res
+
+    await build_resume_batch_async(
+        [(job.jd_text, job.template_name) for job in jobs],
+        raw_thoughts,
+        model_name,
+        prompts,
+        status,
+        max_concurrency=max_concurrency,
+        export_pdf=export_pdf,
+        on_done=_write,
+        deadline_s=deadline_s,
+        checkpoints=[
+            os.path.join(output_dir, CHECKPOINT_DIR, f"{job.job_id}.ckpt.json.gz") for job in jobs
+        ],
+        resume=resume,
+        n_drafts=n_drafts,
+        draft_temperatures=draft_temperatures,
+    )
+    done = [r for r in results if r is not None]
+    manifest = {
+        "model": model_name,
+        "total": len(done),
+        "succeeded": sum(r.ok for r in done),
+        "failed": sum(not r.ok for r in done),
+        "seconds": round(time.perf_counter() - started, 2),
+        "max_concurrency": max_concurrency,
+        "input_tokens": sum(r.input_tokens for r in done),
+        "cached_tokens": sum(r.cached_tokens for r in done),
+        "output_tokens": sum(r.output_tokens for r in done),
+        "retries": sum(r.retries for r in done),
+        "hedges": sum(r.hedges for r in done),
+        "jobs": [asdict(r) for r in done],
+    }
+    save_text(json.dumps(manifest, ensure_ascii=False, indent=2), os.path.join(output_dir, MANIFEST_NAME))
+    return done
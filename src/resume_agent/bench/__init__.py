@@ -0,0 +1 @@
+"""性能基准脚本（python -m resume_agent.bench.<name>）。"""
@@ -0,0 +1,324 @@
+"""
+本地 OpenAI 兼容替身服务（标准库 asyncio，HTTP 层见 httpd）：POST */chat/completions 按请求里的输出工具 schema
+返回预置的 Resume / ResumeCritique JSON（tool call），支持 SSE 流式；可配置首包延迟、输出 token 速率
+与抖动，并按块模拟服务端前缀缓存（usage.prompt_tokens_details.cached_tokens）。
+
+    python -m resume_agent.bench.fake_llm --port 8700 --latency 0.3 --tokens-per-s 300
+    # 另一终端：OPENAI_BASE_URL=http://127.0.0.1:8700/v1 resume-run --no-cache
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..httpd import HTTPError, Request, serve_connection, start_chunked, write_chunk, write_json
+from ..models import PatchOp, PatchOperation, ResumeCritique, ResumePatch
+from .samples import synthetic_resume
+
+# 粗略换算：中英混排 JSON 约 2 字符 / token
+CHARS_PER_TOKEN = 2
+# 前缀缓存按块命中（DeepSeek 为 64 token 一块）
+_PREFIX_BLOCK_CHARS = 128
+# 该种子的合成简历在三套模板上估算均为 PERFECT（临界，仍会走 Chromium 实测）
+_CANNED_RESUME_SEED = 46
+_STREAM_CHUNK_TOKENS = 8
+
+
+def default_resume() -> dict[str, Any]:
+    return synthetic_resume(random.Random(_CANNED_RESUME_SEED)).model_dump()
+
+
+def default_critique(needs_revision: bool = False) -> dict[str, Any]:
+    return ResumeCritique(
+        critique="量化数据充分；第二个项目可补充并发规模。",
+        missing_keywords=["Kubernetes"] if needs_revision else [],
+        score=78 if needs_revision else 90,
+        needs_revision=needs_revision,
+    ).model_dump()
+
+
+def default_patch() -> dict[str, Any]:
+    """改写首个项目的第一条 bullet 并收紧总结（对 default_resume 可直接应用）。"""
+    return ResumePatch(
+        operations=[
+            PatchOperation(
+                op=PatchOp.REPLACE_BULLET,
+                project_index=0,
+                bullet_index=0,
+                text="主导核心链路重构，接口 p99 延迟下降 40%，支撑日均千万级请求。",
+            ),
+            PatchOperation(op=PatchOp.EDIT_SUMMARY, text="后端工程师，擅长高并发服务与性能优化。"),
+        ],
+        match_score=86,
+    ).model_dump()
+
+
+@dataclass
+class FakeLLMConfig:
+    latency_s: float = 0.3  # 首包延迟（排队 + prefill）
+    tokens_per_s: float = 300.0  # 输出速率；<=0 表示瞬时
+    jitter: float = 0.0  # 延迟与速率的随机扰动比例，如 0.2 即 ±20%
+    error_rate: float = 0.0  # 以此概率返回 503（测重试）
+    slow_rate: float = 0.0  # 以此概率整体放慢 slow_factor 倍（制造长尾，测对冲）
+    slow_factor: float = 5.0
+    seed: int = 0
+    resume: dict[str, Any] = field(default_factory=default_resume)
+    critique: dict[str, Any] = field(default_factory=default_critique)
+    patch: dict[str, Any] = field(default_factory=default_patch)
+
+
+def _pick_tool(tools: list[dict[str, Any]]) -> dict[str, Any]:
+    """优先 pydantic-ai 的输出工具 final_result*，否则取第一个工具。"""
+    for tool in tools:
+        if tool["function"]["name"].startswith("final_result"):
+            return tool["function"]
+    return tools[0]["function"]
+
+
+class _PrefixCache:
+    """记录见过的「消息前缀块」哈希；命中长度即 cached_tokens。"""
+
+    def __init__(self) -> None:
+        self._seen: set[str] = set()
+        self._lock = threading.Lock()
+
+    def hit_chars(self, text: str) -> int:
+        h = hashlib.sha256()
+        hit, matching = 0, True
+        with self._lock:
+            for end in range(_PREFIX_BLOCK_CHARS, len(text) + 1, _PREFIX_BLOCK_CHARS):
+                h.update(text[end - _PREFIX_BLOCK_CHARS : end].encode("utf-8"))
+                digest = h.hexdigest()
+                if matching and digest in self._seen:
+                    hit = end
+                else:
+                    matching = False
+                    self._seen.add(digest)
+        return hit
+
+
+class FakeLLMServer:
+    """start() 在后台线程起独立事件循环，与被测流水线互不抢占；base_url 指向 /v1。"""
+
+    def __init__(self, config: FakeLLMConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or FakeLLMConfig()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        # 建立的 TCP 连接数：远小于 requests 说明客户端 keep-alive 复用生效
+        self.connections = 0
+        self._ids = itertools.count(1)
+        self._rng = random.Random(self.config.seed)
+        self._prefix = _PrefixCache()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v1"
+
+    # ---------- 生命周期 ----------
+    async def serve(self) -> asyncio.AbstractServer:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    def start(self) -> "FakeLLMServer":
+        ready = threading.Event()
+
+        def _run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.serve())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=_run, name="fake-llm", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None or self._server is None:
+            return
+
+        async def _close() -> None:
+            self._server.close()
+            # 客户端 keep-alive 连接仍挂着读请求：关掉连接让处理协程自然退出
+            for writer in list(self._writers):
+                writer.close()
+            # 被客户端放弃（如对冲落败）的请求仍在模拟生成，直接取消
+            for task in list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop = self._server = self._thread = None
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    # ---------- HTTP ----------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            await serve_connection(reader, writer, self._route)
+        except asyncio.CancelledError:
+            # 关闭时取消；正常结束以免 asyncio streams 回调把取消当作未处理异常记录
+            writer.close()
+        finally:
+            self._handlers.discard(task)
+            self._writers.discard(writer)
+
+    async def _route(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        if request.method != "POST" or not request.path.rstrip("/").endswith("/chat/completions"):
+            raise HTTPError(404, f"unsupported: {request.method} {request.path}")
+        await self._chat(request.json(), writer)
+
+    def _jittered(self, value: float) -> float:
+        j = self.config.jitter
+        return value * (1 + self._rng.uniform(-j, j)) if j else value
+
+    def _output_for(self, request: dict[str, Any]) -> tuple[dict[str, Any] | None, str]:
+        """(所选工具, 输出文本)：按输出工具 schema 判断要 Resume、ResumeCritique 还是 ResumePatch。"""
+        tools = request.get("tools") or []
+        if not tools:
+            return None, "ok"
+        tool = _pick_tool(tools)
+        props = (tool.get("parameters") or {}).get("properties", {})
+        if "critique" in props:
+            payload = self.config.critique
+        elif "operations" in props:
+            payload = self.config.patch
+        else:
+            payload = self.config.resume
+        return tool, json.dumps(payload, ensure_ascii=False)
+
+    def _usage(self, request: dict[str, Any], output: str) -> dict[str, Any]:
+        prompt = "".join(
+            m["content"] if isinstance(m.get("content"), str) else json.dumps(m.get("content"), ensure_ascii=False)
+            for m in request.get("messages", [])
+        )
+        prompt_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        completion_tokens = max(1, len(output) // CHARS_PER_TOKEN)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": self._prefix.hit_chars(prompt) // CHARS_PER_TOKEN},
+        }
+
+    async def _chat(self, request: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        self.requests += 1
+        call_id = f"call_{next(self._ids)}"
+        tool, output = self._output_for(request)
+        usage = self._usage(request, output)
+        if self._rng.random() < self.config.error_rate:
+            raise HTTPError(503, "fake overload")
+        slow = self.config.slow_factor if self._rng.random() < self.config.slow_rate else 1.0
+        rate = self._jittered(self.config.tokens_per_s)
+        seconds_per_token = slow / rate if rate > 0 else 0.0
+        await asyncio.sleep(max(0.0, self._jittered(self.config.latency_s) * slow))
+        base = {"id": f"chatcmpl-{call_id}", "created": int(time.time()), "model": request.get("model", "fake")}
+        if not request.get("stream"):
+            await asyncio.sleep(usage["completion_tokens"] * seconds_per_token)
+            message: dict[str, Any] = {"role": "assistant", "content": output if tool is None else None}
+            if tool is not None:
+                message["tool_calls"] = [
+                    {"id": call_id, "type": "function", "function": {"name": tool["name"], "arguments": output}}
+                ]
+            write_json(
+                writer,
+                200,
+                {
+                    **base,
+                    "object": "chat.completion",
+                    "choices": [
+                        {"index": 0, "message": message, "finish_reason": "stop" if tool is None else "tool_calls"}
+                    ],
+                    "usage": usage,
+                },
+            )
+            return
+
+        start_chunked(writer, 200, "text/event-stream")
+
+        async def _event(choices: list[dict[str, Any]], **extra: Any) -> None:
+            data = json.dumps({**base, "object": "chat.completion.chunk", "choices": choices, **extra}, ensure_ascii=False)
+            write_chunk(writer, f"data: {data}\n\n".encode("utf-8"))
+            await writer.drain()
+
+        step = _STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+        for i in range(0, len(output), step):
+            piece = output[i : i + step]
+            if tool is None:
+                delta: dict[str, Any] = {"content": piece}
+            else:
+                call: dict[str, Any] = {"index": 0, "function": {"arguments": piece}}
+                if i == 0:
+                    call.update(id=call_id, type="function")
+                    call["function"]["name"] = tool["name"]
+                delta = {"tool_calls": [call]}
+            if i == 0:
+                delta["role"] = "assistant"
+            await _event([{"index": 0, "delta": delta, "finish_reason": None}])
+            await asyncio.sleep(_STREAM_CHUNK_TOKENS * seconds_per_token)
+        await _event([{"index": 0, "delta": {}, "finish_reason": "stop" if tool is None else "tool_calls"}])
+        await _event([], usage=usage)
+        write_chunk(writer, b"data: [DONE]\n\n")
+        write_chunk(writer, b"")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="本地 OpenAI 兼容替身服务（基准 / 离线联调）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency", type=float, default=0.3, help="首包延迟（秒）")
+    parser.add_argument("--tokens-per-s", type=float, default=300.0, help="输出 token 速率")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟 / 速率扰动比例")
+    parser.add_argument("--revise", action="store_true", help="评审结果要求精修（走 refine 分支）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="放慢 5 倍的请求比例（长尾）")
+    args = parser.parse_args()
+    config = FakeLLMConfig(
+        latency_s=args.latency,
+        tokens_per_s=args.tokens_per_s,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        slow_rate=args.slow_rate,
+        critique=default_critique(args.revise),
+    )
+    server = FakeLLMServer(config, args.host, args.port)
+
+    async def _serve() -> None:
+        async with await server.serve():
+            print(f"fake LLM 已启动：OPENAI_BASE_URL={server.base_url}")
+            await asyncio.Event().wait()
+
+    try:
+        asyncio.run(_serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
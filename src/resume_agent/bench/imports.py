@@ -0,0 +1,103 @@
+"""
+启动耗时基准：在全新子进程里 `python -X importtime -c "import <入口>"`，汇总各 CLI 入口的累计导入耗时、
+模块数与自身耗时最高的模块，并核对预算——轻量入口不得加载 LLM 栈 / Playwright，累计耗时不得超过上限。
+
+    python -m resume_agent.bench.imports
+    python -m resume_agent.bench.imports --top 15 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+
+# 只在 LLM / 浏览器分支里才该出现的重依赖（顶层包名）
+HEAVY_MODULES = ("pydantic_ai", "openai", "playwright")
+
+# 入口 → 累计导入耗时上限（ms）。留足机器差异余量；LLM 栈一旦回到顶层导入会多出 1s 以上
+IMPORT_BUDGET_MS: dict[str, float] = {
+    "resume_agent.main": 300,  # resume-run --help / 参数解析
+    "resume_agent.rerender": 800,  # --from-json 仅重渲染
+    "resume_agent.pdf_export": 800,  # resume-pdf
+    "resume_agent.jd_search": 800,  # resume-jd
+}
+
+
+@dataclass
+class ImportProfile:
+    module: str
+    total_ms: float
+    modules: int
+    heavy: list[str] = field(default_factory=list)
+    slowest: list[tuple[str, float]] = field(default_factory=list)  # (模块, 自身耗时 ms)
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, float, float]]:
+    """-X importtime 输出 → [(模块, 自身 µs, 累计 µs)]，按导入完成顺序。"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if self_us.isdigit():
+            rows.append((name, float(self_us), float(cumulative_us)))
+    return rows
+
+
+def profile_import(module: str, top: int = 10) -> ImportProfile:
+    env = {**os.environ, "PYDANTIC_AI_NO_BANNER": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    total_us = next(cum for name, _, cum in reversed(rows) if name == module)
+    # 只统计入口自身触发的导入（解释器启动时的 site / encodings 不计）
+    own = rows[[name for name, _, _ in rows].index(module.split(".")[0]) :]
+    heavy = sorted({name.split(".")[0] for name, _, _ in own if name.split(".")[0] in HEAVY_MODULES})
+    slowest = sorted(((name, us / 1000) for name, us, _ in own), key=lambda r: -r[1])[:top]
+    return ImportProfile(module, total_us / 1000, len(own), heavy, [(n, round(ms, 1)) for n, ms in slowest])
+
+
+def check_budget(profile: ImportProfile, budget_ms: float) -> list[str]:
+    problems = []
+    if profile.heavy:
+        problems.append(f"{profile.module} 顶层导入了 {', '.join(profile.heavy)}")
+    if profile.total_ms > budget_ms:
+        problems.append(f"{profile.module} 导入耗时 {profile.total_ms:.0f}ms > 预算 {budget_ms:.0f}ms")
+    return problems
+
+
+def run(modules: dict[str, float], top: int, repeat: int) -> dict:
+    report = {}
+    for module, budget in modules.items():
+        # 取多次中最快的一次，排除磁盘缓存冷热与调度抖动
+        profile = min((profile_import(module, top) for _ in range(max(1, repeat))), key=lambda p: p.total_ms)
+        report[module] = {
+            **asdict(profile),
+            "total_ms": round(profile.total_ms, 1),
+            "budget_ms": budget,
+            "problems": check_budget(profile, budget),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CLI 入口导入耗时基准（python -X importtime）")
+    parser.add_argument("--top", type=int, default=10, help="列出自身耗时最高的模块数")
+    parser.add_argument("--repeat", type=int, default=3, help="每个入口测量次数（取最快）")
+    args = parser.parse_args()
+    report = run(IMPORT_BUDGET_MS, args.top, args.repeat)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if any(entry["problems"] for entry in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
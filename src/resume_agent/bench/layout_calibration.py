@@ -0,0 +1,77 @@
+"""
+版面估算器标定与误差基准：合成样本逐模板在 Chromium 实测，拟合线性校正并报告估算误差。
+
+    python -m resume_agent.bench.layout_calibration --samples 60          # 只报告
+    python -m resume_agent.bench.layout_calibration --samples 60 --write  # 写回 layout_calibration.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+
+from ..browser_pool import shutdown_browser_pool
+from ..tools.layout_estimator import (
+    estimate_inner_raw,
+    fit_calibration,
+    load_profiles,
+    save_calibration,
+)
+from ..tools.layout_validator import measure_html_layout
+from ..utils import render_html
+from .samples import synthetic_resumes
+
+
+def _errors(pred: list[float], measured: list[float]) -> dict[str, float]:
+    errs = sorted(abs(p - m) for p, m in zip(pred, measured))
+    return {
+        "mean_abs_px": round(statistics.fmean(errs), 1),
+        "p95_abs_px": round(errs[min(len(errs) - 1, int(len(errs) * 0.95))], 1),
+        "max_abs_px": round(errs[-1], 1),
+    }
+
+
+async def calibrate(n_samples: int, seed: int) -> dict[str, dict]:
+    resumes = synthetic_resumes(n_samples, seed)
+    # 偶数下标拟合、奇数下标验证，报告的是样本外误差
+    fit_idx = list(range(0, n_samples, 2))
+    val_idx = list(range(1, n_samples, 2))
+    report: dict[str, dict] = {}
+    for template_name, profile in load_profiles().items():
+        raw = [estimate_inner_raw(r, profile) for r in resumes]
+        measured = [
+            float((await measure_html_layout(render_html(r.model_dump(), template_name)))[1])
+            for r in resumes
+        ]
+        cal = fit_calibration([raw[i] for i in fit_idx], [measured[i] for i in fit_idx])
+        corrected = [x * cal["scale"] + cal["offset"] for x in raw]
+        report[template_name] = {
+            "calibration": fit_calibration(raw, measured),
+            "uncalibrated": _errors([raw[i] for i in val_idx], [measured[i] for i in val_idx]),
+            "held_out": _errors([corrected[i] for i in val_idx], [measured[i] for i in val_idx]),
+        }
+    return report
+
+
+async def _main(args: argparse.Namespace) -> None:
+    try:
+        report = await calibrate(args.samples, args.seed)
+    finally:
+        await shutdown_browser_pool()
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.write:
+        save_calibration({name: r["calibration"] for name, r in report.items()})
+        print("✅ 已写入 templates/layout_calibration.json")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="版面估算器标定与误差基准")
+    parser.add_argument("--samples", type=int, default=60, help="合成样本数（一半拟合、一半验证）")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--write", action="store_true", help="用全部样本重新拟合并写回标定文件")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+模板渲染微基准：每次新建 Environment（旧 render_html 写法）vs 预编译注册表。
+
+    python -m resume_agent.bench.render --iterations 300
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from typing import Callable
+
+from jinja2 import Environment, FileSystemLoader
+
+from ..template_registry import TEMPLATES_DIR, TemplateRegistry
+from .samples import synthetic_resumes
+
+
+def _per_call_env(data: dict, template_name: str) -> str:
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    return env.get_template(template_name).render(**data)
+
+
+def _throughput(render: Callable[[dict, str], str], payloads: list[dict], names: list[str], iterations: int) -> float:
+    started = time.perf_counter()
+    for i in range(iterations):
+        render(payloads[i % len(payloads)], names[i % len(names)])
+    return iterations / (time.perf_counter() - started)
+
+
+def run(iterations: int) -> dict[str, float]:
+    payloads = [r.model_dump() for r in synthetic_resumes(20)]
+    registry = TemplateRegistry()
+    hot = TemplateRegistry(hot_reload=True)
+    names = registry.names()
+    report = {
+        "per_call_env_rps": _throughput(_per_call_env, payloads, names, iterations),
+        "registry_rps": _throughput(registry.render, payloads, names, iterations),
+        "registry_hot_reload_rps": _throughput(hot.render, payloads, names, iterations),
+    }
+    with tempfile.TemporaryDirectory() as cache_dir:
+        TemplateRegistry(bytecode_cache_dir=cache_dir)
+        started = time.perf_counter()
+        TemplateRegistry(bytecode_cache_dir=cache_dir)
+        report["warm_bytecode_startup_ms"] = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    TemplateRegistry()
+    report["cold_startup_ms"] = (time.perf_counter() - started) * 1000
+    report["speedup"] = report["registry_rps"] / report["per_call_env_rps"]
+    return {k: round(v, 2) for k, v in report.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="模板渲染吞吐基准")
+    parser.add_argument("--iterations", type=int, default=300)
+    print(json.dumps(run(parser.parse_args().iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
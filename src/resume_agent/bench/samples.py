@@ -0,0 +1,97 @@
+"""基准用的合成 Resume / JD：项目数、bullet 数与长度、中英混排比例随机变化（固定种子可复现）。"""
+from __future__ import annotations
+
+import random
+
+from ..keywords import TECH_TERMS
+from ..models import EducationEntry, Resume, WorkProject
+
+_CJK_WORDS = [
+    "负责", "设计", "实现", "高并发", "订单系统", "缓存", "优化", "接口", "延迟", "降低",
+    "重构", "模块", "数据", "链路", "监控", "告警", "平台", "服务", "稳定性", "提升",
+]
+_LATIN_WORDS = [
+    "Python", "Redis", "Kafka", "FastAPI", "PostgreSQL", "Docker", "K8s", "gRPC",
+    "p99", "QPS", "MySQL", "Celery", "Go", "Playwright", "Pydantic", "LLM",
+]
+_SKILLS = _LATIN_WORDS + ["Elasticsearch", "ClickHouse", "Prometheus", "Rust", "TypeScript"]
+_JD_PHRASES = [
+    "岗位职责", "任职要求", "负责核心业务系统的设计与开发", "参与技术方案评审", "保障线上服务稳定性",
+    "本科及以上学历", "三年以上相关工作经验", "具备良好的沟通能力", "有大规模系统经验者优先",
+    "熟悉常用数据结构与算法", "对性能调优有深入理解", "有开源项目贡献者优先", "能承受一定工作压力",
+    "负责数据平台建设", "参与推荐算法落地", "负责支付链路改造", "建设可观测性体系", "推动研发效能提升",
+    "负责海外业务", "跨团队协作推进项目", "熟悉主流开源框架原理", "编写高质量代码与文档",
+]
+
+
+def _sentence(rng: random.Random, n_tokens: int, latin_ratio: float) -> str:
+    parts = []
+    for _ in range(n_tokens):
+        if rng.random() < latin_ratio:
+            parts.append(f" {rng.choice(_LATIN_WORDS)} ")
+        else:
+            parts.append(rng.choice(_CJK_WORDS))
+    if rng.random() < 0.6:
+        parts.append(f"，性能提升 {rng.randint(10, 90)}%")
+    return "".join(parts).strip() + "。"
+
+
+def synthetic_resume(rng: random.Random) -> Resume:
+    latin_ratio = rng.uniform(0.1, 0.5)
+    experience = [
+        WorkProject(
+            project_name=f"项目{i + 1} {rng.choice(_LATIN_WORDS)} 平台",
+            role=rng.choice(["后端负责人", "核心开发", "Tech Lead", "全栈工程师"]),
+            start_date=f"20{rng.randint(18, 23)}.0{rng.randint(1, 9)}",
+            end_date=rng.choice(["至今", f"20{rng.randint(23, 25)}.0{rng.randint(1, 9)}"]),
+            optimized_bullets=[
+                _sentence(rng, rng.randint(6, 30), latin_ratio)
+                for _ in range(rng.randint(1, 5))
+            ],
+            matched_skills=rng.sample(_SKILLS, rng.randint(0, 6)),
+        )
+        for i in range(rng.randint(1, 6))
+    ]
+    education = [
+        EducationEntry(
+            school=rng.choice(["浙江大学", "北京邮电大学", "University of Toronto"]),
+            degree=rng.choice(["本科", "硕士"]),
+            major="计算机科学与技术",
+            start_year="2014",
+            end_year="2018",
+            honors=rng.sample(["国家奖学金", "ACM 区域赛银牌", "优秀毕业生"], rng.randint(0, 2)) or None,
+        )
+        for _ in range(rng.randint(1, 2))
+    ]
+    return Resume(
+        name="张三",
+        title="高级后端工程师",
+        contact={"email": "zhangsan@example.com", "phone": "138-0000-0000", "github": "https://github.com/zhangsan"},
+        summary=_sentence(rng, rng.randint(10, 50), latin_ratio),
+        skills=rng.sample(_SKILLS, rng.randint(4, 12)),
+        experience=experience,
+        education=education,
+        match_score=rng.randint(60, 95),
+    )
+
+
+def synthetic_resumes(n: int, seed: int = 7) -> list[Resume]:
+    rng = random.Random(seed)
+    return [synthetic_resume(rng) for _ in range(n)]
+
+_ZIPF = [1 / (i + 1) ** 0.8 for i in range(len(TECH_TERMS))]
+
+
+def synthetic_jd(rng: random.Random) -> str:
+    """技术词按 Zipf 式偏好抽取（头部词常见、长尾词稀有），夹杂通用 JD 套话。"""
+    n_terms = rng.randint(6, 16)
+    terms = set(rng.choices(TECH_TERMS, weights=_ZIPF, k=n_terms))
+    lines = rng.sample(_JD_PHRASES, rng.randint(4, 9))
+    lines.append(f"熟悉 {'、'.join(sorted(terms))}")
+    rng.shuffle(lines)
+    return "；".join(lines) + "。"
+
+
+def synthetic_jds(n: int, seed: int = 11) -> list[str]:
+    rng = random.Random(seed)
+    return [synthetic_jd(rng) for _ in range(n)]
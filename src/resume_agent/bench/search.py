@@ -0,0 +1,82 @@
+"""
+JD 检索基准：合成 N 份 JD 建索引（吞吐、内存），再以合成思绪查询 top-K（p50/p95），
+并测增量增删与保存 / 加载耗时。
+
+    python -m resume_agent.bench.search --docs 100000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import time
+
+from ..jd_search import JDIndex
+from ..tracing import percentile
+from .samples import synthetic_jds, synthetic_resumes
+
+
+def run(docs: int, queries: int, top: int) -> dict:
+    jds = synthetic_jds(docs)
+    index = JDIndex()
+    started = time.perf_counter()
+    for i, text in enumerate(jds):
+        index.add(f"jd{i}", text)
+    index_s = time.perf_counter() - started
+    # Linux 上 ru_maxrss 单位为 KB：进程历史峰值（含合成语料本身）
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    thoughts = [r.model_dump_json() for r in synthetic_resumes(queries)]
+    latencies = []
+    for text in thoughts:
+        t0 = time.perf_counter()
+        index.search(text, top)
+        latencies.append(time.perf_counter() - t0)
+    latencies.sort()
+
+    rng = random.Random(0)
+    t0 = time.perf_counter()
+    for i in rng.sample(range(docs), min(1000, docs)):
+        index.remove(f"jd{i}")
+    for i, text in enumerate(synthetic_jds(1000, seed=99)):
+        index.add(f"new{i}", text)
+    incremental_s = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index.pkl")
+        t0 = time.perf_counter()
+        index.save(path)
+        save_s = time.perf_counter() - t0
+        size_mb = os.path.getsize(path) / 2**20
+        t0 = time.perf_counter()
+        JDIndex.load(path)
+        load_s = time.perf_counter() - t0
+    return {
+        "docs": docs,
+        "index_docs_per_s": round(docs / index_s),
+        "index_s": round(index_s, 2),
+        "peak_rss_mb": round(peak_mb, 1),
+        "query_p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "query_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "incremental_1k_remove_add_s": round(incremental_s, 2),
+        "save_s": round(save_s, 2),
+        "load_s": round(load_s, 2),
+        "file_mb": round(size_mb, 1),
+        **index.stats(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JD 检索（BM25 倒排索引）基准")
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.docs, args.queries, args.top), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
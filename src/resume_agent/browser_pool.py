@@ -0,0 +1,183 @@
+"""
+进程级 Chromium 池：浏览器只冷启动一次，每次按需发放全新 context/page。
+版面校验（tools.layout_validator）与 PDF 导出（utils）共用。
+"""
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING, AsyncIterator
+
+from .tracing import span
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page, Playwright
+
+# A4 宽 @96dpi ≈ 794px，与打印换行一致
+A4_VIEWPORT = {"width": 794, "height": 1123}
+# 单个 Chromium 累计发放页面数上限，超过即换新进程（防渲染进程内存/句柄累积）
+MAX_PAGES_PER_BROWSER = 200
+# 同时打开的页面上限（批量/服务模式下的背压）
+MAX_CONCURRENT_PAGES = 8
+
+
+class BrowserPool:
+    """单 Chromium 常驻；断连自动重启，发满 max_pages_per_browser 页后轮换。"""
+
+    def __init__(
+        self,
+        max_pages_per_browser: int = MAX_PAGES_PER_BROWSER,
+        max_concurrent_pages: int = MAX_CONCURRENT_PAGES,
+    ) -> None:
+        self.max_pages_per_browser = max_pages_per_browser
+        self.max_concurrent_pages = max_concurrent_pages
+        self.launches = 0
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._served = 0
+        self._in_use: dict[Browser, int] = {}
+        self._retired: set[Browser] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._launching: asyncio.Future[Browser] | None = None
+
+    def _bind_loop(self) -> None:
+        # Playwright 对象绑定创建时的事件循环；换循环（如多次 asyncio.run）只能丢弃重建
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self._playwright = None
+        self._browser = None
+        self._served = 0
+        self._in_use.clear()
+        self._retired.clear()
+        self._launching = None
+        self._lock = asyncio.Lock()
+        self._slots = asyncio.Semaphore(self.max_concurrent_pages)
+
+    def is_healthy(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _launch(self) -> Browser:
+        if self._playwright is None:
+            # Playwright 在首次真正启动浏览器时才导入：--help、仅估算版面的路径不付这份启动时间
+            from playwright.async_api import async_playwright
+
+            self._playwright = await async_playwright().start()
+        with span("browser.launch"):
+            browser = await self._playwright.chromium.launch(headless=True)
+        self.launches += 1
+        self._served = 0
+        self._in_use[browser] = 0
+        return browser
+
+    async def _acquire_browser(self) -> Browser:
+        self._bind_loop()
+        assert self._lock is not None
+        async with self._lock:
+            if self._browser is not None and not self.is_healthy():
+                self._in_use.pop(self._browser, None)
+                self._browser = None
+            if self._browser is not None and self._served >= self.max_pages_per_browser:
+                old, self._browser = self._browser, None
+                self._retired.add(old)
+                await self._close_if_idle(old)
+            if self._browser is None:
+                # 启动放在独立任务里：调用方被取消（如步骤图收尾取消预热）不会打断启动到一半的 Chromium，
+                # 启动结果由下一个调用方或 close() 接手
+                if self._launching is None:
+                    self._launching = asyncio.ensure_future(self._launch())
+                    # 无人等待时失败也不报 "exception was never retrieved"
+                    self._launching.add_done_callback(lambda f: f.cancelled() or f.exception())
+                launching = self._launching
+                try:
+                    self._browser = await asyncio.shield(launching)
+                finally:
+                    if launching.done():
+                        self._launching = None
+            self._served += 1
+            self._in_use[self._browser] += 1
+            return self._browser
+
+    async def _release_browser(self, browser: Browser) -> None:
+        if browser not in self._in_use:
+            # 断连后已丢弃、或已被 close() 清理的浏览器不再记账
+            return
+        self._in_use[browser] -= 1
+        await self._close_if_idle(browser)
+
+    async def _close_if_idle(self, browser: Browser) -> None:
+        if browser in self._retired and self._in_use.get(browser, 0) <= 0:
+            self._retired.discard(browser)
+            self._in_use.pop(browser, None)
+            await browser.close()
+
+    async def warm_up(self) -> None:
+        """预启动 Chromium 并空跑一页，使首次真实校验不含冷启动。"""
+        async with self.page() as page:
+            await page.set_content("<html><body></body></html>")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """借出 A4 视口的新页面；退出时关闭其 context，浏览器保留复用。"""
+        self._bind_loop()
+        assert self._slots is not None
+        async with self._slots:
+            with span("browser.acquire"):
+                browser = await self._acquire_browser()
+            try:
+                with span("browser.new_page"):
+                    context = await browser.new_context(
+                        viewport=A4_VIEWPORT, device_scale_factor=1
+                    )
+                    page = await context.new_page()
+                try:
+                    yield page
+                finally:
+                    await context.close()
+            finally:
+                await self._release_browser(browser)
+
+    async def close(self) -> None:
+        if self._loop is not asyncio.get_running_loop():
+            # 所属事件循环已结束，其上的 Playwright 对象无法再 await，直接丢弃
+            self._bind_loop()
+            self._loop = None
+            return
+        if self._launching is not None:
+            launching, self._launching = self._launching, None
+            with suppress(Exception):
+                await launching
+        browsers = set(self._in_use) | self._retired
+        if self._browser is not None:
+            browsers.add(self._browser)
+        self._browser = None
+        self._in_use.clear()
+        self._retired.clear()
+        for browser in browsers:
+            if browser.is_connected():
+                await browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        self._loop = None
+
+
+_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+async def shutdown_browser_pool() -> None:
+    """关闭进程级浏览器池（CLI / 服务退出前调用）。"""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.close()
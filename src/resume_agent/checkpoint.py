@@ -0,0 +1,120 @@
+"""
+ResumeWorkspace 检查点：每个步骤完成后把工作区写成 gzip JSON（数 KB），进程中途退出后
+--resume-from 从首个未完成的步骤继续，已花掉的 draft / critique / refine 调用不再重复。
+
+指纹（模型、base_url、prompt、JD、思绪、模板、Resume schema）任一不一致即拒绝复用。
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+from .context import ResumeWorkspace
+from .keywords import match_keywords
+from .models import Resume, ResumeCritique
+from .resume_prompts import ResumePrompts
+from .token_usage import StepTokens
+
+CHECKPOINT_VERSION = 1
+# 流水线阶段（按序）；layout 阶段另记已完成的版面轮次
+STAGES = ("draft", "critique", "refine", "layout")
+Stage = Literal["draft", "critique", "refine", "layout"]
+
+
+class CheckpointMismatch(ValueError):
+    """检查点的指纹与本次运行不一致（模型 / prompt / 输入已变），不能复用。"""
+
+
+def _digest(value: object) -> str:
+    payload = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def fingerprints(
+    workspace: ResumeWorkspace, model, prompts: ResumePrompts, template_name: str
+) -> dict[str, str]:
+    return {
+        "model": model.model_name,
+        "base_url": getattr(model, "base_url", None) or "",
+        "prompts": _digest(prompts.prompts),
+        "jd": _digest(workspace.jd_text),
+        "thoughts": _digest(workspace.raw_thoughts),
+        "template": template_name,
+        "schema": _digest(Resume.model_json_schema()),
+    }
+
+
+class Checkpoint(BaseModel):
+    version: int = CHECKPOINT_VERSION
+    stage: Stage = Field(..., description="最后完成的阶段")
+    layout_attempts: int = Field(0, description="已完成（并已改写）的版面轮次")
+    fingerprints: dict[str, str]
+    template_name: str
+    draft: Resume | None = None
+    critique: ResumeCritique | None = None
+    critique_calls: int = 0
+    refine_calls: int = 0
+    draft_history: list[Resume] = Field(default_factory=list)
+    tokens: dict[str, dict[str, int]] = Field(default_factory=dict)
+
+    def done(self, stage: Stage) -> bool:
+        return STAGES.index(self.stage) >= STAGES.index(stage)
+
+    def check(self, expected: dict[str, str]) -> None:
+        if self.version != CHECKPOINT_VERSION:
+            raise CheckpointMismatch(f"检查点版本 {self.version} ≠ {CHECKPOINT_VERSION}")
+        changed = sorted(k for k in expected if self.fingerprints.get(k) != expected[k])
+        if changed:
+            raise CheckpointMismatch(f"检查点与本次运行不一致（{', '.join(changed)} 已变），拒绝复用")
+
+    def restore(self, workspace: ResumeWorkspace) -> None:
+        workspace.template_name = self.template_name
+        workspace.draft = self.draft
+        workspace.critique = self.critique
+        workspace.critique_calls = self.critique_calls
+        workspace.refine_calls = self.refine_calls
+        workspace.draft_history = list(self.draft_history)
+        workspace.tokens = {step: StepTokens(**t) for step, t in self.tokens.items()}
+        if self.draft is not None:
+            # 本地关键词比对不入盘（毫秒级），精修 prompt 需要时重算
+            workspace.keywords = match_keywords(workspace.jd_text, self.draft, workspace.raw_thoughts)
+
+
+def save_checkpoint(
+    path: str,
+    workspace: ResumeWorkspace,
+    fingerprints: dict[str, str],
+    stage: Stage,
+    layout_attempts: int = 0,
+) -> None:
+    """原子写入（临时文件 + rename），中途被杀也不会留下半个检查点。"""
+    checkpoint = Checkpoint(
+        stage=stage,
+        layout_attempts=layout_attempts,
+        fingerprints=fingerprints,
+        template_name=workspace.template_name,
+        draft=workspace.draft,
+        critique=workspace.critique,
+        critique_calls=workspace.critique_calls,
+        refine_calls=workspace.refine_calls,
+        draft_history=workspace.draft_history,
+        tokens={step: asdict(t) for step, t in workspace.tokens.items()},
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with gzip.open(tmp, "wb") as f:
+        f.write(checkpoint.model_dump_json(exclude_none=True).encode("utf-8"))
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path: str) -> Checkpoint:
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"检查点不存在: {path}")
+    with gzip.open(path, "rb") as f:
+        return Checkpoint.model_validate_json(f.read())
@@ -1,12 +1,23 @@
 """Agent 依赖与工作区：跨 Tool 共享。"""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable
+import os
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable
 
-from .models import Resume, ResumeCritique
+from .models import LayoutStatus, Resume, ResumeCritique
+from .resilience import CallStats
+from .scheduler import StepGraph
+from .token_usage import StepTokens
+
+if TYPE_CHECKING:
+    from .history import ContextTurn
+    from .keywords import KeywordReport
+    from .tools.layout_validator import LayoutReport
 
 StatusCallback = Callable[[str, str], None]
+# 流式模式：(步骤名, 部分 Resume)；部分 Resume 未经整体校验，仅含已写完的条目
+PartialCallback = Callable[[str, Resume], None]
 
 
 # Tool 模式防刷；主路径见 steps（单次评修）
@@ -24,3 +35,41 @@ class ResumeWorkspace:
     critique: ResumeCritique | None = None
     critique_calls: int = 0
     refine_calls: int = 0
+    # 流式模式下各步骤首个可用输出耗时（秒）
+    ttfu_s: dict[str, float] = field(default_factory=dict)
+    template_name: str = "swiss_single_column.html"
+    # 与评审并行的初稿版面校验结果；精修时一并带入
+    layout_feedback: LayoutReport | None = None
+    steps: StepGraph = field(default_factory=StepGraph)
+    # 版面调整前的历史版本（评审精修之后），本地拟合可从中恢复被删的 bullet
+    draft_history: list[Resume] = field(default_factory=list)
+    # 各步骤 LLM token 用量（缓存命中的步骤不计）
+    tokens: dict[str, StepTokens] = field(default_factory=dict)
+    # 整单截止时刻（time.monotonic）；None 为不限
+    deadline_at: float | None = None
+    # LLM 调用的重试 / 超时 / 对冲计数
+    llm_stats: CallStats = field(default_factory=CallStats)
+    # 精修 / 版面精修输出补丁并本地应用（见 patching）；RESUME_AGENT_REFINE_MODE=full 时整份重写
+    patch_refine: bool = field(
+        default_factory=lambda: os.getenv("RESUME_AGENT_REFINE_MODE", "patch") != "full"
+    )
+    # 本地关键词比对结果（每次评审前计算）；结论足够明确时跳过 LLM 评审，RESUME_AGENT_LOCAL_CRITIQUE=off 关闭跳过
+    keywords: KeywordReport | None = None
+    local_critique: bool = field(
+        default_factory=lambda: os.getenv("RESUME_AGENT_LOCAL_CRITIQUE", "gate") != "off"
+    )
+    # Tool 模式外层 Agent 每轮发送的上下文 token（压缩前 / 后估算与实际输入，见 history）
+    context_turns: list[ContextTurn] = field(default_factory=list)
+
+
+@dataclass
+class ResumeBuild:
+    """一次流水线的最终产物：校验通过的 Resume 及其渲染结果（PDF 可能已在校验页打印好）。"""
+
+    resume: Resume
+    template_name: str
+    html: str
+    layout_status: LayoutStatus | None
+    pdf: bytes | None = None
+    tokens: dict[str, StepTokens] = field(default_factory=dict)
+    llm_stats: CallStats = field(default_factory=CallStats)
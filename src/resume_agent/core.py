@@ -1,7 +1,9 @@
 import sys
+from typing import Sequence
 
+from .context import PartialCallback, ResumeBuild
 from .models import Resume
-from .orchestrator import build_resume
+from .orchestrator import build_resume, build_resume_artifacts_async, build_resume_async
 from .resume_prompts import ResumePrompts
 
 
@@ -31,3 +33,72 @@ class ResumeAgent:
             status=lambda m, c: self._emit_status(m, c),
             template_name=template_name,
         )
+
+    async def build_resume_async(
+        self,
+        raw_thoughts: str,
+        jd_text: str,
+        *,
+        template_name: str = "swiss_single_column.html",
+        stream: bool = False,
+        on_partial: PartialCallback | None = None,
+        deadline_s: float | None = None,
+        n_drafts: int = 1,
+        draft_temperatures: Sequence[float] | None = None,
+    ) -> Resume:
+        """与调用方共用事件循环（及其浏览器池）；关闭池由调用方负责。
+
+        n_drafts > 1 时并发起草多份候选并各自评审，择优后多半免去精修（draft_temperatures 可选）。
+        """
+        return await build_resume_async(
+            jd_text,
+            raw_thoughts,
+            self.model,
+            self.prompts,
+            status=lambda m, c: self._emit_status(m, c),
+            template_name=template_name,
+            stream=stream,
+            on_partial=on_partial,
+            deadline_s=deadline_s,
+            n_drafts=n_drafts,
+            draft_temperatures=draft_temperatures,
+        )
+
+    async def build_resume_artifacts_async(
+        self,
+        raw_thoughts: str,
+        jd_text: str,
+        *,
+        template_name: str = "swiss_single_column.html",
+        export_pdf: bool = True,
+        stream: bool = False,
+        on_partial: PartialCallback | None = None,
+        deadline_s: float | None = None,
+        checkpoint: str | None = None,
+        resume_from: str | None = None,
+        n_drafts: int = 1,
+        draft_temperatures: Sequence[float] | None = None,
+    ) -> ResumeBuild:
+        """返回 Resume 及最终 HTML / PDF 字节，交由 utils.save_build_async 按需落盘。
+
+        stream=True 时初稿/精修流式生成，部分 Resume 经 on_partial(step, resume) 推送。
+        deadline_s 为整单截止：到点后放弃后续 LLM 步骤，交付当前最好的版本。
+        checkpoint 每阶段写检查点；resume_from 从检查点的首个未完成阶段继续（指纹须一致）。
+        n_drafts > 1 时 best-of-N 初稿（见 orchestrator.build_resume_artifacts_async）。
+        """
+        return await build_resume_artifacts_async(
+            jd_text,
+            raw_thoughts,
+            self.model,
+            self.prompts,
+            status=lambda m, c: self._emit_status(m, c),
+            template_name=template_name,
+            export_pdf=export_pdf,
+            stream=stream,
+            on_partial=on_partial,
+            deadline_s=deadline_s,
+            checkpoint=checkpoint,
+            resume_from=resume_from,
+            n_drafts=n_drafts,
+            draft_temperatures=draft_temperatures,
+        )
@@ -0,0 +1,174 @@
+"""
+Tool 模式外层 Agent（create_resume_agent）的上下文压缩。
+
+外层 Agent 每一轮都把完整历史重发给模型：draft / critique / refine 的工具往返、输出校验失败的重试
+（连同整份 Resume 参数）逐轮累积，输入 token 随轮数二次增长。history processor 在每次请求前：
+  1. 最近 keep_recent 轮往返原样保留；更早的工具结果、重试提示替换为一行占位，大参数的工具调用清空参数；
+  2. 在本轮请求末尾附上【工作区摘要】——最新的初稿 / 评审 / 版面状态以 ResumeWorkspace 为准，
+     而不是散落在历史里的旧工具结果（上一轮附的摘要随之移除）；
+  3. 仍超过 token 上限时，从最早的往返整对丢弃（工具调用与其结果同进同出，不破坏配对）。
+每轮的估算 token（压缩前 → 实际发送）与服务商上报的输入 token 记入 workspace.context_turns。
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from dataclasses import dataclass, replace
+from typing import Any
+
+from pydantic_ai import RunContext
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    RetryPromptPart,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+
+from .context import MAX_REFINE_CALLS, ResumeWorkspace, StatusCallback
+from .textutil import one_line
+
+# 压缩后历史的估算 token 上限（RESUME_AGENT_HISTORY_TOKENS 可覆盖）
+HISTORY_TOKEN_CEILING = 4000
+# 原样保留的最近往返数（模型响应 + 其后的工具结果请求）
+KEEP_RECENT = 1
+# 旧工具调用参数超过该估算 token 数即清空（如未通过校验的整份 Resume）
+MAX_OLD_ARGS_TOKENS = 64
+SUMMARY_HEAD = "【工作区摘要】"
+_CJK = re.compile(r"[一-鿿]")
+
+
+@dataclass
+class ContextTurn:
+    turn: int
+    messages: int  # 实际发送的消息数
+    raw_tokens: int  # 未压缩时的估算 token
+    sent_tokens: int  # 压缩后实际发送的估算 token
+    input_tokens: int = 0  # 服务商上报的本轮输入 token（下一轮回填；末轮由 run_resume_agent_async 回填）
+
+
+def estimate_tokens(text: str) -> int:
+    """粗估：CJK 每字约 1 token，其余每 4 字符约 1 token。"""
+    cjk = len(_CJK.findall(text))
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def _part_text(part: Any) -> str:
+    if isinstance(part, ToolCallPart):
+        return part.tool_name + part.args_as_json_str()
+    content = getattr(part, "content", "")
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, default=str)
+
+
+def history_tokens(messages: list[ModelMessage]) -> int:
+    return sum(estimate_tokens(_part_text(p)) for m in messages for p in m.parts)
+
+
+def workspace_summary(workspace: ResumeWorkspace) -> str:
+    """最新工作区状态的一段摘要（代替历史中的旧工具结果）。"""
+    lines = [SUMMARY_HEAD]
+    d = workspace.draft
+    if d is not None:
+        titles = one_line(" / ".join(p.project_name for p in d.experience), 80)
+        lines.append(f"初稿：match_score={d.match_score}，项目 {len(d.experience)} 条（{titles}）")
+    c = workspace.critique
+    if c is not None:
+        lines.append(f"评审：{c.score} 分，needs_revision={c.needs_revision}，要点：{one_line(c.critique, 120)}")
+    lines.append(f"评审次数 {workspace.critique_calls}，精修 {workspace.refine_calls}/{MAX_REFINE_CALLS}")
+    if workspace.layout_feedback is not None:
+        lines.append(f"版面：{workspace.layout_feedback.status.value}")
+    return "\n".join(lines)
+
+
+def _is_summary(part: Any) -> bool:
+    return isinstance(part, UserPromptPart) and isinstance(part.content, str) and part.content.startswith(SUMMARY_HEAD)
+
+
+def _compact_part(part: Any) -> Any:
+    if isinstance(part, ToolReturnPart):
+        return replace(part, content=f"（已压缩）{part.tool_name} 已完成，最新状态见{SUMMARY_HEAD}")
+    if isinstance(part, RetryPromptPart):
+        return replace(part, content="（已压缩）该次输出未通过校验，已重试")
+    if isinstance(part, ToolCallPart) and estimate_tokens(part.args_as_json_str()) > MAX_OLD_ARGS_TOKENS:
+        return replace(part, args={})
+    if isinstance(part, TextPart):
+        return replace(part, content=one_line(part.content, 200))
+    return part
+
+
+class HistoryCompactor:
+    """外层 Agent 的 history processor：(RunContext[ResumeWorkspace], 历史) → 压缩后的历史。"""
+
+    def __init__(
+        self,
+        status: StatusCallback | None = None,
+        *,
+        ceiling: int | None = None,
+        keep_recent: int = KEEP_RECENT,
+    ) -> None:
+        self.status = status
+        self.ceiling = ceiling or int(os.getenv("RESUME_AGENT_HISTORY_TOKENS", HISTORY_TOKEN_CEILING))
+        self.keep_recent = max(1, keep_recent)
+
+    def __call__(self, ctx: RunContext[ResumeWorkspace], messages: list[ModelMessage]) -> list[ModelMessage]:
+        workspace = ctx.deps
+        turns = workspace.context_turns
+        prev = turns[-1] if turns else None
+        # 上一轮的实际输入 token 在其响应里，本轮回填
+        if prev is not None and len(messages) >= 2 and isinstance(messages[-2], ModelResponse):
+            prev.input_tokens = messages[-2].usage.input_tokens
+        # 压缩结果会写回运行历史：未压缩总量 = 上一轮未压缩总量 + 此后新增的消息
+        raw = (
+            prev.raw_tokens + history_tokens(messages[prev.messages :])
+            if prev is not None and len(messages) >= prev.messages
+            else history_tokens(messages)
+        )
+        messages = [
+            replace(m, parts=[p for p in m.parts if not _is_summary(p)]) if isinstance(m, ModelRequest) else m
+            for m in messages
+        ]
+        responses = [i for i, m in enumerate(messages) if isinstance(m, ModelResponse)]
+        recent = responses[-self.keep_recent] if len(responses) >= self.keep_recent else 1
+        head, old, tail = messages[:1], messages[1:recent], messages[recent:]
+        old = [replace(m, parts=[_compact_part(p) for p in m.parts]) for m in old]
+        if workspace.draft is not None and tail and isinstance(tail[-1], ModelRequest):
+            tail[-1] = replace(tail[-1], parts=[*tail[-1].parts, UserPromptPart(workspace_summary(workspace))])
+        # 超限时从最早的往返整对丢弃：ModelResponse 与其后携带工具结果的 ModelRequest 一起去掉
+        while old and history_tokens(head + old + tail) > self.ceiling:
+            old = old[2:] if isinstance(old[0], ModelResponse) else old[1:]
+        out = head + old + tail
+        turn = ContextTurn(len(turns) + 1, len(out), raw, history_tokens(out))
+        turns.append(turn)
+        if self.status is not None and turn.sent_tokens < turn.raw_tokens:
+            self.status(
+                f"🗜  外层上下文 第 {turn.turn} 轮 | {turn.messages} 条消息 | ≈{turn.raw_tokens}→{turn.sent_tokens} tok",
+                "\033[90m",
+            )
+        return out
+
+
+def history_processor_kwargs(processor: HistoryCompactor) -> dict[str, Any]:
+    """Agent 构造参数：新版 pydantic-ai 为 ProcessHistory capability，1.x 为 history_processors。"""
+    try:
+        from pydantic_ai.capabilities import ProcessHistory
+    except ImportError:
+        return {"history_processors": [processor]}
+    return {"capabilities": [ProcessHistory(processor)]}
+
+
+def format_context_report(turns: list[ContextTurn]) -> str:
+    if not turns:
+        return ""
+    raw = sum(t.raw_tokens for t in turns)
+    sent = sum(t.sent_tokens for t in turns)
+    per_turn = " | ".join(
+        f"#{t.turn} {t.raw_tokens}→{t.sent_tokens}" + (f"（实际 {t.input_tokens}）" if t.input_tokens else "")
+        for t in turns
+    )
+    saved = 1 - sent / raw if raw else 0.0
+    return f"🗜  外层上下文 | {per_turn} | 合计 ≈{raw}→{sent} tok（省 {saved:.0%}）"
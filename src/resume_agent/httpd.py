@@ -0,0 +1,172 @@
+"""
+极简 HTTP/1.1（仅标准库 asyncio）：解析请求、keep-alive 连接循环、JSON / 字节 / chunked 响应。
+供 resume-serve 任务服务与 bench.fake_llm 替身服务共用，不引入 Web 框架依赖。
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 2 * 1024 * 1024
+# 请求头的行数与总字节上限（单行长度另受 StreamReader 的 limit 约束，默认 64KiB）
+MAX_HEADER_LINES = 100
+MAX_HEADER_BYTES = 16 * 1024
+
+_REASONS = {
+    200: "OK",
+    202: "Accepted",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """路由中抛出即返回对应状态码的 JSON 错误体 {"error": message}。"""
+
+    def __init__(self, status: int, message: str, headers: dict[str, str] | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str] = field(default_factory=dict)
+    headers: dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    def json(self) -> Any:
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError as e:
+            raise HTTPError(400, f"请求体不是合法 JSON: {e}") from e
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+Handler = Callable[[Request, asyncio.StreamWriter], Awaitable[None]]
+
+
+async def _readline(reader: asyncio.StreamReader, status: int, message: str) -> bytes:
+    try:
+        return await reader.readline()
+    except (ValueError, asyncio.LimitOverrunError) as e:
+        # 单行超过 StreamReader 的 limit
+        raise HTTPError(status, message) from e
+
+
+async def read_request(reader: asyncio.StreamReader, max_body: int = MAX_BODY_BYTES) -> Request | None:
+    """读一个请求；连接已关闭返回 None。格式错误 400、请求头过大 431、请求体过大 413。"""
+    request_line = await _readline(reader, 400, "请求行过长")
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _version = request_line.decode("latin-1").split(" ", 2)
+    except ValueError as e:
+        raise HTTPError(400, "请求行格式错误") from e
+    headers: dict[str, str] = {}
+    header_lines = header_bytes = 0
+    while (line := await _readline(reader, 431, "请求头过长")) not in (b"\r\n", b"\n", b""):
+        header_lines += 1
+        header_bytes += len(line)
+        if header_lines > MAX_HEADER_LINES or header_bytes > MAX_HEADER_BYTES:
+            raise HTTPError(431, f"请求头超过 {MAX_HEADER_LINES} 行或 {MAX_HEADER_BYTES} 字节")
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", 0) or 0)
+    except ValueError as e:
+        raise HTTPError(400, "Content-Length 不是整数") from e
+    if length < 0:
+        raise HTTPError(400, "Content-Length 不能为负")
+    if length > max_body:
+        raise HTTPError(413, f"请求体超过 {max_body} 字节")
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+
+
+def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes,
+    content_type: str = "application/json",
+    headers: dict[str, str] | None = None,
+) -> None:
+    head = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        *(f"{k}: {v}" for k, v in (headers or {}).items()),
+    ]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+
+def write_json(
+    writer: asyncio.StreamWriter, status: int, payload: Any, headers: dict[str, str] | None = None
+) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    write_response(writer, status, body, "application/json; charset=utf-8", headers)
+
+
+def start_chunked(writer: asyncio.StreamWriter, status: int, content_type: str) -> None:
+    writer.write(
+        f"HTTP/1.1 {status} {_REASONS.get(status, 'Error')}\r\nContent-Type: {content_type}\r\n"
+        "Cache-Control: no-cache\r\nTransfer-Encoding: chunked\r\n\r\n".encode("latin-1")
+    )
+
+
+def write_chunk(writer: asyncio.StreamWriter, data: bytes) -> None:
+    """写一个 chunk；data 为空即结束标记。"""
+    writer.write(f"{len(data):x}\r\n".encode("latin-1") + data + b"\r\n")
+
+
+async def serve_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, handler: Handler
+) -> None:
+    """keep-alive 循环：逐个读请求交给 handler 写响应；HTTPError 转成 JSON 错误响应，
+    其他异常记日志后返回 500 并关闭连接（handler 可能已写出部分响应，连接不可再复用）。"""
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except HTTPError as e:
+                write_json(writer, e.status, {"error": e.message}, {"Connection": "close", **e.headers})
+                await writer.drain()
+                break
+            if request is None:
+                break
+            try:
+                await handler(request, writer)
+            except HTTPError as e:
+                write_json(writer, e.status, {"error": e.message}, e.headers)
+            except Exception as e:
+                logger.exception("处理 %s %s 失败", request.method, request.path)
+                write_json(writer, 500, {"error": f"{type(e).__name__}: {e}"}, {"Connection": "close"})
+                await writer.drain()
+                break
+            await writer.drain()
+            if not request.keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
@@ -0,0 +1,373 @@
+"""
+JD 语料检索：把成千上万份 JD（目录或 JSONL）建成持久化倒排索引，用 BM25 以用户思绪为查询打分，
+取 top-K 再交给流水线，避免对不相关的岗位花 LLM 调用。
+
+- 分词：技术词典命中（别名归一，见 keywords）+ 词典外英文 token + 中文字符 bigram。
+- 倒排表按词存两条紧凑数组（文档槽位 array('I') / 词频 array('H')），10 万份 JD 单核内存可容；
+  新文档追加槽位，删除只打墓碑，墓碑过多或保存时压实重排。
+- sync(目录 | JSONL) 增量同步：按签名（文件 mtime+大小 / 行内容哈希，jd_path 行另含所指文件的 mtime+大小）
+  只读取并重建变动的文档，源中已消失的文档随之删除。索引只存 JD 的来源位置，正文按需回读。
+- 文档 id 带来源命名空间「<来源名>/<文件名 | 行内 id | jd_path | 正文哈希>」，不同来源的同名文件互不覆盖，
+  JSONL 插入 / 删除行也不会改变其余文档的 id。
+
+    resume-jd index data/jds/            # 或 data/jds.jsonl；再次运行即增量同步
+    resume-jd search --thoughts data/raw_thoughts.md --top 20
+    resume-run --jd-index ~/.cache/resume_agent/jd_index.pkl --top 20   # 直接批量定制 top-K
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import os
+import pickle
+import re
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+
+from .keywords import extract_terms
+from .utils import load_text
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".cache", "resume_agent", "jd_index.pkl")
+JD_SUFFIXES = (".txt", ".md")
+INDEX_VERSION = 2
+K1 = 1.2
+B = 0.75
+# 出现在过半文档中的查询词几乎不区分文档（idf≈0），却最费时，直接跳过
+MAX_DF_RATIO = 0.5
+# 思绪是长文本：只保留 idf·tf 最高的若干查询词（同 Lucene MoreLikeThis），查询耗时与语料规模解耦
+MAX_QUERY_TERMS = 32
+# 墓碑占比超过该值时自动压实
+COMPACT_RATIO = 0.25
+_TF_MAX = 0xFFFF
+_CJK_RUN = re.compile(r"[一-鿿]+")
+
+
+def tokenize(text: str) -> Counter[str]:
+    """词典词 / 英文 token（小写）与中文 bigram 的词频。"""
+    tokens: Counter[str] = Counter({t.lower(): n for t, n in extract_terms(text).items()})
+    for run in _CJK_RUN.findall(text):
+        if len(run) == 1:
+            tokens[run] += 1
+        else:
+            tokens.update(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+@dataclass(frozen=True)
+class DocRef:
+    """JD 正文位置：目录中的文件（offset=-1），或 JSONL 某行的字节偏移。"""
+
+    path: str
+    offset: int = -1
+
+    def read(self) -> str:
+        if self.offset < 0:
+            return load_text(self.path)
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            item = json.loads(f.readline())
+        if "jd" in item:
+            return item["jd"]
+        return load_text(os.path.join(os.path.dirname(self.path), item["jd_path"]))
+
+
+@dataclass
+class SearchHit:
+    doc_id: str
+    score: float
+    ref: DocRef | None
+
+    def read(self) -> str:
+        if self.ref is None:
+            raise ValueError(f"{self.doc_id}: 索引中没有记录来源，无法读取 JD 正文")
+        return self.ref.read()
+
+
+class JDIndex:
+    """BM25 倒排索引；文档以外部 id（字符串）寻址，同 id 再次加入即覆盖。"""
+
+    def __init__(self) -> None:
+        self._ids: list[str | None] = []  # 槽位 → id（None 为墓碑）
+        self._lengths = array("I")
+        self._refs: list[DocRef | None] = []
+        self._slots: dict[str, int] = {}
+        self._signatures: dict[str, str] = {}
+        self._roots: dict[str, str] = {}  # id → 来源（目录 / JSONL 的绝对路径）
+        self._namespaces: dict[str, str] = {}  # 来源 → id 前缀
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._total_length = 0
+        self._norms: list[float] | None = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    @property
+    def tombstones(self) -> int:
+        return len(self._ids) - len(self._slots)
+
+    def add(
+        self,
+        doc_id: str,
+        text: str,
+        ref: DocRef | None = None,
+        *,
+        signature: str = "",
+        root: str = "",
+    ) -> None:
+        if doc_id in self._slots:
+            self.remove(doc_id)
+        slot = len(self._ids)
+        tokens = tokenize(text)
+        for term, tf in tokens.items():
+            entry = self._postings.get(term)
+            if entry is None:
+                entry = self._postings[term] = (array("I"), array("H"))
+            entry[0].append(slot)
+            entry[1].append(min(tf, _TF_MAX))
+        length = sum(tokens.values())
+        self._ids.append(doc_id)
+        self._lengths.append(length)
+        self._refs.append(ref)
+        self._slots[doc_id] = slot
+        self._signatures[doc_id] = signature
+        self._roots[doc_id] = root
+        self._total_length += length
+        self._norms = None
+
+    def remove(self, doc_id: str) -> bool:
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+        self._ids[slot] = None
+        self._refs[slot] = None
+        self._total_length -= self._lengths[slot]
+        self._signatures.pop(doc_id, None)
+        self._roots.pop(doc_id, None)
+        self._norms = None
+        if self.tombstones > COMPACT_RATIO * max(1, len(self._ids)):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """去掉墓碑并重排槽位（倒排表中墓碑会拉高 df、拖慢查询）。"""
+        if not self.tombstones:
+            return
+        remap = array("i", [-1]) * len(self._ids)
+        live = [slot for slot, doc_id in enumerate(self._ids) if doc_id is not None]
+        for new, old in enumerate(live):
+            remap[old] = new
+        postings: dict[str, tuple[array, array]] = {}
+        for term, (slots, tfs) in self._postings.items():
+            kept = [(remap[s], tf) for s, tf in zip(slots, tfs) if remap[s] >= 0]
+            if kept:
+                postings[term] = (array("I", (s for s, _ in kept)), array("H", (tf for _, tf in kept)))
+        self._postings = postings
+        self._ids = [self._ids[s] for s in live]
+        self._lengths = array("I", (self._lengths[s] for s in live))
+        self._refs = [self._refs[s] for s in live]
+        self._slots = {doc_id: slot for slot, doc_id in enumerate(self._ids)}
+        self._norms = None
+
+    def _length_norms(self) -> list[float]:
+        """每个槽位的 BM25 长度归一项 k1·(1 − b + b·dl/avgdl)；索引变动前可复用。"""
+        if self._norms is None:
+            avgdl = self._total_length / max(1, len(self._slots)) or 1.0
+            self._norms = [K1 * (1 - B + B * dl / avgdl) for dl in self._lengths]
+        return self._norms
+
+    def search(self, query: str, k: int = 20) -> list[SearchHit]:
+        """以 query（通常是用户思绪）对全部文档打 BM25 分，返回前 k 个（分数降序）。"""
+        n = len(self._slots)
+        if not n:
+            return []
+        weighted = []
+        for term, qtf in tokenize(query).items():
+            entry = self._postings.get(term)
+            if entry is None or len(entry[0]) > MAX_DF_RATIO * n:
+                continue
+            df = len(entry[0])
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            weighted.append((idf * (K1 + 1) * (1 + math.log(qtf)), term))
+        norms = self._length_norms()
+        scores = [0.0] * len(self._ids)
+        for w, term in heapq.nlargest(MAX_QUERY_TERMS, weighted):
+            slots, tfs = self._postings[term]
+            for slot, tf in zip(slots, tfs):
+                scores[slot] += w * tf / (tf + norms[slot])
+        ids = self._ids
+        top = heapq.nlargest(
+            k, ((s, slot) for slot, s in enumerate(scores) if s > 0 and ids[slot] is not None)
+        )
+        return [SearchHit(ids[slot], round(s, 4), self._refs[slot]) for s, slot in top]
+
+    def sync(self, source: str) -> tuple[int, int, int]:
+        """增量同步目录（每个 .txt/.md 一份）或 JSONL（每行 {id?, jd | jd_path}）。
+
+        返回 (新增, 更新, 删除) 数；签名未变的文档不重新分词。
+        """
+        root = os.path.abspath(source)
+        entries = _scan_dir(root) if os.path.isdir(root) else _scan_jsonl(root)
+        namespace = self._namespace(root)
+        added = updated = 0
+        seen: set[str] = set()
+        for key, signature, ref, text in entries:
+            doc_id = f"{namespace}/{key}"
+            seen.add(doc_id)
+            if self._signatures.get(doc_id) == signature and self._roots.get(doc_id) == root:
+                # 内容未变，但 JSONL 前面插入 / 删除行后字节偏移会变
+                self._refs[self._slots[doc_id]] = ref
+                continue
+            if doc_id in self._slots:
+                updated += 1
+            else:
+                added += 1
+            self.add(doc_id, text() if callable(text) else text, ref, signature=signature, root=root)
+        gone = [doc_id for doc_id, r in self._roots.items() if r == root and doc_id not in seen]
+        for doc_id in gone:
+            self.remove(doc_id)
+        return added, updated, len(gone)
+
+    def _namespace(self, root: str) -> str:
+        """来源的 id 前缀：默认为目录 / 文件名，与已登记的其他来源重名时加路径哈希。"""
+        namespace = self._namespaces.get(root)
+        if namespace is None:
+            namespace = os.path.splitext(os.path.basename(root))[0] or "jd"
+            if namespace in self._namespaces.values():
+                namespace = f"{namespace}-{hashlib.sha1(root.encode()).hexdigest()[:8]}"
+            self._namespaces[root] = namespace
+        return namespace
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "documents": len(self._slots),
+            "terms": len(self._postings),
+            "postings": sum(len(s) for s, _ in self._postings.values()),
+            "tombstones": self.tombstones,
+        }
+
+    def save(self, path: str = DEFAULT_INDEX_PATH) -> None:
+        """压实后整体写入（先写临时文件再原子替换）。"""
+        self.compact()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        state = {
+            "version": INDEX_VERSION,
+            "ids": self._ids,
+            "lengths": self._lengths,
+            "refs": [(r.path, r.offset) if r else None for r in self._refs],
+            "signatures": self._signatures,
+            "roots": self._roots,
+            "namespaces": self._namespaces,
+            "postings": self._postings,
+        }
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_INDEX_PATH) -> "JDIndex":
+        """读取本机 save() 写出的索引（pickle，仅加载自己生成的文件）；不存在则返回空索引。"""
+        index = cls()
+        if not os.path.exists(path):
+            return index
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != INDEX_VERSION:
+            raise ValueError(f"索引版本不兼容（{state.get('version')} ≠ {INDEX_VERSION}），请删除 {path} 后重建")
+        index._ids = state["ids"]
+        index._lengths = state["lengths"]
+        index._refs = [DocRef(*r) if r else None for r in state["refs"]]
+        index._signatures = state["signatures"]
+        index._roots = state["roots"]
+        index._namespaces = state["namespaces"]
+        index._postings = state["postings"]
+        index._slots = {doc_id: slot for slot, doc_id in enumerate(index._ids) if doc_id is not None}
+        index._total_length = sum(index._lengths[s] for s in index._slots.values())
+        return index
+
+
+def _scan_dir(root: str):
+    for name in sorted(os.listdir(root)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in JD_SUFFIXES:
+            continue
+        path = os.path.join(root, name)
+        st = os.stat(path)
+        yield stem, f"{st.st_mtime_ns}:{st.st_size}", DocRef(path), lambda p=path: load_text(p)
+
+
+def _scan_jsonl(path: str):
+    """逐行产出 (id, 签名, 位置, 正文或惰性读取)；无 id 时以 jd_path 或正文哈希为 id，不用行号。"""
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f"JD 语料不存在: {path}")
+    base_dir = os.path.dirname(path)
+    offset = 0
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f, start=1):
+            start, offset = offset, offset + len(line)
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            signature = hashlib.sha1(line).hexdigest()
+            if "jd" in item:
+                text = item["jd"]
+                key = item.get("id") or hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+            elif "jd_path" in item:
+                jd_path = os.path.join(base_dir, item["jd_path"])
+                st = os.stat(jd_path)
+                signature += f":{st.st_mtime_ns}:{st.st_size}"
+                text = lambda p=jd_path: load_text(p)
+                key = item.get("id") or item["jd_path"]
+            else:
+                raise ValueError(f"{path}:{lineno} 缺少 jd 或 jd_path 字段")
+            yield str(key), signature, DocRef(path, start), text
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="JD 语料索引与检索（BM25）")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="索引文件路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_index = sub.add_parser("index", help="增量同步目录或 JSONL 到索引")
+    p_index.add_argument("sources", nargs="+")
+    p_remove = sub.add_parser("remove", help="按 id 删除文档")
+    p_remove.add_argument("ids", nargs="+")
+    p_search = sub.add_parser("search", help="以用户思绪检索 top-K 岗位")
+    p_search.add_argument("--thoughts", default="data/raw_thoughts.md")
+    p_search.add_argument("--top", type=int, default=20)
+    p_search.add_argument("--jobs-out", help="写出 JSONL 任务文件（可直接 resume-run --jobs-file）")
+    sub.add_parser("stats", help="索引规模")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = JDIndex.load(args.index)
+    if args.command == "index":
+        for source in args.sources:
+            added, updated, removed = index.sync(source)
+            print(f"📚 {source}: 新增 {added} / 更新 {updated} / 删除 {removed}")
+        index.save(args.index)
+    elif args.command == "remove":
+        removed = sum(index.remove(doc_id) for doc_id in args.ids)
+        index.save(args.index)
+        print(f"🗑 删除 {removed} 份")
+    elif args.command == "search":
+        hits = index.search(load_text(args.thoughts), args.top)
+        for rank, hit in enumerate(hits, start=1):
+            print(f"{rank:>3}. {hit.score:>8.3f}  {hit.doc_id}")
+        if args.jobs_out:
+            with open(args.jobs_out, "w", encoding="utf-8") as f:
+                for hit in hits:
+                    f.write(json.dumps({"id": hit.doc_id, "jd": hit.read(), "score": hit.score}, ensure_ascii=False) + "\n")
+            print(f"👉 {args.jobs_out}")
+    print(f"⏱ {time.perf_counter() - started:.2f}s | {index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
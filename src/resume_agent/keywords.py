@@ -0,0 +1,217 @@
+"""
+本地 JD 关键词比对：毫秒级算出 JD 技术词在 skills / matched_skills / bullets 中的覆盖率，
+产出与 ResumeCritique 兼容的部分结果。
+
+- 抽词：技术词典（中英混排，含别名归一，如 k8s → Kubernetes）；英文按 token / 多词术语查词典，
+  中文按字符 n-gram 最长匹配查词典，均为哈希查找；词典外的英文 token 作为弱候选。
+- 门控（见 steps.run_critique）：覆盖率明显偏高、skills 均可在思绪中找到、bullet 无 STAR 标签时
+  跳过 LLM 评审；否则照常评审，并把本地算出的缺失词交给精修。
+"""
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .models import Resume, ResumeCritique
+
+# 覆盖率达到该值且 JD 词数足够时跳过 LLM 评审（折算分数需高于 steps.REFINE_SCORE_CUTOFF）
+SKIP_COVERAGE = 0.9
+MIN_JD_TERMS = 6
+# 词典外英文 token 的权重（可能是产品名，也可能是普通英文词）
+_WEAK_WEIGHT = 0.5
+
+TECH_TERMS = (
+    # 语言
+    "Python", "Java", "Go", "C++", "C#", "Rust", "Kotlin", "Scala", "Swift", "JavaScript",
+    "TypeScript", "PHP", "Ruby", "Lua", "Shell", "SQL", "HTML", "CSS",
+    # 后端 / 框架
+    "Spring", "Spring Boot", "Spring Cloud", "MyBatis", "Django", "Flask", "FastAPI", "Gin",
+    "Node.js", "Express", "Netty", "Dubbo", "gRPC", "Thrift", "GraphQL", "React", "Vue", "Angular",
+    "Next.js", "Flutter", "Android", "iOS", "Electron", "Pydantic", "asyncio", "Celery",
+    # 存储 / 中间件
+    "MySQL", "PostgreSQL", "Oracle", "SQLite", "MongoDB", "Redis", "Memcached", "Elasticsearch",
+    "ClickHouse", "HBase", "Cassandra", "TiDB", "Doris", "Hive", "Kafka", "RabbitMQ", "RocketMQ",
+    "Pulsar", "Zookeeper", "etcd", "Nginx", "MinIO", "S3",
+    # 大数据 / AI
+    "Hadoop", "Spark", "Flink", "Airflow", "Presto", "Trino", "PyTorch", "TensorFlow", "Keras",
+    "scikit-learn", "Pandas", "NumPy", "CUDA", "Triton", "vLLM", "LangChain", "LlamaIndex",
+    "Transformers", "LLM", "RAG", "Agent", "Prompt", "OCR", "Embedding",
+    # 云 / 运维
+    "Docker", "Kubernetes", "Helm", "Istio", "Prometheus", "Grafana", "Jenkins", "Terraform",
+    "Ansible", "AWS", "GCP", "Azure", "阿里云", "腾讯云", "Linux", "Git", "CI/CD",
+    # 中文术语
+    "微服务", "分布式", "高并发", "高可用", "消息队列", "缓存", "数据库", "分库分表", "负载均衡",
+    "容器化", "云原生", "服务治理", "链路追踪", "性能优化", "架构设计", "系统设计", "数据仓库",
+    "数据治理", "实时计算", "离线计算", "流式计算", "推荐系统", "搜索引擎", "广告系统", "风控",
+    "机器学习", "深度学习", "强化学习", "自然语言处理", "计算机视觉", "大模型", "知识图谱",
+    "向量检索", "多模态", "微调", "推理加速", "前端", "后端", "全栈", "小程序",
+    "支付", "电商", "物联网", "GIS", "自动化测试", "单元测试", "DevOps", "SRE",
+)
+ALIASES = {
+    "k8s": "Kubernetes",
+    "golang": "Go",
+    "postgres": "PostgreSQL",
+    "js": "JavaScript",
+    "ts": "TypeScript",
+    "nodejs": "Node.js",
+    "springboot": "Spring Boot",
+    "es": "Elasticsearch",
+    "sklearn": "scikit-learn",
+    "torch": "PyTorch",
+    "大语言模型": "大模型",
+    "mq": "消息队列",
+    "nlp": "自然语言处理",
+}
+_STOPWORDS = frozenset(
+    "a an and or the of to in on for with by as at is are be we you our your from this that it "
+    "etc e g i e vs api apis jd hr ok team years year plus".split()
+)
+_STAR_LABEL = re.compile(r"(?:Situation|Task|Action|Result)\s*[:：]|(?:情境|任务|行动|结果)\s*[:：]", re.I)
+_TOKEN = re.compile(r"[a-z][a-z0-9]*(?:[.+#/\-][a-z0-9]+)*[+#]*|[一-鿿]+")
+_CJK = re.compile(r"[一-鿿]")
+
+
+def squash(text: str) -> str:
+    """去空白并小写，用于中英文混排文本的子串比较。"""
+    return "".join(text.split()).lower()
+
+
+def _bigrams(text: str) -> set[str]:
+    return {text[i : i + 2] for i in range(len(text) - 1)} or {text}
+
+
+def grounded_in(text: str, raw_thoughts: str, min_overlap: float = 0.5) -> bool:
+    """text 的字符二元组至少 min_overlap 出现在思绪中：容忍改写语序 / 增删修饰词，凭空新造的名称不过。"""
+    grams = _bigrams(squash(text))
+    thoughts = squash(raw_thoughts)
+    return sum(g in thoughts for g in grams) >= min_overlap * len(grams)
+
+
+@lru_cache(maxsize=1)
+def _lexicon() -> tuple[dict[str, str], re.Pattern[str], int]:
+    """(小写形式 → 规范名, 多词英文术语正则, 中文术语最大字数)。"""
+    canonical = {t.lower(): t for t in TECH_TERMS}
+    canonical.update(ALIASES)
+    multi = sorted((t for t in canonical if " " in t), key=len, reverse=True)
+    bodies = (r"\s*".join(map(re.escape, t.split())) for t in multi)
+    multi_re = re.compile("|".join(rf"(?<![a-z0-9]){body}(?![a-z0-9])" for body in bodies))
+    max_cjk = max(len(t) for t in canonical if _CJK.search(t))
+    return canonical, multi_re, max_cjk
+
+
+def extract_terms(text: str) -> Counter[str]:
+    """词典命中（规范名）+ 词典外英文 token（小写）的出现次数。
+
+    英文按 token（及多词术语）查词典；中文连续段按字符 n-gram 自左向右最长匹配查词典。
+    """
+    canonical, multi, max_cjk = _lexicon()
+    terms: Counter[str] = Counter()
+
+    def _multi(m: re.Match[str]) -> str:
+        terms[canonical[" ".join(m.group().split())]] += 1
+        return " "
+
+    def _latin(token: str) -> None:
+        if token in canonical:
+            terms[canonical[token]] += 1
+        elif "/" in token:
+            for part in filter(None, token.split("/")):
+                _latin(part)
+        elif token not in _STOPWORDS and len(token) >= 2:
+            terms[token] += 1
+
+    for token in _TOKEN.findall(multi.sub(_multi, text.lower())):
+        if not _CJK.match(token):
+            _latin(token)
+            continue
+        i = 0
+        while i < len(token):
+            for size in range(min(max_cjk, len(token) - i), 1, -1):
+                term = canonical.get(token[i : i + size])
+                if term is not None:
+                    terms[term] += 1
+                    i += size
+                    break
+            else:
+                i += 1
+    return terms
+
+
+@dataclass
+class KeywordReport:
+    terms: list[str]  # JD 关键词，按权重降序
+    matched: list[str]
+    missing: list[str]
+    coverage: float  # 加权覆盖率 0–1
+    # 缺失词中在用户思绪里出现过的（精修可据实补上）
+    missing_in_thoughts: list[str] = field(default_factory=list)
+    # 思绪中找不到的 skills（疑似捏造）
+    unsupported_skills: list[str] = field(default_factory=list)
+    star_labels: bool = False
+    elapsed_ms: float = 0.0
+
+    @property
+    def confident(self) -> bool:
+        """本地结论足以代替 LLM 评审：JD 词够多、覆盖率高、无捏造技能与 STAR 标签。"""
+        return (
+            len(self.terms) >= MIN_JD_TERMS
+            and self.coverage >= SKIP_COVERAGE
+            and not self.unsupported_skills
+            and not self.star_labels
+        )
+
+    def to_critique(self) -> ResumeCritique:
+        needs_revision = not self.confident
+        return ResumeCritique(
+            critique=(
+                f"本地关键词比对：JD 关键词覆盖 {self.coverage:.0%}（{len(self.matched)}/{len(self.terms)}）"
+                + (f"；未覆盖：{', '.join(self.missing[:8])}" if self.missing else "")
+            ),
+            missing_keywords=self.missing,
+            score=round(self.coverage * 100),
+            needs_revision=needs_revision,
+        )
+
+
+def match_keywords(jd_text: str, resume: Resume, raw_thoughts: str = "") -> KeywordReport:
+    """JD 关键词在 skills / matched_skills / bullets 中的覆盖；raw_thoughts 用于捏造与可补充判断。"""
+    started = time.perf_counter()
+    jd = extract_terms(jd_text)
+    names = set(_lexicon()[0].values())
+    # 词典词权重 1、词典外弱候选 0.5；JD 中反复出现的词略加权（封顶 3 次）
+    weights = {
+        t: (1.0 if t in names else _WEAK_WEIGHT) * (1 + math.log(min(n, 3))) for t, n in jd.items()
+    }
+    fields = [*resume.skills]
+    for project in resume.experience:
+        fields.extend(project.matched_skills)
+        fields.extend(project.optimized_bullets)
+    have = set(extract_terms("\n".join(fields)))
+    have.update(squash(s) for s in fields)
+    terms = sorted(weights, key=lambda t: (-weights[t], t))
+    # have 为集合：逐词判定 O(1)，整体与 JD 词数线性
+    matched = [t for t in terms if t in have]
+    missing = [t for t in terms if t not in have]
+    total = sum(weights.values())
+    thought_terms = set(extract_terms(raw_thoughts)) if raw_thoughts else set()
+    thoughts = squash(raw_thoughts)
+    return KeywordReport(
+        terms=terms,
+        matched=matched,
+        missing=missing,
+        coverage=sum(weights[t] for t in matched) / total if total else 0.0,
+        missing_in_thoughts=[t for t in missing if t in thought_terms],
+        unsupported_skills=(
+            [s for s in resume.skills if squash(s) not in thoughts and not set(extract_terms(s)) & thought_terms]
+            if raw_thoughts
+            else []
+        ),
+        star_labels=any(
+            _STAR_LABEL.search(b) for p in resume.experience for b in p.optimized_bullets
+        ),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
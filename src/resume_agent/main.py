@@ -1,8 +1,154 @@
+"""
+CLI 入口。重依赖（pydantic-ai / openai 的 LLM 栈、Playwright、Jinja）只在用到的分支里导入：
+--help 与参数错误秒回，--from-json 仅重渲染不加载 LLM 栈；预算见 bench.imports。
+"""
+from __future__ import annotations
+
 import os
 import argparse
-from dotenv import load_dotenv
-from .core import ResumeAgent
-from .utils import load_text, save_as_html, save_as_pdf
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from .resilience import CallPolicy, set_call_policy
+from .tracing import get_tracer
+
+if TYPE_CHECKING:
+    from .core import ResumeAgent
+
+
+async def _run_batch(raw_thoughts: str, args) -> None:
+    from .batch import load_jobs_from_dir, load_jobs_from_file, load_jobs_from_index, run_batch_async
+    from .browser_pool import shutdown_browser_pool
+    from .core import ResumeAgent
+    from .model_factory import close_model_clients
+
+    if args.jd_index:
+        jobs = load_jobs_from_index(args.jd_index, raw_thoughts, args.top, args.template)
+        print(f"🔎 从 JD 索引按相关度取前 {len(jobs)} 份: {', '.join(j.job_id for j in jobs[:5])}…")
+    elif args.jd_dir:
+        jobs = load_jobs_from_dir(args.jd_dir, args.template)
+    else:
+        jobs = load_jobs_from_file(args.jobs_file, args.template)
+    print(f"📦 批量模式：{len(jobs)} 份 JD，并发 {args.concurrency}")
+    agent = ResumeAgent(model=args.model)
+    try:
+        results = await run_batch_async(
+            jobs,
+            raw_thoughts,
+            args.model,
+            agent.prompts,
+            args.output_dir,
+            max_concurrency=args.concurrency,
+            export_pdf=not args.no_pdf,
+            status=lambda m, c: agent._emit_status(m, c),
+            deadline_s=args.deadline,
+            resume=args.resume,
+            n_drafts=args.drafts,
+            draft_temperatures=args.draft_temperatures,
+        )
+    finally:
+        await shutdown_browser_pool()
+        await close_model_clients()
+    ok = sum(r.ok for r in results)
+    print(f"🎉 批量完成：成功 {ok} / 失败 {len(results) - ok}\n👉 {os.path.join(args.output_dir, 'manifest.json')}")
+
+
+async def _build_and_export(agent: ResumeAgent, raw_thoughts: str, jd_text: str, args) -> str | None:
+    """同一事件循环内完成生成与导出；PDF 由最终一轮版面校验的页面直接打印。"""
+    from .browser_pool import shutdown_browser_pool
+    from .model_factory import close_model_clients
+    from .utils import save_build_async
+
+    try:
+        build = await agent.build_resume_artifacts_async(
+            raw_thoughts,
+            jd_text,
+            template_name=args.template,
+            export_pdf=not args.no_pdf,
+            stream=args.stream,
+            deadline_s=args.deadline,
+            checkpoint=args.checkpoint,
+            resume_from=args.resume_from,
+            n_drafts=args.drafts,
+            draft_temperatures=args.draft_temperatures,
+        )
+
+        # 打印最终匹配分
+        print(f"🎯 最终简历 JD 匹配分: {build.resume.match_score}/100")
+
+        # 落盘 HTML / JSON / PDF（PDF、JSON 可选）
+        try:
+            paths = await save_build_async(
+                build, args.output, write_pdf=not args.no_pdf, write_json=not args.no_json
+            )
+        except Exception as e:
+            print(f"⚠️ PDF 生成出错: {e}")
+            if "playwright" in str(e).lower():
+                print("💡 请尝试运行: playwright install")
+            return None
+        if "pdf" in paths:
+            print(f"🎉 简历生成成功！\n👉 {os.path.relpath(paths['pdf'])}")
+        return paths.get("pdf")
+    finally:
+        await shutdown_browser_pool()
+        await close_model_clients()
+
+
+async def _rerender(args) -> None:
+    """--from-json：跳过 LLM，已保存的 Resume JSON 直接渲染 / 校验 / 出 PDF（目录则整批）。"""
+    from .browser_pool import shutdown_browser_pool
+    from .rerender import rerender_file_async, rerender_many_async
+
+    started = time.perf_counter()
+    try:
+        if os.path.isdir(args.from_json):
+            results = await rerender_many_async(
+                args.from_json,
+                args.output_dir,
+                args.template,
+                export_pdf=not args.no_pdf,
+                max_concurrency=args.concurrency,
+                status=lambda m, c: print(f"{c}{m}\033[0m"),
+            )
+        else:
+            results = await rerender_file_async(
+                args.from_json, args.output, args.template, export_pdf=not args.no_pdf
+            )
+            for r in results:
+                print(f"✅ {r.template_name}（{r.layout_status.value}）👉 {os.path.relpath(r.pdf_path or r.html_path)}")
+    finally:
+        await shutdown_browser_pool()
+    ok = sum(r.error is None for r in results)
+    print(f"🎨 重渲染完成：{ok} 份成功 / {len(results) - ok} 份失败，用时 {time.perf_counter() - started:.1f}s")
+
+
+def _print_cache_stats() -> None:
+    from .step_cache import get_step_cache
+
+    cache = get_step_cache()
+    if cache.enabled and cache.hits + cache.misses:
+        print(f"💾 步骤缓存：命中 {cache.hits} / 未命中 {cache.misses}")
+
+
+def _print_layout_stats() -> None:
+    from .tools.layout_estimator import format_estimator_stats
+
+    line = format_estimator_stats()
+    if line:
+        print(line)
+
+
+def _finish_profile(args) -> None:
+    tracer = get_tracer()
+    tracer.shutdown()
+    if not args.profile:
+        return
+    tracer.write(args.profile)
+    top = list(tracer.summary().items())[:6]
+    print(f"📊 Profile 已写入 {args.profile}（chrome://tracing / Perfetto 可打开）")
+    for name, s in top:
+        print(f"   {name:<24} ×{s['count']:<3} 合计 {s['total_ms']:.0f}ms  p50 {s['p50_ms']:.0f}ms  p95 {s['p95_ms']:.0f}ms")
 
 
 def main():
@@ -11,13 +157,86 @@ def main():
     parser.add_argument("--jd", default="data/target_jd.txt", help="包含目标职位描述 (JD) 的文本文件路径")
     parser.add_argument("--output", default="output/tailored_resume.html", help="生成的 HTML 简历保存路径")
     parser.add_argument("--model", default="deepseek-chat", help="使用的 LLM 模型 (默认: deepseek-chat)")
-    parser.add_argument("--template", default="swiss_single_column.html", help="使用的 HTML 模板名称 (例如: modern_two_column.html)")
+    parser.add_argument("--template", default="swiss_single_column.html", help="使用的 HTML 模板名称 (例如: modern_two_column.html)；auto 为并发校验全部模板后自动选择；--from-json 时还可逗号分隔多个或 all")
+    batch = parser.add_mutually_exclusive_group()
+    batch.add_argument("--from-json", metavar="PATH", help="仅重渲染：已保存的 Resume JSON（或其目录，产物写到 --output-dir）直接出 HTML/PDF，不调用 LLM")
+    batch.add_argument("--jd-dir", help="批量模式：目录下每个 .txt/.md 为一份 JD")
+    batch.add_argument("--jobs-file", help="批量模式：JSONL 任务文件，每行 {id, jd | jd_path, template}")
+    batch.add_argument("--jd-index", help="批量模式：从 JD 语料索引（resume-jd index 建立）按与思绪的相关度取前 --top 份")
+    parser.add_argument("--top", type=int, default=20, help="--jd-index 时取的岗位数")
+    parser.add_argument("--output-dir", default="output/batch", help="批量模式产物目录（含 manifest.json）")
+    parser.add_argument("--concurrency", type=int, default=4, help="批量模式并发任务数")
+    parser.add_argument("--no-cache", action="store_true", help="绕过 LLM 步骤结果缓存（强制重新调用模型）")
+    parser.add_argument("--no-pdf", action="store_true", help="不导出 PDF（只写 HTML/JSON）")
+    parser.add_argument("--no-json", action="store_true", help="不保存最终 Resume JSON")
+    parser.add_argument("--stream", action="store_true", help="初稿/精修流式输出：实时显示进度并提前预估版面")
+    parser.add_argument("--drafts", type=int, default=1, help="并发起草的候选份数（best-of-N）：各自评审后择优，多半可免去精修")
+    parser.add_argument(
+        "--draft-temperatures",
+        type=lambda s: [float(t) for t in s.split(",") if t.strip()],
+        help="候选的采样温度，逗号分隔、按候选循环取用（如 0.3,0.7,1.0；默认用模型默认值）",
+    )
+    parser.add_argument("--full-refine", action="store_true", help="精修始终整份重写（默认只输出补丁并本地应用）")
+    parser.add_argument("--profile", metavar="TRACE_JSON", help="记录各阶段 span 并写出 JSON trace（含 p50/p95 汇总）")
+    parser.add_argument("--llm-timeout", type=float, help="单次 LLM 调用超时秒数（默认 120，或 RESUME_AGENT_LLM_TIMEOUT_S）")
+    parser.add_argument("--retries", type=int, help="可重试错误（超时、429、5xx、连接错误）的重试次数（默认 2）")
+    parser.add_argument("--hedge", action="store_true", help="对冲请求：超过该步骤历史 p90 仍未返回时再发一路，取先返回者")
+    parser.add_argument("--deadline", type=float, help="每份简历的整体截止秒数；到点交付当前最好的版本")
+    parser.add_argument("--checkpoint", metavar="PATH", help="每个阶段完成后写检查点（批量模式固定写在 <output-dir>/checkpoints/）")
+    parser.add_argument("--resume-from", metavar="PATH", help="从检查点的首个未完成阶段继续（模型 / prompt / 输入变化时拒绝复用）")
+    parser.add_argument("--resume", action="store_true", help="批量模式：已有检查点的任务从中断处继续")
+    parser.add_argument("--otel", action="store_true", help="同时导出到 OpenTelemetry（需安装 resume-agent[otel]）")
     
     args = parser.parse_args()
+    from dotenv import load_dotenv
+
+    from .step_cache import get_step_cache
+    from .utils import load_text
+
     load_dotenv()
+    if args.no_cache:
+        get_step_cache().enabled = False
+    if args.full_refine:
+        os.environ["RESUME_AGENT_REFINE_MODE"] = "full"
+    policy = CallPolicy.from_env()
+    if args.llm_timeout is not None:
+        policy.timeout_s = args.llm_timeout
+    if args.retries is not None:
+        policy.max_retries = max(0, args.retries)
+    policy.hedge = policy.hedge or args.hedge
+    set_call_policy(policy)
+    if args.profile:
+        get_tracer().start()
+    if args.otel:
+        try:
+            get_tracer().enable_otel()
+        except RuntimeError as e:
+            print(f"⚠️ {e}")
     
+    if args.from_json:
+        try:
+            asyncio.run(_rerender(args))
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+        _print_layout_stats()
+        _finish_profile(args)
+        return
+
     print(f"🚀 Resume Agent 启动 (Model: {args.model} | Template: {args.template})")
     
+    if args.jd_dir or args.jobs_file or args.jd_index:
+        try:
+            raw_thoughts = load_text(args.thoughts)
+            asyncio.run(_run_batch(raw_thoughts, args))
+        except (FileNotFoundError, ValueError) as e:
+            print(f"❌ {e}")
+        _print_cache_stats()
+        _print_layout_stats()
+        _finish_profile(args)
+        return
+
+    from .core import ResumeAgent
+
     try:
         raw_thoughts = load_text(args.thoughts)
         jd_text = load_text(args.jd)
@@ -27,32 +246,20 @@ def main():
 
     agent = ResumeAgent(model=args.model)
     try:
-        result = agent.build_resume(raw_thoughts, jd_text, template_name=args.template)
-        
-        # 打印最终匹配分
-        print(f"🎯 最终简历 JD 匹配分: {result.match_score}/100")
-
-        # 1. 保存 HTML (静默)
-        save_as_html(result.model_dump(), args.output, template_name=args.template)
-        
-        # 2. 生成 PDF
-        pdf_path = args.output.replace(".html", ".pdf")
-        try:
-            save_as_pdf(args.output, pdf_path)
-        except Exception as e:
-            print(f"⚠️ PDF 生成出错: {e}")
-            if "playwright" in str(e).lower():
-                print("💡 请尝试运行: playwright install")
+        pdf_path = asyncio.run(_build_and_export(agent, raw_thoughts, jd_text, args))
 
         import webbrowser
         try:
-            target = pdf_path if os.path.exists(pdf_path) else args.output
+            target = pdf_path if pdf_path and os.path.exists(pdf_path) else args.output
             webbrowser.open(f"file://{os.path.abspath(target)}")
         except Exception:
             pass
             
     except Exception as e:
         print(f"❌ 运行中断: {str(e)}")
+    _print_cache_stats()
+    _print_layout_stats()
+    _finish_profile(args)
 
 if __name__ == "__main__":
     main()
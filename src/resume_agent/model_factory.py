@@ -1,16 +1,168 @@
-"""统一构造 OpenAI 兼容 Chat 模型（支持 DeepSeek 等）。"""
+"""
+统一构造 OpenAI 兼容 Chat 模型（支持 DeepSeek 等），并在进程内复用：
+
+- Provider（含其 HTTP 连接池）按 (base_url, api_key, 事件循环) 各建一个，keep-alive 连接跨步骤、
+  跨运行复用，省去重复 TLS 握手；连接池上限 / 空闲保活可经环境变量调整，可选 HTTP/2。
+- 子 Agent（draft / critique / refine / 版面改写）按 (模型, 输出类型, instructions) 缓存，
+  instructions 变更（prompt 版本变化）即自动换新。
+
+服务 / 长驻进程退出前调用 close_model_clients() 关闭连接池。
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
 import os
+import warnings
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
 
+import httpx
+from openai import AsyncOpenAI
+from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
+DEFAULT_BASE_URL = "https://api.deepseek.com"
+# 连接池：批量 / 服务模式下并发请求数通常 ≤ worker 数 × 2（评审与推测步骤并行）
+MAX_CONNECTIONS = int(os.getenv("RESUME_AGENT_HTTP_MAX_CONNECTIONS", "64"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("RESUME_AGENT_HTTP_MAX_KEEPALIVE", "32"))
+# 步骤之间的空档（本地版面校验、排队）通常在几十秒内，保活要比 httpx 默认的 5s 长
+KEEPALIVE_EXPIRY_S = float(os.getenv("RESUME_AGENT_HTTP_KEEPALIVE_S", "90"))
+# 与 pydantic-ai 默认客户端一致：长生成不设读超时上限，连接超时短
+REQUEST_TIMEOUT_S = 600.0
+CONNECT_TIMEOUT_S = 10.0
+MAX_SUB_AGENTS = 128
+
+
+def _http2_enabled() -> bool:
+    if os.getenv("RESUME_AGENT_HTTP2", "") not in ("1", "true", "yes"):
+        return False
+    if importlib.util.find_spec("h2") is None:
+        warnings.warn(
+            "RESUME_AGENT_HTTP2 需要 h2：pip install 'resume-agent[http2]'；已回退 HTTP/1.1",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+        return False
+    return True
+
+
+def _current_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+@dataclass
+class _Client:
+    provider: OpenAIProvider
+    http_client: Any
+    loop: asyncio.AbstractEventLoop | None
+
+
+class ModelRegistry:
+    """进程级模型客户端与子 Agent 缓存。
+
+    HTTP 连接绑定创建时的事件循环，故客户端按循环区分；循环关闭后其条目在下次访问时丢弃。
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[str, str, int], _Client] = {}
+        self._models: dict[tuple[str, str, str, int], OpenAIChatModel] = {}
+        # 键用 id(model)（模型为 dataclass，不可哈希）；Agent 持有模型引用，条目存活期间 id 不会被复用
+        self._agents: OrderedDict[tuple[int, type, str], Agent] = OrderedDict()
+
+    def _prune_closed_loops(self) -> None:
+        dead = {key for key, c in self._clients.items() if c.loop is not None and c.loop.is_closed()}
+        if not dead:
+            return
+        for key in dead:
+            del self._clients[key]
+        stale = [m for k, m in self._models.items() if k[1:] in dead]
+        self._models = {k: m for k, m in self._models.items() if k[1:] not in dead}
+        stale_ids = {id(m) for m in stale}
+        for key in [k for k in self._agents if k[0] in stale_ids]:
+            del self._agents[key]
+
+    def _client(self, base_url: str, api_key: str) -> _Client:
+        loop = _current_loop()
+        key = (base_url, api_key, id(loop))
+        client = self._clients.get(key)
+        if client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_S,
+                ),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT_S, connect=CONNECT_TIMEOUT_S),
+                http2=_http2_enabled(),
+            )
+            # 重试交给 resilience（可计数、受整单截止约束），关闭 SDK 内置的隐式重试
+            openai_client = AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=http_client, max_retries=0
+            )
+            provider = OpenAIProvider(openai_client=openai_client)
+            client = self._clients[key] = _Client(provider, http_client, loop)
+        return client
+
+    def chat_model(self, model_name: str) -> OpenAIChatModel:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise ValueError("请设置环境变量 OPENAI_API_KEY（见 .env.example）")
+        base_url = os.getenv("OPENAI_BASE_URL", DEFAULT_BASE_URL)
+        self._prune_closed_loops()
+        key = (model_name, base_url, api_key, id(_current_loop()))
+        model = self._models.get(key)
+        if model is None:
+            model = OpenAIChatModel(model_name, provider=self._client(base_url, api_key).provider)
+            self._models[key] = model
+        return model
+
+    def sub_agent(self, model: Any, output_type: type, instructions: str) -> Agent:
+        """同模型、同输出类型、同 instructions 的子 Agent 只构造一次（LRU 上限 MAX_SUB_AGENTS）。"""
+        key = (id(model), output_type, instructions)
+        agent = self._agents.get(key)
+        if agent is None:
+            agent = self._agents[key] = Agent(model, output_type=output_type, instructions=instructions)
+            while len(self._agents) > MAX_SUB_AGENTS:
+                self._agents.popitem(last=False)
+        else:
+            self._agents.move_to_end(key)
+        return agent
+
+    def stats(self) -> dict[str, int]:
+        return {"clients": len(self._clients), "models": len(self._models), "sub_agents": len(self._agents)}
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环上的连接池并清空缓存（其他循环的条目随循环关闭丢弃）。"""
+        loop = _current_loop()
+        for key, client in list(self._clients.items()):
+            if client.loop is loop or client.loop is None:
+                await client.http_client.aclose()
+            del self._clients[key]
+        self._models.clear()
+        self._agents.clear()
+
+
+_registry = ModelRegistry()
+
+
+def get_model_registry() -> ModelRegistry:
+    return _registry
+
 
 def create_chat_model(model_name: str) -> OpenAIChatModel:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("请设置环境变量 OPENAI_API_KEY（见 .env.example）")
-    base_url = os.getenv("OPENAI_BASE_URL", "https://api.deepseek.com")
-    return OpenAIChatModel(
-        model_name,
-        provider=OpenAIProvider(api_key=api_key, base_url=base_url),
-    )
+    """同一事件循环内同名模型返回同一实例（共享连接池）。"""
+    return _registry.chat_model(model_name)
+
+
+def get_sub_agent(model: Any, output_type: type, instructions: str) -> Agent:
+    return _registry.sub_agent(model, output_type, instructions)
+
+
+async def close_model_clients() -> None:
+    await _registry.aclose()
@@ -48,3 +48,36 @@ class ResumeCritique(BaseModel):
     missing_keywords: List[str] = Field(..., description="简历中遗漏的 JD 关键技术词")
     score: int = Field(..., description="当前简历质量评分 (0-100)")
     needs_revision: bool = Field(..., description="是否需要重写 (分数<85或有重大遗漏时为True)")
+
+
+class PatchOp(str, Enum):
+    """精修补丁的操作类型（下标均指向输入简历，从 0 起）。"""
+
+    REPLACE_BULLET = "replace_bullet"
+    DROP_BULLET = "drop_bullet"
+    ADD_BULLET = "add_bullet"
+    DROP_PROJECT = "drop_project"
+    RENAME_PROJECT = "rename_project"
+    EDIT_SUMMARY = "edit_summary"
+    REORDER_SKILLS = "reorder_skills"
+
+
+class PatchOperation(BaseModel):
+    op: PatchOp = Field(..., description="操作类型")
+    project_index: Optional[int] = Field(
+        None, description="目标项目在输入简历 experience 中的下标（从 0 起）；edit_summary / reorder_skills 不填"
+    )
+    bullet_index: Optional[int] = Field(
+        None, description="目标 bullet 在该项目 optimized_bullets 中的下标；仅 replace_bullet / drop_bullet 填写"
+    )
+    text: Optional[str] = Field(
+        None, description="replace_bullet / add_bullet 的新 bullet、rename_project 的新名称、edit_summary 的新总结"
+    )
+    skills: Optional[List[str]] = Field(
+        None, description="reorder_skills：调整后的完整技能列表（只能重排或删减已有技能，不得新增）"
+    )
+
+
+class ResumePatch(BaseModel):
+    operations: List[PatchOperation] = Field(..., description="按需的最小修改操作；无需修改时为空列表")
+    match_score: int = Field(..., description="修改后简历与 JD 的匹配度评分 (0-100)")
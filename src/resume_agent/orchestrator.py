@@ -1,26 +1,49 @@
 """
 简历编排：默认「确定性」流程 draft→critique→（按需）一次 refine；
-仍保留 create_resume_agent 供需要 Tool 式交互时使用。
+仍保留 create_resume_agent / run_resume_agent_async 供需要 Tool 式交互时使用。
 """
 from __future__ import annotations
 
 import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Sequence
 
 from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse
+from pydantic_ai.models import Model
 
-from .context import MAX_LAYOUT_RETRIES, ResumeWorkspace, StatusCallback
-from .model_factory import create_chat_model
+from .browser_pool import get_browser_pool, shutdown_browser_pool
+from .checkpoint import Stage, fingerprints, load_checkpoint, save_checkpoint
+from .context import (
+    MAX_LAYOUT_RETRIES,
+    PartialCallback,
+    ResumeBuild,
+    ResumeWorkspace,
+    StatusCallback,
+)
+from .history import HistoryCompactor, format_context_report, history_processor_kwargs
+from .model_factory import close_model_clients, create_chat_model
 from .models import LayoutStatus, Resume
+from .resilience import DeadlineExceeded, format_call_stats, remaining_s
 from .resume_prompts import ResumePrompts
 from .steps import (
+    run_best_of_drafts,
     run_critique,
     run_draft,
     run_refine,
     run_refine_layout,
     should_run_refine,
 )
+from .template_registry import get_template_registry
+from .token_usage import format_token_report
+from .tracing import span
 from .tools import register_resume_tools
-from .tools.layout_validator import validate_html_layout
+from .tools.critique import schedule_review
+from .tools.layout_estimator import check_workspace_layout, estimate_layout
+from .tools.layout_fitter import run_fit_layout
+from .tools.template_selector import AUTO_TEMPLATE, run_select_template
+from .tools.layout_validator import USABLE_CONTENT_PX, LayoutReport
 from .utils import render_html
 
 
@@ -28,25 +51,88 @@ def _silent_status(msg: str, color: str = "") -> None:
     pass
 
 
+def _speculative_layout(
+    template_name: str,
+    status: StatusCallback,
+    on_partial: PartialCallback | None,
+) -> PartialCallback:
+    """流式期间每多完成一个项目经历，就用本地估算器预估一次正文高度（无需等模型写完）。"""
+    seen = {"draft": 0, "refine": 0}
+
+    def _on_partial(step: str, partial: Resume) -> None:
+        if on_partial is not None:
+            on_partial(step, partial)
+        n = len(partial.experience)
+        if n <= seen.get(step, 0):
+            return
+        seen[step] = n
+        est = estimate_layout(partial, template_name)
+        if est is None:
+            return
+        fill = est.inner_height / USABLE_CONTENT_PX
+        status(
+            f"   🔮 预估版面（{step} 已完成 {n} 个项目）| 正文 ≈ {est.inner_height}px，"
+            f"占可用高度 {fill:.0%}",
+            "\033[90m",
+        )
+
+    return _on_partial
+
+
 def create_resume_agent(
     model_name: str,
     prompts: ResumePrompts,
     status: StatusCallback | None = None,
+    model: Model | None = None,
+    compact_history: bool = True,
 ) -> Agent[ResumeWorkspace, Resume]:
+    """Tool 式外层 Agent（deps 为 ResumeWorkspace）。compact_history 时挂上 history.HistoryCompactor：
+    旧工具结果换成工作区摘要并受 token 上限约束，每轮上下文 token 记入 workspace.context_turns。"""
     status = status or _silent_status
-    model = create_chat_model(model_name)
+    model = model or create_chat_model(model_name)
 
     agent = Agent(
         model,
         deps_type=ResumeWorkspace,
         output_type=Resume,
         instructions=prompts.get_orchestrator_instructions(),
+        **(history_processor_kwargs(HistoryCompactor(status)) if compact_history else {}),
     )
     register_resume_tools(agent, model, prompts, status)
     return agent
 
 
-async def build_resume_async(
+async def run_resume_agent_async(
+    workspace: ResumeWorkspace,
+    model_name: str,
+    prompts: ResumePrompts,
+    status: StatusCallback | None = None,
+    model: Model | None = None,
+    compact_history: bool = True,
+) -> Resume:
+    """Tool 模式跑一次外层 Agent：workspace 提供 JD / 思绪 / 模板，运行后保留各步状态。
+
+    结束（含异常）时关闭工作区步骤图：critique_resume 挂起的推测性版面校验不会在运行结束后仍占着浏览器页面。
+    结束后经 status 汇报外层每轮上下文 token（压缩前 → 实际发送，及服务商上报的输入 token）。
+    """
+    status = status or _silent_status
+    agent = create_resume_agent(model_name, prompts, status, model=model, compact_history=compact_history)
+    try:
+        result = await agent.run("按工具顺序为工作区中的 JD 与思绪定制简历。", deps=workspace)
+    finally:
+        await workspace.steps.aclose()
+    turns = workspace.context_turns
+    if turns:
+        # 末轮的输入 token 没有下一轮可回填，取最后一个模型响应的用量
+        last = next(m for m in reversed(result.all_messages()) if isinstance(m, ModelResponse))
+        turns[-1].input_tokens = last.usage.input_tokens
+        status(format_context_report(turns), "\033[90m")
+    if workspace.tokens:
+        status(format_token_report(workspace.tokens), "\033[90m")
+    return result.output
+
+
+async def build_resume_artifacts_async(
     jd_text: str,
     raw_thoughts: str,
     model_name: str,
@@ -54,44 +140,245 @@ async def build_resume_async(
     status: StatusCallback | None = None,
     template_name: str = "swiss_single_column.html",
     max_layout_retries: int = MAX_LAYOUT_RETRIES,
-) -> Resume:
-    """draft → 评审 → 至多一次精修 → Playwright 感知版面循环直至 PERFECT 或达上限。"""
+    model: Model | None = None,
+    export_pdf: bool = True,
+    stream: bool = False,
+    on_partial: PartialCallback | None = None,
+    deadline_s: float | None = None,
+    checkpoint: str | None = None,
+    resume_from: str | None = None,
+    n_drafts: int = 1,
+    draft_temperatures: Sequence[float] | None = None,
+) -> ResumeBuild:
+    """draft → 评审（与初稿版面校验并行）→ 至多一次合并精修 → 版面感知循环（本地估算，临界时
+    Playwright 实测；不达标先本地拟合 bullet，不收敛才 LLM 改写）直至 PERFECT 或达上限。
+    步骤经 workspace.steps 调度，结束时汇报各步耗时。
+
+    传入 model 可在多次运行间复用同一客户端（批量模式）。export_pdf 时最终一轮校验
+    直接在已测页面上打印 PDF（复用测得高度算缩放），省去导出时再开页面加载与测量。
+    stream 时 draft / refine 流式输出：部分 Resume 交给 on_partial，并在生成途中预估版面。
+    template_name="auto" 时在评审同时把初稿渲染到全部模板并发校验，选最合适的模板。
+    deadline_s 为整单截止：LLM 调用不越过它；初稿之后的步骤到点即放弃，交付当前最好的版本。
+    checkpoint 为检查点路径：每个阶段完成后写入；resume_from 从已有检查点的首个未完成阶段继续
+    （指纹不一致抛 CheckpointMismatch），之后的进度写回 checkpoint（缺省即 resume_from）。
+    n_drafts > 1 时并发起草多份候选（draft_temperatures 按候选循环取用），各自写完即评审，
+    择优后多半可免去精修；候选不流式，初稿版面校验改由版面循环首轮完成。
+    """
     status = status or _silent_status
-    model = create_chat_model(model_name)
-    workspace = ResumeWorkspace(jd_text=jd_text, raw_thoughts=raw_thoughts)
+    model = model or create_chat_model(model_name)
+    workspace = ResumeWorkspace(
+        jd_text=jd_text,
+        raw_thoughts=raw_thoughts,
+        template_name=template_name,
+        deadline_at=time.monotonic() + deadline_s if deadline_s else None,
+    )
+    graph = workspace.steps
+    auto = template_name == AUTO_TEMPLATE
+    prints = fingerprints(workspace, model, prompts, template_name)
+    checkpoint = checkpoint or resume_from
+    restored = None
+    if resume_from:
+        restored = load_checkpoint(resume_from)
+        restored.check(prints)
+        restored.restore(workspace)
+        status(
+            f"♻️ 从检查点恢复（已完成 {restored.stage}"
+            + (f"，版面 {restored.layout_attempts} 轮" if restored.stage == "layout" else "")
+            + f"），跳过 {sum(t.requests for t in workspace.tokens.values())} 次 LLM 请求",
+            "\033[95m",
+        )
+
+    def _done(stage: Stage) -> bool:
+        return restored is not None and restored.done(stage)
+
+    # 阶段是线性的：某阶段超时未完成后不再写检查点，否则后续阶段会把它一并记为已完成，续跑时不再重跑
+    incomplete = False
+
+    def _save(stage: Stage, layout_attempts: int = 0) -> None:
+        if checkpoint and not incomplete:
+            save_checkpoint(checkpoint, workspace, prints, stage, layout_attempts)
+
+    def _warm_up_browser() -> None:
+        """Chromium 冷启动与 LLM 调用重叠；只在确实要用浏览器时（出 PDF，或本地估算对初稿无法定论）。
+        预热失败留给版面校验时再报错。"""
+        if "warm_up" in graph.timings:
+            return
+        if not export_pdf:
+            draft = workspace.draft
+            names = get_template_registry().names() if auto else [workspace.template_name]
+            estimates = [estimate_layout(draft, name) for name in names] if draft is not None else [None]
+            if all(est is not None and est.is_decisive() for est in estimates):
+                return
+        graph.add("warm_up", get_browser_pool().warm_up)
+
     status(
-        "🤖 简历生成（draft → 评审 → 按需精修 → 版面感知循环）...",
+        "🤖 简历生成（draft → 评审 ∥ 版面校验 → 按需合并精修 → 版面感知循环）...",
         "\033[95m",
     )
-    await run_draft(workspace, model, prompts, status)
-    await run_critique(workspace, model, prompts, status)
-    if should_run_refine(workspace):
-        await run_refine(workspace, model, prompts, status)
-    assert workspace.draft is not None
 
-    for attempt in range(max_layout_retries):
-        html_content = render_html(workspace.draft.model_dump(), template_name)
-        status(
-            f"📏 版面校验 ({attempt + 1}/{max_layout_retries}) | 模板 {template_name}",
-            "\033[90m",
+    def _pdf_on(attempt: int) -> frozenset[LayoutStatus]:
+        # 只有「PERFECT 即收尾」或「最后一轮」的页面才是最终版，才值得顺手出 PDF
+        if not export_pdf:
+            return frozenset()
+        if attempt == max_layout_retries - 1:
+            return frozenset(LayoutStatus)
+        return frozenset({LayoutStatus.PERFECT})
+
+    partial_cb = _speculative_layout(template_name, status, on_partial) if stream else None
+    report: LayoutReport | None = None
+    html_content = ""
+    with span(
+        "pipeline",
+        model=model.model_name,
+        template=template_name,
+        export_pdf=export_pdf,
+        stream=stream,
+    ) as root:
+        try:
+            if export_pdf:
+                _warm_up_browser()
+            first: tuple[str, LayoutReport] | None = None
+            layout_step: str | None = None
+            if n_drafts > 1 and not _done("draft"):
+                # best-of-N：候选的起草与评审在同一步内完成，评审阶段随之完成
+                await graph.run(
+                    "draft",
+                    lambda: run_best_of_drafts(workspace, model, prompts, status, n_drafts, draft_temperatures),
+                )
+                _save("critique")
+            elif not _done("draft"):
+                await graph.run(
+                    "draft",
+                    lambda: run_draft(workspace, model, prompts, status, stream=stream, on_partial=partial_cb),
+                )
+                _save("draft")
+            _warm_up_browser()
+            if not _done("critique") and workspace.critique is None:
+                # 初稿的首轮版面校验（auto 时为多模板选择）不依赖评审结论，与评审并行
+                layout_step, critique_step = schedule_review(
+                    workspace,
+                    model,
+                    prompts,
+                    status,
+                    pdf_on=_pdf_on(0),
+                    check=(lambda: run_select_template(workspace, status)) if auto else None,
+                )
+                try:
+                    await graph.result(critique_step)
+                    _save("critique")
+                except DeadlineExceeded as e:
+                    status(f"⏰ {e}，跳过评审与精修", "\033[93m")
+                    incomplete = True
+            refine_attempted = not _done("refine") and should_run_refine(workspace)
+            if refine_attempted:
+                # 已完成的版面结论并入精修；尚未完成的校验随初稿作废被取消
+                try:
+                    await graph.run(
+                        "refine",
+                        lambda: run_refine(
+                            workspace, model, prompts, status, stream=stream, on_partial=partial_cb
+                        ),
+                    )
+                except DeadlineExceeded as e:
+                    status(f"⏰ {e}，保留初稿", "\033[93m")
+                    incomplete = True
+            if layout_step is not None and not refine_attempted:
+                first = await graph.result(layout_step)
+            elif auto and not _done("refine"):
+                # 精修后（或精修超时、原校验已被取消、从评审检查点恢复时）重新选模板
+                first = await graph.run(
+                    "select_template", lambda: run_select_template(workspace, status)
+                )
+            if not _done("refine"):
+                _save("refine")
+            # 多模板选择不出 PDF：选中的已是 PERFECT 且需要 PDF 时，在该模板上再校验一次
+            if first is not None and export_pdf and first[1].pdf is None:
+                if first[1].status in _pdf_on(0):
+                    first = None
+
+            start = restored.layout_attempts if _done("layout") else 0
+            for attempt in range(min(start, max_layout_retries - 1), max_layout_retries):
+                status(
+                    f"📏 版面校验 ({attempt + 1}/{max_layout_retries}) | 模板 {workspace.template_name}",
+                    "\033[90m",
+                )
+                if attempt == 0 and first is not None:
+                    html_content, report = first
+                else:
+                    html_content, report = await graph.run(
+                        "layout",
+                        lambda: check_workspace_layout(workspace, pdf_on=_pdf_on(attempt)),
+                        attrs={"attempt": attempt + 1},
+                    )
+                layout_status, feedback_msg = report.status, report.feedback
+                if layout_status == LayoutStatus.PERFECT:
+                    status(f"✅ {feedback_msg}", "\033[92m")
+                    _save("layout", attempt)
+                    break
+                status(f"⚠️ {feedback_msg}", "\033[93m")
+                left = remaining_s(workspace.deadline_at)
+                if left is not None and left <= 0:
+                    status("⏰ 已到整单截止时间，保留当前 JSON。", "\033[93m")
+                    break
+                if attempt < max_layout_retries - 1:
+                    # 先在本地增删 bullet 拟合（毫秒级）；不收敛才请 LLM 改写
+                    fitted = await graph.run(
+                        "fit_layout",
+                        lambda: run_fit_layout(workspace, status, layout_status),
+                        attrs={"attempt": attempt + 1, "layout_status": layout_status.value},
+                    )
+                    if fitted is not None:
+                        # 拟合终点已判定 PERFECT：直接收尾，不再重测同一份 HTML（需要 PDF 时由落盘补打）
+                        html_content, report = fitted
+                        status(f"✅ {report.feedback}", "\033[92m")
+                        _save("layout", attempt + 1)
+                        break
+                    try:
+                        await graph.run(
+                            "refine_layout",
+                            lambda: run_refine_layout(
+                                workspace, model, prompts, status, layout_status, feedback_msg
+                            ),
+                            attrs={"attempt": attempt + 1, "layout_status": layout_status.value},
+                        )
+                    except DeadlineExceeded as e:
+                        status(f"⏰ {e}，保留当前 JSON。", "\033[93m")
+                        break
+                    _save("layout", attempt + 1)
+                else:
+                    status("📏 已达版面重试上限，保留当前 JSON。", "\033[93m")
+                    _save("layout", attempt)
+        finally:
+            await graph.aclose()
+        root.set(
+            template_chosen=workspace.template_name,
+            layout_status=report.status.value if report else None,
+            input_tokens=sum(t.input_tokens for t in workspace.tokens.values()),
+            cached_tokens=sum(t.cached_tokens for t in workspace.tokens.values()),
+            output_tokens=sum(t.output_tokens for t in workspace.tokens.values()),
         )
-        layout_status, feedback_msg = await validate_html_layout(html_content)
-        if layout_status == LayoutStatus.PERFECT:
-            status(f"✅ {feedback_msg}", "\033[92m")
-            break
-        status(f"⚠️ {feedback_msg}", "\033[93m")
-        if attempt < max_layout_retries - 1:
-            await run_refine_layout(
-                workspace, model, prompts, status, layout_status, feedback_msg
-            )
-        else:
-            status("📏 已达版面重试上限，保留当前 JSON。", "\033[93m")
+    status(graph.report(), "\033[90m")
+    if workspace.tokens:
+        status(format_token_report(workspace.tokens), "\033[90m")
+    call_report = format_call_stats(workspace.llm_stats)
+    if call_report:
+        status(call_report, "\033[90m")
 
     assert workspace.draft is not None
-    return workspace.draft
+    if not html_content:
+        html_content = render_html(workspace.draft.model_dump(), workspace.template_name)
+    return ResumeBuild(
+        resume=workspace.draft,
+        template_name=workspace.template_name,
+        html=html_content,
+        layout_status=report.status if report else None,
+        pdf=report.pdf if report else None,
+        tokens=workspace.tokens,
+        llm_stats=workspace.llm_stats,
+    )
 
 
-def build_resume(
+async def build_resume_async(
     jd_text: str,
     raw_thoughts: str,
     model_name: str,
@@ -99,16 +386,125 @@ def build_resume(
     status: StatusCallback | None = None,
     template_name: str = "swiss_single_column.html",
     max_layout_retries: int = MAX_LAYOUT_RETRIES,
+    model: Model | None = None,
+    stream: bool = False,
+    on_partial: PartialCallback | None = None,
+    deadline_s: float | None = None,
+    n_drafts: int = 1,
+    draft_temperatures: Sequence[float] | None = None,
 ) -> Resume:
-    """阻塞运行（内部 asyncio.run）；CLI / 脚本默认用此入口。"""
-    return asyncio.run(
-        build_resume_async(
-            jd_text,
-            raw_thoughts,
-            model_name,
-            prompts,
-            status,
-            template_name=template_name,
-            max_layout_retries=max_layout_retries,
-        )
+    """只要最终 Resume（不出 PDF）；产物落盘见 build_resume_artifacts_async + utils.save_build_async。"""
+    build = await build_resume_artifacts_async(
+        jd_text,
+        raw_thoughts,
+        model_name,
+        prompts,
+        status,
+        template_name=template_name,
+        max_layout_retries=max_layout_retries,
+        model=model,
+        export_pdf=False,
+        stream=stream,
+        on_partial=on_partial,
+        deadline_s=deadline_s,
+        n_drafts=n_drafts,
+        draft_temperatures=draft_temperatures,
     )
+    return build.resume
+
+
+async def build_resume_batch_async(
+    jobs: Sequence[tuple[str, str]],
+    raw_thoughts: str,
+    model_name: str,
+    prompts: ResumePrompts,
+    status: StatusCallback | None = None,
+    max_concurrency: int = 4,
+    max_layout_retries: int = MAX_LAYOUT_RETRIES,
+    export_pdf: bool = True,
+    on_done: Callable[[int, ResumeBuild | BaseException], Awaitable[None]] | None = None,
+    deadline_s: float | None = None,
+    checkpoints: Sequence[str | None] | None = None,
+    resume: bool = False,
+    n_drafts: int = 1,
+    draft_temperatures: Sequence[float] | None = None,
+) -> list[ResumeBuild | BaseException]:
+    """同一份思绪并发定制多份 JD；jobs 为 (jd_text, template_name)。
+
+    共用模型客户端与浏览器池，并发数受 max_concurrency 限制；单个任务失败只记录
+    异常（按序返回在结果列表中），不影响其余任务。on_done 在每个任务完成后调用。
+    deadline_s 为单任务截止（自开始执行计，不含排队）。
+    checkpoints 为各任务的检查点路径；resume 时已有检查点的任务从中断处继续。
+    n_drafts / draft_temperatures 见 build_resume_artifacts_async（每个任务各自 best-of-N）。
+    """
+    status = status or _silent_status
+    model = create_chat_model(model_name)
+    gate = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _one(index: int, jd_text: str, template_name: str) -> ResumeBuild | BaseException:
+        with span("batch.queue_wait", job=index):
+            await gate.acquire()
+        try:
+            return await _run_one(index, jd_text, template_name)
+        finally:
+            gate.release()
+
+    async def _run_one(index: int, jd_text: str, template_name: str) -> ResumeBuild | BaseException:
+        path = checkpoints[index] if checkpoints else None
+        with span("batch.job", job=index):
+            try:
+                result: ResumeBuild | BaseException = await build_resume_artifacts_async(
+                    jd_text,
+                    raw_thoughts,
+                    model_name,
+                    prompts,
+                    lambda m, c: status(f"[{index + 1}/{len(jobs)}] {m}", c),
+                    template_name=template_name,
+                    max_layout_retries=max_layout_retries,
+                    model=model,
+                    export_pdf=export_pdf,
+                    deadline_s=deadline_s,
+                    checkpoint=path,
+                    resume_from=path if resume and path and os.path.exists(path) else None,
+                    n_drafts=n_drafts,
+                    draft_temperatures=draft_temperatures,
+                )
+            except Exception as e:
+                status(f"[{index + 1}/{len(jobs)}] ❌ 任务失败: {e}", "\033[91m")
+                result = e
+            if on_done is not None:
+                await on_done(index, result)
+            return result
+
+    return await asyncio.gather(
+        *(_one(i, jd, tpl) for i, (jd, tpl) in enumerate(jobs))
+    )
+
+
+def build_resume(
+    jd_text: str,
+    raw_thoughts: str,
+    model_name: str,
+    prompts: ResumePrompts,
+    status: StatusCallback | None = None,
+    template_name: str = "swiss_single_column.html",
+    max_layout_retries: int = MAX_LAYOUT_RETRIES,
+) -> Resume:
+    """阻塞运行（内部 asyncio.run，结束即关闭浏览器池）；脚本默认用此入口。"""
+
+    async def _run() -> Resume:
+        try:
+            return await build_resume_async(
+                jd_text,
+                raw_thoughts,
+                model_name,
+                prompts,
+                status,
+                template_name=template_name,
+                max_layout_retries=max_layout_retries,
+            )
+        finally:
+            await shutdown_browser_pool()
+            await close_model_clients()
+
+    return asyncio.run(_run())
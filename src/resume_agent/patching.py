@@ -0,0 +1,116 @@
+"""
+精修补丁：模型只输出 ResumePatch（替换 / 删除 / 新增 bullet、改总结、重排技能等），
+本地确定性地应用到输入简历上，输出 token 与改动量成正比，而不是整份简历。
+
+所有下标都指向输入简历（先解析全部操作、再一次性重建），操作之间不会因删除而错位。
+补丁不合法（越界、冲突、引入思绪中没有的项目名、新增技能等）抛 PatchError，
+由调用方回退到整份重写。
+"""
+from __future__ import annotations
+
+from .keywords import squash
+from .models import PatchOp, PatchOperation, Resume, ResumePatch
+
+
+class PatchError(ValueError):
+    """补丁无法应用到当前简历。"""
+
+
+def _text(op: PatchOperation) -> str:
+    text = (op.text or "").strip()
+    if not text:
+        raise PatchError(f"{op.op.value}: 缺少 text")
+    return text
+
+
+def _project(op: PatchOperation, resume: Resume) -> int:
+    i = op.project_index
+    if i is None or not 0 <= i < len(resume.experience):
+        raise PatchError(f"{op.op.value}: project_index {i} 越界（共 {len(resume.experience)} 个项目）")
+    return i
+
+
+def apply_patch(resume: Resume, patch: ResumePatch, raw_thoughts: str) -> Resume:
+    """把补丁应用到 resume，返回新 Resume（match_score 取补丁中的值）。"""
+    bullets: list[list[str | None]] = [list(p.optimized_bullets) for p in resume.experience]
+    added: list[list[str]] = [[] for _ in resume.experience]
+    names: dict[int, str] = {}
+    dropped: set[int] = set()
+    touched: set[tuple[int, int]] = set()
+    summary: str | None = None
+    skills: list[str] | None = None
+    thoughts = squash(raw_thoughts)
+
+    for op in patch.operations:
+        if op.op in (PatchOp.REPLACE_BULLET, PatchOp.DROP_BULLET):
+            p = _project(op, resume)
+            b = op.bullet_index
+            if b is None or not 0 <= b < len(bullets[p]):
+                raise PatchError(f"{op.op.value}: 项目 {p} 无 bullet_index {b}")
+            if (p, b) in touched:
+                raise PatchError(f"{op.op.value}: 项目 {p} 的 bullet {b} 被重复修改")
+            touched.add((p, b))
+            bullets[p][b] = _text(op) if op.op == PatchOp.REPLACE_BULLET else None
+        elif op.op == PatchOp.ADD_BULLET:
+            added[_project(op, resume)].append(_text(op))
+        elif op.op == PatchOp.DROP_PROJECT:
+            dropped.add(_project(op, resume))
+        elif op.op == PatchOp.RENAME_PROJECT:
+            p, name = _project(op, resume), _text(op)
+            # 只允许归纳为思绪原文中原样出现过的名称，防止借改名引入新项目。
+            # 比 keywords.grounded_in（容忍改写，只用于标记可疑项目）更严：改名是直接放行的操作
+            if squash(name) not in thoughts:
+                raise PatchError(f"rename_project: 「{name}」未出现在用户思绪中")
+            names[p] = name
+        elif op.op == PatchOp.EDIT_SUMMARY:
+            if summary is not None:
+                raise PatchError("edit_summary: 重复修改")
+            summary = _text(op)
+        elif op.op == PatchOp.REORDER_SKILLS:
+            if skills is not None:
+                raise PatchError("reorder_skills: 重复修改")
+            known = {squash(s): s for s in resume.skills}
+            skills = []
+            for s in op.skills or []:
+                if squash(s) not in known:
+                    raise PatchError(f"reorder_skills: 新增了原简历没有的技能「{s}」")
+                if known[squash(s)] not in skills:
+                    skills.append(known[squash(s)])
+            if not skills:
+                raise PatchError("reorder_skills: 技能列表为空")
+
+    experience = []
+    for p, project in enumerate(resume.experience):
+        if p in dropped:
+            continue
+        kept = [b for b in bullets[p] if b is not None] + added[p]
+        if not kept:
+            raise PatchError(f"项目 {p} 的 bullet 被全部删除（应使用 drop_project）")
+        update: dict = {"optimized_bullets": kept}
+        if p in names:
+            update["project_name"] = names[p]
+        experience.append(project.model_copy(update=update))
+    if not experience:
+        raise PatchError("补丁删除了全部项目")
+    return resume.model_copy(
+        update={
+            "experience": experience,
+            "summary": summary if summary is not None else resume.summary,
+            "skills": skills if skills is not None else list(resume.skills),
+            "match_score": patch.match_score,
+        }
+    )
+
+
+def patch_size(patch: ResumePatch) -> int:
+    """补丁写入的字符量（用于汇报改动规模）。"""
+    return sum(len(op.text or "") + sum(len(s) for s in op.skills or []) for op in patch.operations)
+
+
+def indexed_outline(resume: Resume) -> str:
+    """补丁模式下代替整份 JSON 的输入：只含可修改的字段，项目与 bullet 标出下标，免得模型自己数。"""
+    lines = [f"summary: {resume.summary}", f"skills: {', '.join(resume.skills)}"]
+    for p, project in enumerate(resume.experience):
+        lines.append(f"P{p}「{project.project_name}」")
+        lines.extend(f"  B{b}: {bullet}" for b, bullet in enumerate(project.optimized_bullets))
+    return "\n".join(lines)
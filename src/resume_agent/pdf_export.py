@@ -0,0 +1,260 @@
+"""
+批量 PDF 导出（resume-pdf）：成千上万份 HTML / Resume JSON 一次性出 PDF。
+
+N 个 worker 进程（默认 CPU 数），每个进程常驻一个 Chromium 并同时开 --pages 个页面；
+Resume JSON 在 worker 内渲染模板（Jinja 占 CPU，随进程数扩展），HTML 经 set_content 直接灌入
+（模板无外部资源，不走 file:// 导航、不等 networkidle）。每份 PDF 打印完即落盘，主进程边收边报进度，
+最后汇报 pages/s。
+
+    resume-pdf output/batch --out-dir output/pdf --workers 8 --pages 4
+    resume-pdf saved/*.json --template all            # JSON 可出多模板：<stem>.<模板>.pdf
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from multiprocessing.util import Finalize
+from typing import Callable, Iterable
+
+from .browser_pool import BrowserPool
+from .rerender import load_resume_json, resolve_templates
+from .template_registry import TEMPLATE_SUFFIX
+from .utils import load_text, page_to_pdf, render_html
+
+# 每个 Chromium 同时打开的页面数
+DEFAULT_PAGES = 4
+# 每次派给 worker 的任务数（页面数的倍数）：足够填满页面，又能让快的 worker 多领
+CHUNK_PER_PAGE = 4
+HTML_SUFFIX = ".html"
+JSON_SUFFIX = ".json"
+
+
+@dataclass(frozen=True)
+class ExportItem:
+    source: str  # .html，或 Resume .json（按 template_name 渲染）
+    output: str  # PDF 路径
+    template_name: str | None = None
+
+
+@dataclass
+class ExportResult:
+    source: str
+    output: str
+    ok: bool
+    elapsed_ms: float
+    pdf_bytes: int = 0
+    error: str | None = None
+
+
+@dataclass
+class ExportSummary:
+    total: int
+    succeeded: int
+    failed: int
+    seconds: float
+    workers: int
+    pages: int
+
+    @property
+    def pages_per_s(self) -> float:
+        return self.succeeded / self.seconds if self.seconds else 0.0
+
+
+def _collect_sources(sources: Iterable[str]) -> list[str]:
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(
+                os.path.join(source, name)
+                for name in sorted(os.listdir(source))
+                if name.endswith((HTML_SUFFIX, JSON_SUFFIX)) and name != "manifest.json"
+            )
+        elif os.path.isfile(source):
+            paths.append(source)
+        else:
+            raise FileNotFoundError(f"输入不存在: {source}")
+    return paths
+
+
+def plan_exports(
+    sources: Iterable[str], out_dir: str, template_spec: str = "swiss_single_column.html"
+) -> list[ExportItem]:
+    """文件或目录（不递归）→ 导出清单。HTML 输出 <stem>.pdf；JSON 按模板输出 <stem>.<模板>.pdf，
+    同一目录下并存的 x.html 与 x.json 因此不会互相覆盖。"""
+    templates = resolve_templates(template_spec)
+    items = []
+    for path in _collect_sources(sources):
+        stem, ext = os.path.splitext(os.path.basename(path))
+        if ext == HTML_SUFFIX:
+            items.append(ExportItem(path, os.path.join(out_dir, f"{stem}.pdf")))
+        elif ext == JSON_SUFFIX:
+            items.extend(
+                ExportItem(path, os.path.join(out_dir, f"{stem}.{name.removesuffix(TEMPLATE_SUFFIX)}.pdf"), name)
+                for name in templates
+            )
+    return items
+
+
+def _load_html(item: ExportItem) -> str:
+    if item.template_name is None:
+        return load_text(item.source)
+    return render_html(load_resume_json(item.source).model_dump(), item.template_name)
+
+
+async def _export_one(item: ExportItem, pool: BrowserPool) -> ExportResult:
+    started = time.perf_counter()
+    try:
+        html = _load_html(item)
+        async with pool.page() as page:
+            await page.set_content(html, wait_until="domcontentloaded")
+            content_height = await page.evaluate("document.body.scrollHeight")
+            pdf = await page_to_pdf(page, content_height, path=item.output)
+    except Exception as e:
+        return ExportResult(item.source, item.output, False, (time.perf_counter() - started) * 1000, error=str(e))
+    return ExportResult(item.source, item.output, True, (time.perf_counter() - started) * 1000, len(pdf))
+
+
+async def export_async(
+    items: list[ExportItem],
+    pool: BrowserPool,
+    on_done: Callable[[ExportResult], None] | None = None,
+) -> list[ExportResult]:
+    """同一浏览器池内并发导出（并发页数受池的 max_concurrent_pages 限制），按完成先后回调。"""
+
+    async def _one(item: ExportItem) -> ExportResult:
+        result = await _export_one(item, pool)
+        if on_done is not None:
+            on_done(result)
+        return result
+
+    return list(await asyncio.gather(*(_one(item) for item in items)))
+
+
+# ---------- worker 进程：常驻事件循环 + 浏览器池，跨多个分块复用同一 Chromium ----------
+_worker_loop: asyncio.AbstractEventLoop | None = None
+_worker_pool: BrowserPool | None = None
+
+
+def _worker_init(pages: int) -> None:
+    global _worker_loop, _worker_pool
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker_pool = BrowserPool(max_concurrent_pages=pages)
+    # 进程池退出时关闭 Chromium（worker 以 os._exit 结束，atexit 不会执行）
+    Finalize(None, _worker_close, exitpriority=10)
+
+
+def _worker_close() -> None:
+    if _worker_loop is not None and _worker_pool is not None:
+        _worker_loop.run_until_complete(_worker_pool.close())
+
+
+def _worker_run(items: list[ExportItem]) -> list[ExportResult]:
+    assert _worker_loop is not None and _worker_pool is not None
+    return _worker_loop.run_until_complete(export_async(items, _worker_pool))
+
+
+def export_pdfs(
+    items: list[ExportItem],
+    *,
+    workers: int | None = None,
+    pages: int = DEFAULT_PAGES,
+    on_done: Callable[[ExportResult], None] | None = None,
+) -> ExportSummary:
+    """多进程导出；workers 默认 CPU 数（不超过所需），0 为当前进程内单浏览器。on_done 在主进程逐份回调。"""
+    pages = max(1, pages)
+    chunk = pages * CHUNK_PER_PAGE
+    if workers is None:
+        workers = min(os.cpu_count() or 1, max(1, -(-len(items) // chunk)))
+    for out_dir in {os.path.dirname(os.path.abspath(item.output)) for item in items}:
+        os.makedirs(out_dir, exist_ok=True)
+    results: list[ExportResult] = []
+
+    def _record(result: ExportResult) -> None:
+        results.append(result)
+        if on_done is not None:
+            on_done(result)
+
+    started = time.perf_counter()
+    if workers <= 0:
+        async def _run() -> None:
+            pool = BrowserPool(max_concurrent_pages=pages)
+            try:
+                await export_async(items, pool, _record)
+            finally:
+                await pool.close()
+
+        asyncio.run(_run())
+    else:
+        # spawn：worker 不继承父进程的事件循环 / 线程状态
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_worker_init, initargs=(pages,)) as executor:
+            futures = {
+                executor.submit(_worker_run, items[i : i + chunk]): items[i : i + chunk]
+                for i in range(0, len(items), chunk)
+            }
+            for future in as_completed(futures):
+                try:
+                    chunk_results = future.result()
+                except Exception as e:
+                    # worker 崩溃（如 Chromium 起不来）：整块记失败，其余分块照常
+                    chunk_results = [ExportResult(i.source, i.output, False, 0.0, error=str(e)) for i in futures[future]]
+                for result in chunk_results:
+                    _record(result)
+    succeeded = sum(r.ok for r in results)
+    return ExportSummary(
+        total=len(results),
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        seconds=round(time.perf_counter() - started, 3),
+        workers=max(workers, 0),
+        pages=pages,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="批量导出 PDF（多进程 × 多页面）")
+    parser.add_argument("sources", nargs="+", help="HTML / Resume JSON 文件或其目录（不递归，跳过 manifest.json）")
+    parser.add_argument("--out-dir", default="output/pdf", help="PDF 输出目录")
+    parser.add_argument("--template", default="swiss_single_column.html", help="JSON 输入使用的模板：名称、逗号分隔多个或 all")
+    parser.add_argument("--workers", type=int, help="worker 进程数（默认 CPU 数；0 为当前进程）")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="每个浏览器同时打开的页面数")
+    parser.add_argument("--report", metavar="JSON", help="逐份结果与汇总写入该 JSON")
+    args = parser.parse_args()
+
+    try:
+        items = plan_exports(args.sources, args.out_dir, args.template)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return
+    print(f"📄 批量导出 {len(items)} 份 PDF → {args.out_dir}")
+    results: list[ExportResult] = []
+
+    def _progress(result: ExportResult) -> None:
+        results.append(result)
+        if not result.ok:
+            first_line = (result.error or "").partition("\n")[0]
+            print(f"\033[91m❌ {result.source}: {first_line}\033[0m")
+        elif len(results) % 100 == 0 or len(results) == len(items):
+            print(f"   {len(results)}/{len(items)}")
+
+    summary = export_pdfs(items, workers=args.workers, pages=args.pages, on_done=_progress)
+    print(
+        f"🎉 成功 {summary.succeeded} / 失败 {summary.failed}，用时 {summary.seconds:.1f}s，"
+        f"{summary.pages_per_s:.1f} pages/s（{summary.workers} 进程 × {summary.pages} 页面）"
+    )
+    if args.report:
+        report = {**asdict(summary), "pages_per_s": round(summary.pages_per_s, 2), "results": [asdict(r) for r in results]}
+        os.makedirs(os.path.dirname(os.path.abspath(args.report)), exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+仅重渲染：把已保存的最终 Resume JSON（流水线默认与 HTML 同名落盘）直接渲染到一个或多个模板，
+版面校验 + 出 PDF，不调用 LLM。改模板、改错字后重出只需秒级，目录可整批重出。
+
+模板参数：单个模板名、逗号分隔的多个模板、all（全部）、auto（全部校验后只出最合适的一份）。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass
+
+from .context import ResumeBuild, StatusCallback
+from .models import LayoutStatus, Resume
+from .template_registry import TEMPLATE_SUFFIX, get_template_registry
+from .tools.template_selector import AUTO_TEMPLATE, evaluate_templates, pick_template
+from .utils import load_text, save_build_async
+
+ALL_TEMPLATES = "all"
+
+
+@dataclass
+class RerenderResult:
+    source: str
+    template_name: str
+    layout_status: LayoutStatus | None = None
+    html_path: str | None = None
+    pdf_path: str | None = None
+    error: str | None = None
+
+
+def load_resume_json(path: str) -> Resume:
+    """读取保存的 Resume JSON 并重新校验（手改后字段不合法时报 ValidationError）。"""
+    return Resume.model_validate_json(load_text(path))
+
+
+def resolve_templates(spec: str) -> list[str]:
+    """模板参数 → 模板名列表；auto 展开为全部（由调用方择优）。"""
+    registry_names = get_template_registry().names()
+    if spec in (ALL_TEMPLATES, AUTO_TEMPLATE):
+        return registry_names
+    names = []
+    for raw in spec.split(","):
+        name = raw.strip()
+        if not name:
+            continue
+        if not name.endswith(TEMPLATE_SUFFIX):
+            name += TEMPLATE_SUFFIX
+        if name not in registry_names:
+            raise ValueError(f"模板不存在: {name}（可选: {', '.join(registry_names)}）")
+        names.append(name)
+    if not names:
+        raise ValueError("未指定模板")
+    return names
+
+
+def find_resume_jsons(path: str) -> list[str]:
+    """文件即本身；目录下取全部 .json（不递归，跳过 manifest.json）。"""
+    if os.path.isfile(path):
+        return [path]
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Resume JSON 不存在: {path}")
+    return [
+        os.path.join(path, name)
+        for name in sorted(os.listdir(path))
+        if name.endswith(".json") and name != "manifest.json"
+    ]
+
+
+async def rerender_async(
+    resume: Resume,
+    template_spec: str = "swiss_single_column.html",
+    *,
+    export_pdf: bool = True,
+) -> list[ResumeBuild]:
+    """一份 Resume 并发渲染并校验到各模板；export_pdf 时 PDF 由校验页直接打印。auto 只返回最优一份。"""
+    fits = await evaluate_templates(
+        resume,
+        resolve_templates(template_spec),
+        pdf_on=frozenset(LayoutStatus) if export_pdf else (),
+    )
+    if template_spec == AUTO_TEMPLATE:
+        fits = [pick_template(fits)]
+    return [
+        ResumeBuild(
+            resume=resume,
+            template_name=fit.template_name,
+            html=fit.html,
+            layout_status=fit.report.status,
+            pdf=fit.report.pdf,
+        )
+        for fit in fits
+    ]
+
+
+def _output_path(output: str, template_name: str, multi: bool) -> str:
+    if not multi:
+        return output
+    stem, ext = os.path.splitext(output)
+    return f"{stem}.{template_name.removesuffix(TEMPLATE_SUFFIX)}{ext or '.html'}"
+
+
+async def rerender_file_async(
+    json_path: str,
+    output: str,
+    template_spec: str = "swiss_single_column.html",
+    *,
+    export_pdf: bool = True,
+) -> list[RerenderResult]:
+    """重出一份 JSON；多模板时文件名带模板后缀（<stem>.<模板>.html / .pdf）。"""
+    builds = await rerender_async(load_resume_json(json_path), template_spec, export_pdf=export_pdf)
+    results = []
+    for build in builds:
+        paths = await save_build_async(
+            build,
+            _output_path(output, build.template_name, len(builds) > 1),
+            write_pdf=export_pdf,
+            write_json=False,
+        )
+        results.append(
+            RerenderResult(json_path, build.template_name, build.layout_status, paths["html"], paths.get("pdf"))
+        )
+    return results
+
+
+async def rerender_many_async(
+    source: str,
+    output_dir: str,
+    template_spec: str = "swiss_single_column.html",
+    *,
+    export_pdf: bool = True,
+    max_concurrency: int = 4,
+    status: StatusCallback | None = None,
+) -> list[RerenderResult]:
+    """目录（或单个文件）下全部 Resume JSON 并发重出到 output_dir；单份失败只记录，不影响其余。"""
+    paths = find_resume_jsons(source)
+    gate = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _one(path: str) -> list[RerenderResult]:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        async with gate:
+            try:
+                results = await rerender_file_async(
+                    path, os.path.join(output_dir, f"{stem}.html"), template_spec, export_pdf=export_pdf
+                )
+            except Exception as e:
+                results = [RerenderResult(path, template_spec, error=str(e))]
+        if status is not None:
+            for r in results:
+                if r.error:
+                    status(f"❌ {stem}: {r.error}", "\033[91m")
+                else:
+                    status(f"✅ {stem} → {r.template_name}（{r.layout_status.value}）", "\033[92m")
+        return results
+
+    nested = await asyncio.gather(*(_one(p) for p in paths))
+    return [r for results in nested for r in results]
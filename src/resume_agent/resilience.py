@@ -0,0 +1,226 @@
+"""
+LLM 调用的韧性策略：单次超时、可重试错误的抖动退避重试、按历史 p90 发起的对冲请求，
+以及整单截止时间（deadline）——每次尝试的超时与退避都不会越过它。
+
+策略为进程级（CLI / 服务启动时 set_call_policy），延迟分布按步骤名跨任务累积，
+因此批量 / 服务模式下对冲阈值随运行自动校准。
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from typing import Awaitable, Callable, TypeVar
+
+from .tracing import percentile, span
+
+T = TypeVar("T")
+
+# 按类名识别 openai / httpx 的传输层瞬时错误，避免直接依赖其异常层级（版本间有变动）。
+# 带状态码的错误只重试 408 / 429 / 5xx；409 与模型输出不合格（UnexpectedModelBehavior）重发也多半一样
+_RETRYABLE_NAMES = frozenset(
+    {
+        "APIConnectionError",
+        "APITimeoutError",
+        "ConnectError",
+        "ConnectTimeout",
+        "ReadError",
+        "ReadTimeout",
+        "RemoteProtocolError",
+    }
+)
+_LATENCY_WINDOW = 200
+
+
+class DeadlineExceeded(TimeoutError):
+    """整单截止时间已到（或剩余时间不足以再发起一次调用）。"""
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, "") or default)
+
+
+@dataclass
+class CallPolicy:
+    timeout_s: float = 120.0  # 单次尝试超时（对冲时两路共用）
+    max_retries: int = 2
+    backoff_base_s: float = 1.0
+    backoff_max_s: float = 20.0
+    hedge: bool = False
+    hedge_quantile: float = 0.9
+    # 该步骤样本数不足时不对冲（阈值不可信）
+    hedge_min_samples: int = 8
+
+    @classmethod
+    def from_env(cls) -> "CallPolicy":
+        return cls(
+            timeout_s=_env_float("RESUME_AGENT_LLM_TIMEOUT_S", 120.0),
+            max_retries=int(os.getenv("RESUME_AGENT_LLM_RETRIES", "") or 2),
+            hedge=os.getenv("RESUME_AGENT_LLM_HEDGE", "") in ("1", "true", "yes"),
+        )
+
+
+@dataclass
+class CallStats:
+    calls: int = 0
+    retries: int = 0
+    timeouts: int = 0
+    hedges: int = 0  # 发起的对冲请求
+    hedge_wins: int = 0  # 对冲请求先返回的次数
+    deadline_hits: int = 0
+    # 结果被丢弃的尝试（对冲落败、超时、失败后重试）消耗的 token
+    discarded_tokens: int = 0
+
+    def add(self, other: "CallStats") -> None:
+        for k, v in asdict(other).items():
+            setattr(self, k, getattr(self, k) + v)
+
+
+@dataclass
+class _Latencies:
+    by_step: dict[str, deque[float]] = field(default_factory=dict)
+
+    def record(self, step: str, seconds: float) -> None:
+        self.by_step.setdefault(step, deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+    def quantile(self, step: str, q: float, min_samples: int) -> float | None:
+        values = self.by_step.get(step)
+        if not values or len(values) < min_samples:
+            return None
+        return percentile(sorted(values), q)
+
+
+_policy: CallPolicy | None = None
+_latencies = _Latencies()
+# 进程累计（服务 /metrics 用）
+call_totals = CallStats()
+
+
+def get_call_policy() -> CallPolicy:
+    global _policy
+    if _policy is None:
+        _policy = CallPolicy.from_env()
+    return _policy
+
+
+def set_call_policy(policy: CallPolicy | None) -> None:
+    """替换进程级策略（传 None 则下次按环境变量重建）。"""
+    global _policy
+    _policy = policy
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (TimeoutError, ConnectionError)) and not isinstance(exc, DeadlineExceeded):
+        return True
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status in (408, 429) or status >= 500
+    return any(cls.__name__ in _RETRYABLE_NAMES for cls in type(exc).__mro__)
+
+
+def remaining_s(deadline_at: float | None) -> float | None:
+    """距截止（time.monotonic 时刻）的剩余秒数；未设截止返回 None。"""
+    return None if deadline_at is None else deadline_at - time.monotonic()
+
+
+def _bump(stats: CallStats, name: str, n: int = 1) -> None:
+    setattr(stats, name, getattr(stats, name) + n)
+    setattr(call_totals, name, getattr(call_totals, name) + n)
+
+
+def record_discarded(stats: CallStats, tokens: int) -> None:
+    """记入结果被丢弃的尝试所耗 token（调用方按各自的用量对象统计）。"""
+    if tokens:
+        _bump(stats, "discarded_tokens", tokens)
+
+
+async def _hedged(attempt: Callable[[], Awaitable[T]], delay: float, stats: CallStats) -> T:
+    """先发一路；delay 秒内未返回则再发一路相同请求，取先成功者，另一路取消。"""
+    tasks = [asyncio.create_task(attempt())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if not done:
+            _bump(stats, "hedges")
+            with span("llm.hedge", delay_s=round(delay, 3)):
+                tasks.append(asyncio.create_task(attempt()))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(tasks) > 1 and task is tasks[1]:
+                        _bump(stats, "hedge_wins")
+                    return task.result()
+        # 两路都失败：抛首路的错误
+        raise tasks[0].exception()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def call_with_policy(
+    step: str,
+    attempt: Callable[[], Awaitable[T]],
+    stats: CallStats,
+    *,
+    deadline_at: float | None = None,
+    hedgeable: bool = True,
+    policy: CallPolicy | None = None,
+) -> T:
+    """按策略执行一次 LLM 调用：每次尝试 min(超时, 剩余截止时间)，可重试错误抖动退避后重试。
+
+    hedgeable=False（如带进度回调的流式调用）时不对冲。
+    """
+    policy = policy or get_call_policy()
+    _bump(stats, "calls")
+    for n in range(policy.max_retries + 1):
+        left = remaining_s(deadline_at)
+        if left is not None and left <= 0:
+            _bump(stats, "deadline_hits")
+            raise DeadlineExceeded(f"{step}: 已超过整单截止时间")
+        timeout = policy.timeout_s if left is None else min(policy.timeout_s, left)
+        delay = (
+            _latencies.quantile(step, policy.hedge_quantile, policy.hedge_min_samples)
+            if policy.hedge and hedgeable
+            else None
+        )
+        started = time.perf_counter()
+        try:
+            with span("llm.attempt", step=step, attempt=n + 1, timeout_s=round(timeout, 1)):
+                run = _hedged(attempt, delay, stats) if delay is not None and delay < timeout else attempt()
+                result = await asyncio.wait_for(run, timeout)
+        except Exception as e:
+            timed_out = isinstance(e, (TimeoutError, asyncio.TimeoutError))
+            if timed_out:
+                _bump(stats, "timeouts")
+            left = remaining_s(deadline_at)
+            if timed_out and left is not None and left <= 0:
+                _bump(stats, "deadline_hits")
+                raise DeadlineExceeded(f"{step}: 已超过整单截止时间") from e
+            if n == policy.max_retries or not is_retryable(e):
+                raise
+            backoff = random.uniform(0, min(policy.backoff_max_s, policy.backoff_base_s * 2**n))
+            if left is not None and backoff >= left:
+                _bump(stats, "deadline_hits")
+                raise DeadlineExceeded(f"{step}: 剩余时间不足以重试") from e
+            _bump(stats, "retries")
+            await asyncio.sleep(backoff)
+            continue
+        _latencies.record(step, time.perf_counter() - started)
+        return result
+    raise AssertionError("unreachable")
+
+
+def format_call_stats(stats: CallStats) -> str | None:
+    """有重试 / 超时 / 对冲 / 截止事件时返回一行汇报，否则 None。"""
+    if not (stats.retries or stats.timeouts or stats.hedges or stats.deadline_hits):
+        return None
+    return (
+        f"🛡 LLM 调用 {stats.calls} 次 | 重试 {stats.retries} | 超时 {stats.timeouts} | "
+        f"对冲 {stats.hedges}（胜出 {stats.hedge_wins}）| 触及截止 {stats.deadline_hits} | "
+        f"丢弃尝试耗 token {stats.discarded_tokens}"
+    )
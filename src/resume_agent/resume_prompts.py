@@ -12,9 +12,16 @@ class ResumePrompts:
         with open(file_path, "r", encoding="utf-8") as f:
             self.prompts: dict[str, Any] = yaml.safe_load(f)
 
-    def get_draft_prompt(self) -> str:
+    def get_shared_instructions(self) -> str:
+        """各步骤共用的 instructions（请求前缀的一部分，保持逐字节稳定）。"""
         p = self.prompts
-        return f"{p['role_definition']}\n{p['core_principles']}\n{p['field_guide']}"
+        return (
+            f"{p['role_definition']}\n{p['core_principles']}\n{p['field_guide']}\n"
+            f"{p['shared_protocol']}"
+        )
+
+    def get_draft_prompt(self) -> str:
+        return self.prompts["draft_instruction"]
 
     def get_critic_prompt(self) -> str:
         return self.prompts["critic_instruction"]
@@ -25,5 +32,8 @@ class ResumePrompts:
     def get_layout_refine_prompt(self) -> str:
         return self.prompts["layout_refine_instruction"]
 
+    def get_patch_protocol(self) -> str:
+        return self.prompts["patch_protocol"]
+
     def get_orchestrator_instructions(self) -> str:
         return self.prompts["orchestrator_instructions"]
@@ -0,0 +1,147 @@
+"""
+流水线步骤的异步依赖图调度：步骤声明依赖后立即排期，依赖完成即开跑；
+推测性步骤结果被取代时可取消。记录每步耗时，汇总相对串行执行节省的墙钟时间。
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from .tracing import span
+
+
+@dataclass
+class StepTiming:
+    name: str
+    speculative: bool
+    start: float | None = None
+    end: float | None = None
+    state: str = "pending"  # pending / running / done / failed / cancelled
+
+    @property
+    def duration(self) -> float:
+        if self.start is None:
+            return 0.0
+        return (self.end or time.perf_counter()) - self.start
+
+
+class StepGraph:
+    """最小 DAG 调度器：add() 声明步骤（可带依赖），await result() 取结果。
+
+    步骤名重复时自动加序号（critique、critique#2…），add() 返回实际名称。
+    依赖失败或被取消时，下游步骤随之失败。
+    """
+
+    def __init__(self) -> None:
+        self._tasks: dict[str, asyncio.Task] = {}
+        self.timings: dict[str, StepTiming] = {}
+        self._t0: float | None = None
+
+    def _unique(self, name: str) -> str:
+        if name not in self._tasks:
+            return name
+        i = 2
+        while f"{name}#{i}" in self._tasks:
+            i += 1
+        return f"{name}#{i}"
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        after: Iterable[str] = (),
+        speculative: bool = False,
+        attrs: dict[str, Any] | None = None,
+    ) -> str:
+        name = self._unique(name)
+        deps = [self._tasks[d] for d in after]
+        timing = self.timings[name] = StepTiming(name, speculative)
+        if self._t0 is None:
+            self._t0 = time.perf_counter()
+
+        async def _run() -> Any:
+            if deps:
+                await asyncio.gather(*deps)
+            timing.start, timing.state = time.perf_counter(), "running"
+            try:
+                with span(f"step.{name}", speculative=speculative, **(attrs or {})):
+                    result = await fn()
+            except asyncio.CancelledError:
+                timing.state = "cancelled"
+                raise
+            except BaseException:
+                timing.state = "failed"
+                raise
+            finally:
+                timing.end = time.perf_counter()
+            timing.state = "done"
+            return result
+
+        self._tasks[name] = asyncio.create_task(_run(), name=f"step:{name}")
+        return name
+
+    async def run(
+        self,
+        name: str,
+        fn: Callable[[], Awaitable[Any]],
+        *,
+        after: Iterable[str] = (),
+        attrs: dict[str, Any] | None = None,
+    ) -> Any:
+        """声明并等待一个步骤（顺序依赖的步骤也计入耗时统计）。"""
+        return await self.result(self.add(name, fn, after=after, attrs=attrs))
+
+    async def result(self, name: str) -> Any:
+        return await self._tasks[name]
+
+    def ready(self, name: str) -> bool:
+        """步骤已成功完成（不等待）。"""
+        task = self._tasks.get(name)
+        return task is not None and task.done() and self.timings[name].state == "done"
+
+    def cancel(self, name: str) -> bool:
+        """结果已被取代：未完成则取消，返回是否确实取消了在途工作。"""
+        task = self._tasks.get(name)
+        if task is None or task.done():
+            return False
+        if self.timings[name].start is None:
+            self.timings[name].state = "cancelled"
+        return task.cancel()
+
+    def cancel_speculative(self) -> int:
+        """取消所有未完成的推测性步骤，返回取消数量。"""
+        return sum(
+            self.cancel(name) for name, t in self.timings.items() if t.speculative
+        )
+
+    async def aclose(self) -> None:
+        """取消所有未完成步骤并等待其退出（异常不再抛出）。"""
+        for name in self._tasks:
+            self.cancel(name)
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+
+    def summary(self) -> tuple[float, float]:
+        """(各完成步骤耗时之和, 实际墙钟)；两者之差即并行节省的时间。"""
+        if self._t0 is None:
+            return 0.0, 0.0
+        done = [t for t in self.timings.values() if t.state == "done"]
+        ends = [t.end for t in self.timings.values() if t.end is not None]
+        wall = (max(ends) if ends else time.perf_counter()) - self._t0
+        return sum(t.duration for t in done), wall
+
+    def report(self) -> str:
+        parts = []
+        for t in self.timings.values():
+            if t.state == "pending":
+                continue
+            mark = {"cancelled": "✗", "failed": "!"}.get(t.state, "")
+            spec = "~" if t.speculative else ""
+            parts.append(f"{spec}{t.name}{mark} {t.duration:.1f}s")
+        serial, wall = self.summary()
+        return (
+            f"⏱ 步骤耗时 | {' | '.join(parts)} | 串行合计 {serial:.1f}s / 实际 {wall:.1f}s，"
+            f"并行节省 {max(0.0, serial - wall):.1f}s"
+        )
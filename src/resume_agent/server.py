@@ -0,0 +1,415 @@
+"""
+任务服务模式（resume-serve）：HTTP 提交任务 → 有界队列（满即 429）→ N 个流水线 worker 并发执行。
+
+所有 worker 在同一事件循环内共享模型客户端（连接池）与进程级 Chromium 池，吞吐随 worker 数扩展，
+而不是每个请求一个 asyncio.run + 一个浏览器。产物（Resume / HTML / PDF）保存在内存，按保留上限淘汰。
+
+    POST /jobs                          {"jd": "...", "thoughts"?: "...", "template"?: "...", "pdf"?: true,
+                                         "deadline_s"?: 90}
+                                        → 202 {"id", "status", ...}；队列满 429（带 Retry-After）
+    GET  /jobs/{id}                     状态、耗时、最近进度消息
+    GET  /jobs/{id}/result              最终 Resume JSON（未完成 409）
+    GET  /jobs/{id}/artifacts/{kind}    kind = html | pdf | json
+    GET  /metrics                       队列深度、运行中、计数、延迟 p50/p95、token 合计、重试 / 对冲计数
+    GET  /healthz
+
+嵌入自有 asyncio 应用时可直接用 JobService：await start() → submit() → await wait(id)。
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from dotenv import load_dotenv
+
+from .browser_pool import get_browser_pool, shutdown_browser_pool
+from .context import ResumeBuild
+from .httpd import HTTPError, Request, serve_connection, write_json, write_response
+from .model_factory import close_model_clients, create_chat_model, get_model_registry
+from .orchestrator import build_resume_artifacts_async
+from .resilience import CallPolicy, call_totals, set_call_policy
+from .resume_prompts import ResumePrompts
+from .tracing import percentile, span
+from .utils import html_to_pdf_async, load_text
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 32
+# 内存里保留的已结束任务数（含产物），超出按完成先后淘汰
+DEFAULT_MAX_FINISHED = 256
+# 延迟分位数统计窗口
+_LATENCY_WINDOW = 512
+_EVENTS_PER_JOB = 50
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+
+
+class QueueFullError(Exception):
+    """队列已满（HTTP 层映射为 429）。"""
+
+
+@dataclass
+class Job:
+    id: str
+    jd_text: str
+    raw_thoughts: str
+    template_name: str
+    export_pdf: bool
+    deadline_s: float | None = None
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    build: ResumeBuild | None = None
+    error: str | None = None
+    events: deque[str] = field(default_factory=lambda: deque(maxlen=_EVENTS_PER_JOB))
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def to_dict(self) -> dict[str, Any]:
+        out: dict[str, Any] = {
+            "id": self.id,
+            "status": self.status,
+            "template": self.build.template_name if self.build else self.template_name,
+            "submitted_at": self.submitted_at,
+            "queue_wait_s": round((self.started_at or time.time()) - self.submitted_at, 3),
+            "events": list(self.events),
+        }
+        if self.started_at is not None:
+            out["run_s"] = round((self.finished_at or time.time()) - self.started_at, 3)
+        if self.error:
+            out["error"] = self.error
+        if self.build is not None:
+            out["match_score"] = self.build.resume.match_score
+            out["layout_status"] = self.build.layout_status.value if self.build.layout_status else None
+            out["tokens"] = {
+                "input": sum(t.input_tokens for t in self.build.tokens.values()),
+                "cached": sum(t.cached_tokens for t in self.build.tokens.values()),
+                "output": sum(t.output_tokens for t in self.build.tokens.values()),
+            }
+            out["llm"] = asdict(self.build.llm_stats)
+            out["artifacts"] = {
+                kind: f"/jobs/{self.id}/artifacts/{kind}"
+                for kind in ("html", "json", *(("pdf",) if self.export_pdf else ()))
+            }
+        return out
+
+
+class JobService:
+    """有界队列 + 固定数量 worker；模型客户端与浏览器池在所有 worker 间共享。"""
+
+    def __init__(
+        self,
+        model_name: str = "deepseek-chat",
+        prompts: ResumePrompts | None = None,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        max_finished: int = DEFAULT_MAX_FINISHED,
+        default_thoughts: str | None = None,
+        default_template: str = "swiss_single_column.html",
+        deadline_s: float | None = None,
+    ) -> None:
+        self.model_name = model_name
+        self.prompts = prompts or ResumePrompts()
+        self.workers = max(1, workers)
+        self.max_finished = max_finished
+        self.default_thoughts = default_thoughts
+        self.default_template = default_template
+        self.deadline_s = deadline_s
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.counters = {"submitted": 0, "rejected": 0, SUCCEEDED: 0, FAILED: 0, CANCELLED: 0}
+        self.token_totals = {"input": 0, "cached": 0, "output": 0}
+        self._queue: asyncio.Queue[Job] = asyncio.Queue(max(1, queue_size))
+        self._run_s: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._wait_s: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._finished_order: deque[str] = deque()
+        self._tasks: list[asyncio.Task] = []
+        self._model = None
+        self._running = 0
+        self._started_at = time.time()
+        self._closing = False
+
+    # ---------- 生命周期 ----------
+    async def start(self, *, warm_up: bool = True) -> None:
+        self._model = create_chat_model(self.model_name)
+        if warm_up:
+            await get_browser_pool().warm_up()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"resume-worker-{i + 1}") for i in range(self.workers)
+        ]
+
+    async def close(self) -> None:
+        """停止接收；取消 worker，排队与运行中的任务标记为 cancelled。"""
+        self._closing = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        while not self._queue.empty():
+            self._finish(self._queue.get_nowait(), CANCELLED, error="服务关闭")
+
+    # ---------- 提交与查询 ----------
+    def submit(
+        self,
+        jd_text: str,
+        raw_thoughts: str | None = None,
+        *,
+        template_name: str | None = None,
+        export_pdf: bool = True,
+        deadline_s: float | None = None,
+    ) -> Job:
+        if self._closing:
+            raise RuntimeError("服务正在关闭")
+        raw_thoughts = raw_thoughts or self.default_thoughts
+        if not jd_text.strip() or not raw_thoughts:
+            raise ValueError("jd 与 thoughts 不能为空（未配置默认思绪时必须随任务提交）")
+        job = Job(
+            id=uuid.uuid4().hex[:12],
+            jd_text=jd_text,
+            raw_thoughts=raw_thoughts,
+            template_name=template_name or self.default_template,
+            export_pdf=export_pdf,
+            deadline_s=deadline_s or self.deadline_s,
+        )
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise QueueFullError(f"队列已满（{self.queue_capacity}）") from None
+        self.counters["submitted"] += 1
+        self.jobs[job.id] = job
+        return job
+
+    @property
+    def queue_capacity(self) -> int:
+        return self._queue.maxsize
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Job:
+        if (job := self.jobs.get(job_id)) is None:
+            raise HTTPError(404, f"任务不存在或已淘汰: {job_id}")
+        await job.done.wait()
+        return job
+
+    def retry_after_s(self) -> int:
+        """按近期平均单任务耗时估算队列腾出空位的时间。"""
+        avg = sum(self._run_s) / len(self._run_s) if self._run_s else 30.0
+        return max(1, round(avg * max(1, self._queue.qsize()) / self.workers))
+
+    # ---------- worker ----------
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status, job.started_at = RUNNING, time.time()
+        self._wait_s.append(job.started_at - job.submitted_at)
+        self._running += 1
+        try:
+            with span("service.job", job=job.id, template=job.template_name) as sp:
+                job.build = await build_resume_artifacts_async(
+                    job.jd_text,
+                    job.raw_thoughts,
+                    self.model_name,
+                    self.prompts,
+                    lambda m, c: job.events.append(m),
+                    template_name=job.template_name,
+                    model=self._model,
+                    export_pdf=job.export_pdf,
+                    deadline_s=job.deadline_s,
+                )
+                sp.set(layout_status=job.build.layout_status.value if job.build.layout_status else None)
+        except asyncio.CancelledError:
+            self._finish(job, CANCELLED, error="服务关闭")
+            raise
+        except Exception as e:
+            self._finish(job, FAILED, error=f"{type(e).__name__}: {e}")
+        else:
+            for t in job.build.tokens.values():
+                self.token_totals["input"] += t.input_tokens
+                self.token_totals["cached"] += t.cached_tokens
+                self.token_totals["output"] += t.output_tokens
+            self._finish(job, SUCCEEDED)
+        finally:
+            self._running -= 1
+
+    def _finish(self, job: Job, status: str, *, error: str | None = None) -> None:
+        job.status, job.error, job.finished_at = status, error, time.time()
+        if job.started_at is not None and status == SUCCEEDED:
+            self._run_s.append(job.finished_at - job.started_at)
+        self.counters[status] += 1
+        job.done.set()
+        self._finished_order.append(job.id)
+        while len(self._finished_order) > self.max_finished:
+            self.jobs.pop(self._finished_order.popleft(), None)
+
+    # ---------- 指标 ----------
+    def metrics(self) -> dict[str, Any]:
+        def _quantiles(values: deque[float]) -> dict[str, float | None]:
+            ordered = sorted(values)
+            if not ordered:
+                return {"p50": None, "p95": None}
+            return {"p50": round(percentile(ordered, 0.5), 3), "p95": round(percentile(ordered, 0.95), 3)}
+
+        now = time.time()
+        recent = sum(
+            1
+            for job_id in reversed(self._finished_order)
+            if (job := self.jobs.get(job_id)) and job.status == SUCCEEDED and now - job.finished_at <= 60
+        )
+        pool = get_browser_pool()
+        return {
+            "uptime_s": round(now - self._started_at, 1),
+            "workers": self.workers,
+            "running": self._running,
+            "queue": {"depth": self._queue.qsize(), "capacity": self.queue_capacity},
+            "jobs": dict(self.counters),
+            "completed_last_60s": recent,
+            "run_s": _quantiles(self._run_s),
+            "queue_wait_s": _quantiles(self._wait_s),
+            "tokens": dict(self.token_totals),
+            "llm": asdict(call_totals),
+            "browser": {"launches": pool.launches, "max_concurrent_pages": pool.max_concurrent_pages},
+            "model_clients": get_model_registry().stats(),
+        }
+
+    # ---------- HTTP ----------
+    async def handle(self, request: Request, writer: asyncio.StreamWriter) -> None:
+        parts = [p for p in request.path.split("/") if p]
+        if parts == ["healthz"]:
+            write_json(writer, 200, {"ok": True})
+        elif parts == ["metrics"]:
+            write_json(writer, 200, self.metrics())
+        elif parts == ["jobs"]:
+            if request.method != "POST":
+                raise HTTPError(405, "仅支持 POST /jobs")
+            write_json(writer, 202, self._submit_from(request.json()).to_dict())
+        elif len(parts) >= 2 and parts[0] == "jobs":
+            job = self.get(parts[1])
+            if job is None:
+                raise HTTPError(404, f"任务不存在或已淘汰: {parts[1]}")
+            if len(parts) == 2:
+                write_json(writer, 200, job.to_dict())
+            elif parts[2:] == ["result"]:
+                write_json(writer, 200, self._finished_build(job).resume.model_dump())
+            elif len(parts) == 4 and parts[2] == "artifacts":
+                body, content_type = await self._artifact(job, parts[3])
+                write_response(writer, 200, body, content_type)
+            else:
+                raise HTTPError(404, f"未知路径: {request.path}")
+        else:
+            raise HTTPError(404, f"未知路径: {request.path}")
+
+    def _submit_from(self, payload: Any) -> Job:
+        if (
+            not isinstance(payload, dict)
+            or not isinstance(payload.get("jd"), str)
+            or not isinstance(payload.get("pdf", True), bool)
+        ):
+            raise HTTPError(
+                400,
+                '请求体需为 {"jd": "...", "thoughts"?: "...", "template"?: "...", "pdf"?: bool, '
+                '"deadline_s"?: number}',
+            )
+        try:
+            return self.submit(
+                payload["jd"],
+                payload.get("thoughts"),
+                template_name=payload.get("template"),
+                export_pdf=payload.get("pdf", True),
+                deadline_s=float(payload["deadline_s"]) if payload.get("deadline_s") else None,
+            )
+        except QueueFullError as e:
+            raise HTTPError(429, str(e), {"Retry-After": str(self.retry_after_s())}) from e
+        except ValueError as e:
+            raise HTTPError(400, str(e)) from e
+        except RuntimeError as e:
+            raise HTTPError(503, str(e)) from e
+
+    @staticmethod
+    def _finished_build(job: Job) -> ResumeBuild:
+        if job.status in (QUEUED, RUNNING):
+            raise HTTPError(409, f"任务尚未完成（{job.status}）")
+        if job.build is None:
+            raise HTTPError(409, f"任务未成功（{job.status}）: {job.error}")
+        return job.build
+
+    async def _artifact(self, job: Job, kind: str) -> tuple[bytes, str]:
+        build = self._finished_build(job)
+        if kind == "html":
+            return build.html.encode("utf-8"), "text/html; charset=utf-8"
+        if kind == "json":
+            return build.resume.model_dump_json(indent=2).encode("utf-8"), "application/json; charset=utf-8"
+        if kind == "pdf" and job.export_pdf:
+            if build.pdf is None:
+                # 最终一轮未在校验页出 PDF（如本地估算定论）时补打一次并缓存
+                build.pdf = await html_to_pdf_async(build.html)
+            return build.pdf, "application/pdf"
+        raise HTTPError(404, f"无此产物: {kind}")
+
+
+async def serve(service: JobService, host: str, port: int) -> None:
+    await service.start()
+    server = await asyncio.start_server(
+        lambda r, w: serve_connection(r, w, service.handle), host, port
+    )
+    print(f"🚀 resume-serve 已启动 http://{host}:{port}（worker {service.workers}，队列 {service.queue_capacity}）")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+        await shutdown_browser_pool()
+        await close_model_clients()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Resume Agent 任务服务（HTTP，队列 + worker 池）")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--model", default="deepseek-chat", help="使用的 LLM 模型 (默认: deepseek-chat)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="并发流水线 worker 数")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE, help="排队上限，满后返回 429")
+    parser.add_argument("--max-finished", type=int, default=DEFAULT_MAX_FINISHED, help="内存中保留的已结束任务数")
+    parser.add_argument("--template", default="swiss_single_column.html", help="任务未指定模板时的默认模板")
+    parser.add_argument("--thoughts", help="默认原始思绪文件（任务未带 thoughts 时使用）")
+    parser.add_argument("--deadline", type=float, help="任务未指定 deadline_s 时的整单截止秒数（不含排队）")
+    parser.add_argument("--hedge", action="store_true", help="LLM 对冲请求（超过该步骤历史 p90 再发一路）")
+    args = parser.parse_args()
+    load_dotenv()
+    policy = CallPolicy.from_env()
+    policy.hedge = policy.hedge or args.hedge
+    set_call_policy(policy)
+
+    try:
+        default_thoughts = load_text(args.thoughts) if args.thoughts else None
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return
+    service = JobService(
+        args.model,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        max_finished=args.max_finished,
+        default_thoughts=default_thoughts,
+        default_template=args.template,
+        deadline_s=args.deadline,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        print("👋 resume-serve 已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+LLM 步骤结果的内容寻址磁盘缓存。
+键 = hash(model, base_url, instructions, prompt, 输出 schema)；值为校验后的 Pydantic 模型 JSON。
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+T = TypeVar("T", bound=BaseModel)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "resume_agent", "steps")
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+DEFAULT_MAX_AGE_S = 30 * 24 * 3600
+# 条数 / 体积在写入时增量累计，超限才全量扫描淘汰；过期清理每写入这么多次扫描一次
+EVICT_EVERY = 100
+
+
+class StepCache:
+    """每条结果一个 JSON 文件；命中时刷新 mtime，淘汰按过期优先、再按最久未用。
+
+    get / put 为同步磁盘 I/O，事件循环内用 aget / aput（放到线程里执行）。
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        *,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_s: float = DEFAULT_MAX_AGE_S,
+        enabled: bool = True,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        # 当前条数 / 字节数（首次写入时全量扫描得出，之后增量累计）与距上次扫描的写入数
+        self._count: int | None = None
+        self._bytes = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(
+        model_name: str,
+        base_url: str | None,
+        instructions: str,
+        prompt: str,
+        output_type: type[BaseModel],
+        variant: str = "",
+    ) -> str:
+        """variant 区分同一请求的多路采样（如 best-of-N 初稿的各候选）；为空时键与单路一致。"""
+        parts = [model_name, base_url or "", instructions, prompt, output_type.model_json_schema()]
+        if variant:
+            parts.append(variant)
+        payload = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key: str, output_type: type[T]) -> T | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        value = None
+        try:
+            if time.time() - os.path.getmtime(path) <= self.max_age_s:
+                with open(path, "r", encoding="utf-8") as f:
+                    value = output_type.model_validate_json(f.read())
+                os.utime(path)
+            else:
+                os.remove(path)
+        except (OSError, ValidationError):
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: BaseModel) -> None:
+        if not self.enabled:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            old_size: int | None = os.path.getsize(path)
+        except OSError:
+            old_size = None
+        data = value.model_dump_json().encode("utf-8")
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            if self._count is not None:
+                self._count += old_size is None
+                self._bytes += len(data) - (old_size or 0)
+                self._writes += 1
+            due = (
+                self._count is None
+                or self._count > self.max_entries
+                or self._bytes > self.max_bytes
+                or self._writes >= EVICT_EVERY
+            )
+        if due:
+            self.evict()
+
+    async def aget(self, key: str, output_type: type[T]) -> T | None:
+        return await asyncio.to_thread(self.get, key, output_type)
+
+    async def aput(self, key: str, value: BaseModel) -> None:
+        if self.enabled:
+            await asyncio.to_thread(self.put, key, value)
+
+    def _entries(self) -> list[tuple[float, int, str]]:
+        out = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                out.append((st.st_mtime, st.st_size, path))
+        return out
+
+    def evict(self) -> int:
+        """删除过期条目，再按最久未用删到条数与体积均不超限；返回删除数。"""
+        now = time.time()
+        entries = sorted(self._entries())
+        removed = 0
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for mtime, size, path in entries:
+            expired = now - mtime > self.max_age_s
+            if not expired and count <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            removed += 1
+            count -= 1
+            total -= size
+        with self._lock:
+            self._count, self._bytes, self._writes = count, total, 0
+        return removed
+
+    def clear(self) -> None:
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._count = None
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: StepCache | None = None
+
+
+def get_step_cache() -> StepCache:
+    """进程级缓存；目录与开关读环境变量 RESUME_AGENT_CACHE_DIR / RESUME_AGENT_NO_CACHE。"""
+    global _cache
+    if _cache is None:
+        _cache = StepCache(
+            os.getenv("RESUME_AGENT_CACHE_DIR", DEFAULT_CACHE_DIR),
+            enabled=os.getenv("RESUME_AGENT_NO_CACHE", "") not in ("1", "true", "yes"),
+        )
+    return _cache
+
+
+def set_step_cache(cache: StepCache | None) -> None:
+    """替换进程级缓存（传 None 则下次按环境变量重建）。"""
+    global _cache
+    _cache = cache
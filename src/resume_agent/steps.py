@@ -4,39 +4,247 @@
 """
 from __future__ import annotations
 
-from pydantic_ai import Agent
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Sequence, TypeVar
 
-from .context import MAX_REFINE_CALLS, ResumeWorkspace, StatusCallback
-from .models import LayoutStatus, Resume, ResumeCritique
+from pydantic import BaseModel
+from pydantic_ai.usage import RunUsage
+
+from .context import MAX_REFINE_CALLS, PartialCallback, ResumeWorkspace, StatusCallback
+from .keywords import KeywordReport, grounded_in, match_keywords
+from .model_factory import get_sub_agent
+from .models import LayoutStatus, Resume, ResumeCritique, ResumePatch
+from .patching import PatchError, apply_patch, indexed_outline, patch_size
+from .resilience import call_with_policy, record_discarded
 from .resume_prompts import ResumePrompts
+from .step_cache import get_step_cache
+from .streaming import ResumeProgress, stream_resume
+from .token_usage import StepTokens
+from .tracing import span
 from .textutil import one_line
 
+if TYPE_CHECKING:
+    from .tools.layout_validator import LayoutReport
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _supersede_draft(workspace: ResumeWorkspace) -> None:
+    """初稿即将被替换：在途的推测性步骤（如初稿版面校验）作废。"""
+    workspace.steps.cancel_speculative()
+    workspace.layout_feedback = None
+
+
+def _layout_note(report: LayoutReport | None) -> str:
+    """与评审并行得到的初稿版面结论，并入精修 prompt（PERFECT 时不附加，保持 prompt 不变）。"""
+    if report is None or report.status == LayoutStatus.PERFECT:
+        return ""
+    return (
+        f"【版面校验（初稿）】{report.status.value}\n"
+        f"【版面反馈】:\n{report.feedback}\n"
+        "请在落实 Critic 意见的同时按上述反馈调整篇幅（OVERFLOW 删减、UNDERFLOW 充实细节），不得编造。\n\n"
+    )
+
+
+def _keyword_note(report: KeywordReport | None) -> str:
+    """本地关键词比对中未覆盖的 JD 词并入精修 prompt；区分思绪中有据可补的与不可硬塞的。"""
+    if report is None or not report.missing:
+        return ""
+    absent = [t for t in report.missing if t not in report.missing_in_thoughts]
+    note = f"【本地关键词比对】JD 关键词覆盖 {report.coverage:.0%}。\n"
+    if report.missing_in_thoughts:
+        note += f"思绪中出现过、简历尚未体现（请在对应项目中据实体现）：{', '.join(report.missing_in_thoughts)}\n"
+    if absent:
+        note += f"思绪中没有（禁止写进 skills 或编造经历）：{', '.join(absent[:12])}\n"
+    return note + "\n"
+
 
 def _blend_match_score(before: int, after: int) -> int:
     """精修若以去捏造为主，模型常把分打穿；限制相对初稿跌幅。"""
     return max(after, before - 10)
 
 
+def shared_context(workspace: ResumeWorkspace) -> str:
+    """所有步骤 prompt 的公共前缀（思绪 + JD，表头固定）；与 instructions 一起逐字节稳定，
+    使服务端前缀缓存（如 DeepSeek context caching）在 draft / critique / refine 之间命中。"""
+    return (
+        "【用户原始思绪 — 简历事实仅能来源于此：只可保留、润色，禁止编造或新增项目/公司】:\n"
+        f"{workspace.raw_thoughts}\n\n"
+        f"【目标 JD】:\n{workspace.jd_text}\n\n"
+    )
+
+
+def _discarded_usage(attempts: list[RunUsage], cancelled: set[int], winner: RunUsage) -> RunUsage:
+    """结果未被采用的尝试的用量。被取消且尚无响应的尝试（对冲落败 / 超时）输出量不可得，
+    输入按同一 prompt 以胜出那次的 input_tokens 计。"""
+    discarded = RunUsage()
+    for usage in attempts:
+        if usage is winner:
+            continue
+        discarded.incr(usage)
+        if id(usage) in cancelled and not usage.requests:
+            discarded.incr(RunUsage(input_tokens=winner.input_tokens, requests=1))
+    return discarded
+
+
+async def _run_structured(
+    workspace: ResumeWorkspace,
+    step: str,
+    model,
+    prompts: ResumePrompts,
+    output_type: type[T],
+    task: str,
+    status: StatusCallback,
+    progress: ResumeProgress | None = None,
+    *,
+    variant: str = "",
+    model_settings: dict | None = None,
+) -> T:
+    """带内容寻址缓存的单次结构化调用：输入逐字节相同则不再请求模型。
+
+    请求 = 共用 instructions + 共用前缀 + 【本步任务】task；token 用量记入 workspace.tokens[step]。
+    传入 progress 时以流式运行（仅 Resume 输出），边生成边推送部分结果。
+    超时 / 重试 / 对冲与整单截止见 resilience.call_with_policy。
+    variant / model_settings（如 temperature）用于同一请求的多路采样：prompt 不变，缓存按 variant 区分。
+    """
+    instructions = prompts.get_shared_instructions()
+    prompt = f"{shared_context(workspace)}【本步任务】\n{task}"
+    cache = get_step_cache()
+    key = cache.make_key(
+        model.model_name, getattr(model, "base_url", None), instructions, prompt, output_type, variant
+    )
+    with span(
+        "llm", step=step, model=model.model_name, output_type=output_type.__name__
+    ) as sp:
+        cached = await cache.aget(key, output_type)
+        sp.set(cache_hit=cached is not None)
+        if cached is not None:
+            status(f"💾 缓存命中（{output_type.__name__}），跳过模型调用", "\033[90m")
+            return cached
+        sub = get_sub_agent(model, output_type, instructions)
+
+        # 每次尝试（含对冲的另一路）各用一个就地累加的用量对象，结果被丢弃的尝试也计费
+        attempts: list[RunUsage] = []
+        cancelled: set[int] = set()
+
+        async def _attempt():
+            usage = RunUsage()
+            attempts.append(usage)
+            try:
+                if progress is not None:
+                    return await stream_resume(sub, prompt, progress, usage=usage)
+                result = await sub.run(prompt, model_settings=model_settings, usage=usage)
+            except asyncio.CancelledError:
+                cancelled.add(id(usage))
+                raise
+            return result.output, usage
+
+        # 流式调用带进度回调，两路并发推送会交错，故不对冲
+        output, usage = await call_with_policy(
+            step,
+            _attempt,
+            workspace.llm_stats,
+            deadline_at=workspace.deadline_at,
+            hedgeable=progress is None,
+        )
+        discarded = _discarded_usage(attempts, cancelled, usage)
+        record_discarded(workspace.llm_stats, discarded.input_tokens + discarded.output_tokens)
+        if progress is not None:
+            progress.report()
+            sp.set(stream=True, ttfu_s=workspace.ttfu_s.get(step))
+        sp.set(
+            input_tokens=usage.input_tokens,
+            cached_tokens=usage.cache_read_tokens,
+            output_tokens=usage.output_tokens,
+            requests=usage.requests,
+        )
+        tokens = workspace.tokens.setdefault(step, StepTokens())
+        tokens.add(usage)
+        tokens.add(discarded)
+        await cache.aput(key, output)
+        return output
+
+
+async def _run_edit(
+    workspace: ResumeWorkspace,
+    step: str,
+    model,
+    prompts: ResumePrompts,
+    head: str,
+    label: str,
+    before: Resume,
+    status: StatusCallback,
+    progress: ResumeProgress | None = None,
+) -> Resume:
+    """精修类步骤：默认让模型只输出 ResumePatch 并本地应用（输出 token 与改动量成正比）；
+    补丁无法应用或关闭补丁模式时整份重写（【label】后附完整 JSON，可流式）。
+
+    回退的整份重写记为 {step}_full，与补丁调用的延迟分布 / token 分开统计。
+    """
+    full_step = step
+    if workspace.patch_refine:
+        patch = await _run_structured(
+            workspace,
+            step,
+            model,
+            prompts,
+            ResumePatch,
+            f"{head}{prompts.get_patch_protocol()}\n【当前简历（带下标）】:\n{indexed_outline(before)}",
+            status,
+        )
+        try:
+            out = apply_patch(before, patch, workspace.raw_thoughts)
+        except PatchError as e:
+            status(f"   ⚠️ 补丁无法应用（{e}），回退整份重写", "\033[90m")
+            full_step = f"{step}_full"
+        else:
+            status(
+                f"   🩹 补丁 {len(patch.operations)} 项操作 | 写入 {patch_size(patch)} 字",
+                "\033[90m",
+            )
+            return out
+    return await _run_structured(
+        workspace,
+        full_step,
+        model,
+        prompts,
+        Resume,
+        f"{head}【{label}】:\n{before.model_dump_json()}",
+        status,
+        progress,
+    )
+
+
 async def run_draft(
     workspace: ResumeWorkspace,
     model,
     prompts: ResumePrompts,
     status: StatusCallback,
+    *,
+    stream: bool = False,
+    on_partial: PartialCallback | None = None,
+    variant: str = "",
+    temperature: float | None = None,
 ) -> None:
     status("✍️  工具 draft_resume：正在起草初稿...", "\033[94m")
-    sub = Agent(
+    _supersede_draft(workspace)
+    draft = await _run_structured(
+        workspace,
+        "draft",
         model,
-        output_type=Resume,
-        instructions=prompts.get_draft_prompt(),
-    )
-    r = await sub.run(
-        "【硬性约束】experience 中每条项目必须对应下方「乱麻思绪」中的事实，禁止新增用户未写的公司/项目。\n\n"
-        f"【目标 JD】:\n{workspace.jd_text}\n\n【我的乱麻思绪】:\n{workspace.raw_thoughts}",
+        prompts,
+        Resume,
+        prompts.get_draft_prompt(),
+        status,
+        ResumeProgress("draft", workspace, status, on_partial) if stream else None,
+        variant=variant,
+        model_settings={"temperature": temperature} if temperature is not None else None,
     )
-    workspace.draft = r.output
-    titles = " / ".join(e.project_name for e in r.output.experience[:4])
+    workspace.draft = draft
+    titles = " / ".join(e.project_name for e in draft.experience[:4])
     status(
-        f"📝 初稿 | match {r.output.match_score} | 项目 {len(r.output.experience)} 条 | {titles}",
+        f"📝 初稿 | match {draft.match_score} | 项目 {len(draft.experience)} 条 | {titles}",
         "\033[94m",
     )
 
@@ -49,23 +257,34 @@ async def run_critique(
 ) -> None:
     if workspace.draft is None:
         raise RuntimeError("run_critique: draft 为空")
+    report = workspace.keywords = match_keywords(
+        workspace.jd_text, workspace.draft, workspace.raw_thoughts
+    )
+    if workspace.local_critique and report.confident:
+        workspace.critique = report.to_critique()
+        workspace.critique_calls += 1
+        status(
+            f"⚡ 本地关键词覆盖 {report.coverage:.0%}（{len(report.matched)}/{len(report.terms)}，"
+            f"{report.elapsed_ms:.1f}ms），跳过 LLM 评审",
+            "\033[93m",
+        )
+        return
     status("🧐 工具 critique_resume：正在评审...", "\033[93m")
-    sub = Agent(
+    critique = await _run_structured(
+        workspace,
+        "critique",
         model,
-        output_type=ResumeCritique,
-        instructions=prompts.get_critic_prompt(),
-    )
-    r = await sub.run(
-        "【用户原始思绪 — 简历事实仅能来源于此，不得编造】:\n"
-        f"{workspace.raw_thoughts}\n\n"
-        f"【目标 JD】:\n{workspace.jd_text}\n\n"
+        prompts,
+        ResumeCritique,
+        f"{prompts.get_critic_prompt()}\n"
         f"【生成的简历】:\n{workspace.draft.model_dump_json()}",
+        status,
     )
-    workspace.critique = r.output
+    workspace.critique = critique
     workspace.critique_calls += 1
     status(
-        f"📋 评审 | {r.output.score}分 | 需修改:{r.output.needs_revision} | "
-        f"{one_line(r.output.critique, 160)}",
+        f"📋 评审 | {critique.score}分 | 需修改:{critique.needs_revision} | "
+        f"{one_line(critique.critique, 160)}",
         "\033[93m",
     )
 
@@ -75,25 +294,35 @@ async def run_refine(
     model,
     prompts: ResumePrompts,
     status: StatusCallback,
+    *,
+    stream: bool = False,
+    on_partial: PartialCallback | None = None,
 ) -> None:
     if workspace.draft is None or workspace.critique is None:
         raise RuntimeError("run_refine: 缺少 draft 或 critique")
     before = workspace.draft
-    status("✨ 工具 refine_resume：正在精修...", "\033[96m")
-    sub = Agent(
+    layout = workspace.layout_feedback
+    _supersede_draft(workspace)
+    if layout is not None and layout.status != LayoutStatus.PERFECT:
+        status(f"✨ 工具 refine_resume：正在精修（合并版面反馈 {layout.status.value}）...", "\033[96m")
+    else:
+        status("✨ 工具 refine_resume：正在精修...", "\033[96m")
+    refined = await _run_edit(
+        workspace,
+        "refine",
         model,
-        output_type=Resume,
-        instructions=prompts.get_refine_prompt(),
-    )
-    r = await sub.run(
-        "【用户原始思绪 — 仅允许保留、润色其中出现的事实，禁止新增项目/公司】:\n"
-        f"{workspace.raw_thoughts}\n\n"
-        f"【目标 JD】:\n{workspace.jd_text}\n\n"
+        prompts,
+        f"{prompts.get_refine_prompt()}\n"
         f"【Critic 意见】:\n{workspace.critique.model_dump_json()}\n\n"
-        f"【简历初稿】:\n{before.model_dump_json()}",
+        f"{_keyword_note(workspace.keywords)}"
+        f"{_layout_note(layout)}",
+        "简历初稿",
+        before,
+        status,
+        ResumeProgress("refine", workspace, status, on_partial) if stream else None,
     )
-    blended = _blend_match_score(before.match_score, r.output.match_score)
-    out = r.output.model_copy(update={"match_score": blended})
+    blended = _blend_match_score(before.match_score, refined.match_score)
+    out = refined.model_copy(update={"match_score": blended})
     workspace.draft = out
     workspace.refine_calls += 1
     names_before = [e.project_name for e in before.experience]
@@ -122,25 +351,26 @@ async def run_refine_layout(
     if workspace.draft is None:
         raise RuntimeError("run_refine_layout: draft 为空")
     before = workspace.draft
+    _supersede_draft(workspace)
+    workspace.draft_history.append(before)
     status(
         f"📐 工具 refine_layout：{layout_status.value} — {one_line(feedback_msg, 100)}",
         "\033[35m",
     )
-    sub = Agent(
+    refined = await _run_edit(
+        workspace,
+        "refine_layout",
         model,
-        output_type=Resume,
-        instructions=prompts.get_layout_refine_prompt(),
-    )
-    r = await sub.run(
-        "【用户原始思绪 — 仅允许保留、润色其中出现的事实，禁止新增项目/公司】:\n"
-        f"{workspace.raw_thoughts}\n\n"
-        f"【目标 JD】:\n{workspace.jd_text}\n\n"
+        prompts,
+        f"{prompts.get_layout_refine_prompt()}\n"
         f"【版面校验状态】{layout_status.value}\n"
-        f"【版面反馈】:\n{feedback_msg}\n\n"
-        f"【当前简历 JSON】:\n{before.model_dump_json()}",
+        f"【版面反馈】:\n{feedback_msg}\n\n",
+        "当前简历 JSON",
+        before,
+        status,
     )
-    blended = _blend_match_score(before.match_score, r.output.match_score)
-    out = r.output.model_copy(update={"match_score": blended})
+    blended = _blend_match_score(before.match_score, refined.match_score)
+    out = refined.model_copy(update={"match_score": blended})
     workspace.draft = out
     status(
         f"📐 版面精修 | match {before.match_score}→{out.match_score} | {layout_status.value}",
@@ -157,3 +387,118 @@ def should_run_refine(workspace: ResumeWorkspace) -> bool:
         return False
     cr = workspace.critique
     return bool(cr.needs_revision or cr.score < REFINE_SCORE_CUTOFF)
+
+
+def fabrications(resume: Resume, report: KeywordReport | None, raw_thoughts: str) -> list[str]:
+    """疑似捏造：思绪中找不到的 skills，与字面上几乎不见于思绪的项目名（改写措辞不算）。"""
+    suspects = list(report.unsupported_skills) if report is not None else []
+    suspects += [p.project_name for p in resume.experience if not grounded_in(p.project_name, raw_thoughts)]
+    return suspects
+
+
+@dataclass
+class DraftCandidate:
+    index: int
+    temperature: float | None
+    workspace: ResumeWorkspace
+
+    @property
+    def suspects(self) -> list[str]:
+        assert self.workspace.draft is not None
+        return fabrications(self.workspace.draft, self.workspace.keywords, self.workspace.raw_thoughts)
+
+    @property
+    def rank(self) -> tuple[int, bool, int, int]:
+        """越小越好：先看疑似捏造数，再看评审是否要求修改，再看分数。"""
+        assert self.workspace.critique is not None
+        cr = self.workspace.critique
+        return (len(self.suspects), cr.needs_revision, -cr.score, self.index)
+
+    @property
+    def clears_cutoff(self) -> bool:
+        """无需精修即可交付：评审不要求修改、分数过精修关口且无疑似捏造。"""
+        return not should_run_refine(self.workspace) and not self.suspects
+
+
+async def run_best_of_drafts(
+    workspace: ResumeWorkspace,
+    model,
+    prompts: ResumePrompts,
+    status: StatusCallback,
+    n_drafts: int,
+    temperatures: Sequence[float] | None = None,
+) -> None:
+    """并发起草 n_drafts 份候选，每份写完立即评审（本地关键词门控同单路）；有候选无需精修即
+    取消其余在途候选，否则等全部完成后按（疑似捏造数、是否需修改、评审分）择优。
+
+    各候选在独立工作区里运行，共用 token / 调用计数与整单截止；胜者的初稿、评审与关键词比对写回
+    workspace。temperatures 按候选下标循环取用；候选 0 不指定温度时与单路 draft 共用缓存条目。
+    """
+    temps = list(temperatures or [])
+    candidates = [
+        DraftCandidate(
+            i,
+            temps[i % len(temps)] if temps else None,
+            ResumeWorkspace(
+                jd_text=workspace.jd_text,
+                raw_thoughts=workspace.raw_thoughts,
+                template_name=workspace.template_name,
+                tokens=workspace.tokens,
+                deadline_at=workspace.deadline_at,
+                llm_stats=workspace.llm_stats,
+                patch_refine=workspace.patch_refine,
+                local_critique=workspace.local_critique,
+            ),
+        )
+        for i in range(max(1, n_drafts))
+    ]
+    status(f"🎲 并发起草 {len(candidates)} 份候选，写完即评审、择优", "\033[94m")
+    _supersede_draft(workspace)
+
+    async def _one(c: DraftCandidate) -> DraftCandidate:
+        def say(message: str, color: str) -> None:
+            status(f"[候选 {c.index + 1}] {message}", color)
+
+        with span("draft.candidate", index=c.index, temperature=c.temperature):
+            variant = "" if c.index == 0 and c.temperature is None else f"candidate:{c.index}:{c.temperature}"
+            await run_draft(c.workspace, model, prompts, say, variant=variant, temperature=c.temperature)
+            await run_critique(c.workspace, model, prompts, say)
+        return c
+
+    tasks = [asyncio.ensure_future(_one(c)) for c in candidates]
+    done: list[DraftCandidate] = []
+    errors: list[BaseException] = []
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                c = await next_done
+            except Exception as e:
+                errors.append(e)
+                continue
+            done.append(c)
+            if c.clears_cutoff:
+                break
+    finally:
+        stragglers = [t for t in tasks if not t.done()]
+        for t in stragglers:
+            t.cancel()
+        await asyncio.gather(*stragglers, return_exceptions=True)
+    if not done:
+        raise errors[0]
+    best = min(done, key=lambda c: c.rank)
+    assert best.workspace.critique is not None
+    workspace.draft = best.workspace.draft
+    workspace.critique = best.workspace.critique
+    workspace.keywords = best.workspace.keywords
+    workspace.critique_calls += 1
+    summary = " | ".join(
+        f"#{c.index + 1} {c.workspace.critique.score}分{'' if not c.suspects else f' 疑似捏造{len(c.suspects)}'}"
+        for c in sorted(done, key=lambda c: c.index)
+        if c.workspace.critique is not None
+    )
+    status(
+        f"🏆 选用候选 {best.index + 1}（{best.workspace.critique.score}分）| {summary}"
+        + (f" | 已取消 {len(stragglers)} 份在途候选" if stragglers else "")
+        + (f" | 失败 {len(errors)} 份" if errors else ""),
+        "\033[92m",
+    )
@@ -0,0 +1,124 @@
+"""
+流式结构化输出：边生成边把「已完整的字段」拼成部分 Resume，经回调推送进度。
+"""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+from pydantic import ValidationError
+from pydantic_ai import Agent
+from pydantic_ai.usage import RunUsage
+from pydantic_core import from_json
+
+from .context import PartialCallback, ResumeWorkspace, StatusCallback
+from .models import EducationEntry, Resume, WorkProject
+from .token_usage import run_usage
+
+# 部分结果的推送节流（秒）
+STREAM_DEBOUNCE_S = 0.2
+
+
+def _valid_items(items: Any, model: type[WorkProject] | type[EducationEntry]) -> list:
+    """列表中前缀里已完整、可通过校验的条目（最后一项常未写完）。"""
+    out = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            out.append(model.model_validate(item))
+        except ValidationError:
+            break
+    return out
+
+
+def partial_resume(data: dict[str, Any]) -> Resume:
+    """把未写完的 Resume JSON（已按 allow_partial 解析）拼成字段尽量完整的 Resume。
+
+    未出现的字段取空值；experience / education 只保留已完整的条目。结果未经整体校验，
+    仅用于展示进度与本地估算。
+    """
+    contact = data.get("contact")
+    skills = data.get("skills")
+    score = data.get("match_score")
+    return Resume.model_construct(
+        name=str(data.get("name") or ""),
+        title=str(data.get("title") or ""),
+        contact={k: str(v) for k, v in contact.items()} if isinstance(contact, dict) else {},
+        summary=str(data.get("summary") or ""),
+        skills=[str(s) for s in skills] if isinstance(skills, list) else [],
+        experience=_valid_items(data.get("experience"), WorkProject),
+        education=_valid_items(data.get("education"), EducationEntry),
+        match_score=score if isinstance(score, int) else 0,
+    )
+
+
+def _tool_args(response) -> str | None:
+    for part in response.parts:
+        args = getattr(part, "args", None)
+        if isinstance(args, str):
+            return args
+    return None
+
+
+async def stream_resume(
+    sub: Agent[None, Resume],
+    prompt: str,
+    on_data: Callable[[dict[str, Any]], None],
+    usage: RunUsage | None = None,
+) -> tuple[Resume, RunUsage]:
+    """流式运行输出 Resume 的子 Agent，每批增量调用 on_data(部分 JSON)，返回 (校验后的结果, 用量)。
+    传入 usage 时用量就地累加到该对象上（中途取消也能看到已发生的部分）。"""
+    async with sub.run_stream(prompt, usage=usage) as result:
+        # pydantic-ai 1.x 为 stream_responses；新版更名为 stream_response
+        responses = getattr(result, "stream_responses", None) or result.stream_response
+        async for response in responses(debounce_by=STREAM_DEBOUNCE_S):
+            args = _tool_args(response)
+            if args:
+                data = from_json(args, allow_partial=True)
+                if isinstance(data, dict):
+                    on_data(data)
+        output = await result.get_output()
+        return output, run_usage(result)
+
+
+class ResumeProgress:
+    """把部分 JSON 转成部分 Resume：有新进展才推送，并记录首个可用输出耗时（TTFU）。
+
+    「可用」= 至少一个项目经历已完整（可渲染、可估算）。
+    """
+
+    def __init__(
+        self,
+        step: str,
+        workspace: ResumeWorkspace,
+        status: StatusCallback,
+        on_partial: PartialCallback | None,
+    ) -> None:
+        self.step = step
+        self.workspace = workspace
+        self.status = status
+        self.on_partial = on_partial
+        self.started = time.perf_counter()
+        self._seen: tuple[int, int, int] = (0, 0, 0)
+
+    def __call__(self, data: dict[str, Any]) -> None:
+        partial = partial_resume(data)
+        bullets = sum(len(e.optimized_bullets) for e in partial.experience)
+        key = (len(partial.experience), bullets, len(partial.education))
+        if key == self._seen:
+            return
+        self._seen = key
+        elapsed = time.perf_counter() - self.started
+        if partial.experience and self.step not in self.workspace.ttfu_s:
+            self.workspace.ttfu_s[self.step] = elapsed
+        self.status(
+            f"   ⏳ {self.step} 流式 {elapsed:.1f}s | 项目 {key[0]} | bullets {bullets} | 教育 {key[2]}",
+            "\033[90m",
+        )
+        if self.on_partial is not None:
+            self.on_partial(self.step, partial)
+
+    def report(self) -> None:
+        total = time.perf_counter() - self.started
+        ttfu = self.workspace.ttfu_s.get(self.step)
+        first = f"{ttfu:.1f}s" if ttfu is not None else "—"
+        self.status(f"   ⏱ {self.step} 首个可用输出 {first} / 完整输出 {total:.1f}s", "\033[90m")
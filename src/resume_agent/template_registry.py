@@ -0,0 +1,71 @@
+"""
+模板注册表：进程内只建一次 Jinja Environment，启动时预编译 templates/ 下全部模板。
+开发时可开启按 mtime 热重载；可选磁盘字节码缓存，缩短冷启动编译。
+"""
+from __future__ import annotations
+
+import os
+from typing import Iterable
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from .tracing import span
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_SUFFIX = ".html"
+
+
+class TemplateRegistry:
+    def __init__(
+        self,
+        templates_dir: str = TEMPLATES_DIR,
+        *,
+        hot_reload: bool = False,
+        bytecode_cache_dir: str | None = None,
+    ) -> None:
+        self.templates_dir = templates_dir
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        # cache_size=-1：已编译模板永不淘汰；auto_reload 时每次取用比对源文件 mtime
+        self.env = Environment(
+            loader=FileSystemLoader(templates_dir),
+            auto_reload=hot_reload,
+            cache_size=-1,
+            bytecode_cache=bytecode_cache,
+        )
+        for name in self.names():
+            self.env.get_template(name)
+
+    def names(self) -> list[str]:
+        return sorted(
+            n for n in os.listdir(self.templates_dir) if n.endswith(TEMPLATE_SUFFIX)
+        )
+
+    def get(self, template_name: str) -> Template:
+        return self.env.get_template(template_name)
+
+    def render(self, data: dict, template_name: str) -> str:
+        with span("template.render", template=template_name):
+            return self.get(template_name).render(**data)
+
+    def render_many(self, data: dict, template_names: Iterable[str] | None = None) -> dict[str, str]:
+        """同一份数据渲染到多个模板（默认全部），返回 {模板名: HTML}。"""
+        names = self.names() if template_names is None else list(template_names)
+        return {name: self.render(data, name) for name in names}
+
+
+_registry: TemplateRegistry | None = None
+
+
+def get_template_registry() -> TemplateRegistry:
+    """进程级注册表；RESUME_AGENT_TEMPLATE_RELOAD=1 开启热重载，
+    RESUME_AGENT_TEMPLATE_CACHE_DIR 指定字节码缓存目录。"""
+    global _registry
+    if _registry is None:
+        _registry = TemplateRegistry(
+            hot_reload=os.getenv("RESUME_AGENT_TEMPLATE_RELOAD", "") in ("1", "true", "yes"),
+            bytecode_cache_dir=os.getenv("RESUME_AGENT_TEMPLATE_CACHE_DIR") or None,
+        )
+    return _registry
@@ -0,0 +1,57 @@
+"""
+按步骤记录 LLM token 用量（输入 / 其中命中前缀缓存 / 输出），用于观察前缀缓存的节省。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pydantic_ai.usage import RunUsage
+
+# 各服务商上报「命中缓存的输入 token」的字段名（pydantic-ai 未统一映射时从 details 兜底）
+_CACHE_HIT_DETAIL_KEYS = ("prompt_cache_hit_tokens", "cached_tokens")
+
+
+@dataclass
+class StepTokens:
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    requests: int = 0
+
+    def add(self, usage: RunUsage) -> None:
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        self.requests += usage.requests
+        cached = usage.cache_read_tokens
+        if not cached:
+            cached = next(
+                (usage.details[k] for k in _CACHE_HIT_DETAIL_KEYS if usage.details.get(k)), 0
+            )
+        self.cached_tokens += cached
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+def run_usage(result: Any) -> RunUsage:
+    """AgentRunResult / StreamedRunResult 的用量；pydantic-ai 1.x 为 usage()，新版为属性。"""
+    usage = result.usage
+    return usage() if callable(usage) else usage
+
+
+def format_token_report(per_step: dict[str, StepTokens]) -> str:
+    total = StepTokens()
+    parts = []
+    for step, t in per_step.items():
+        total.input_tokens += t.input_tokens
+        total.cached_tokens += t.cached_tokens
+        total.output_tokens += t.output_tokens
+        total.requests += t.requests
+        parts.append(f"{step} 入 {t.input_tokens}（缓存 {t.cached_tokens}）出 {t.output_tokens}")
+    return (
+        f"🔢 Token | {' | '.join(parts)} | 合计 入 {total.input_tokens}"
+        f"（前缀缓存命中 {total.cache_hit_ratio:.0%}）出 {total.output_tokens}"
+    )
@@ -1,14 +1,17 @@
-"""Pydantic AI 工具注册（按能力拆文件，便于扩展）。"""
+"""Pydantic AI 工具注册（按能力拆文件，便于扩展）。
+
+包本身不导入 LLM 栈：版面估算 / 模板选择等纯本地子模块（仅重渲染路径）不必为 pydantic-ai 付启动时间。
+"""
 from __future__ import annotations
 
-from pydantic_ai import Agent
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
 
-from ..context import ResumeWorkspace, StatusCallback
-from ..models import Resume
-from ..resume_prompts import ResumePrompts
-from .critique import register_critique_tool
-from .draft import register_draft_tool
-from .refine import register_refine_tool
+    from ..context import ResumeWorkspace, StatusCallback
+    from ..models import Resume
+    from ..resume_prompts import ResumePrompts
 
 
 def register_resume_tools(
@@ -17,6 +20,10 @@ def register_resume_tools(
     prompts: ResumePrompts,
     status: StatusCallback,
 ) -> None:
+    from .critique import register_critique_tool
+    from .draft import register_draft_tool
+    from .refine import register_refine_tool
+
     register_draft_tool(agent, model, prompts, status)
     register_critique_tool(agent, model, prompts, status)
     register_refine_tool(agent, model, prompts, status)
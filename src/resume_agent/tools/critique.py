@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Awaitable, Callable, Container
+
 from pydantic_ai import Agent, RunContext
 
 from ..context import (
@@ -7,10 +9,36 @@ from ..context import (
     ResumeWorkspace,
     StatusCallback,
 )
-from ..models import Resume
+from ..models import LayoutStatus, Resume
 from ..resume_prompts import ResumePrompts
 from ..steps import run_critique
 from ..textutil import one_line
+from .layout_estimator import check_workspace_layout
+from .layout_validator import LayoutReport
+
+
+def schedule_review(
+    workspace: ResumeWorkspace,
+    model,
+    prompts: ResumePrompts,
+    status: StatusCallback,
+    *,
+    pdf_on: Container[LayoutStatus] = (),
+    check: Callable[[], Awaitable[tuple[str, LayoutReport]]] | None = None,
+) -> tuple[str, str]:
+    """在工作区步骤图上并行声明「初稿版面校验」（推测性）与「评审」，返回两步名称。
+
+    版面结论记入 workspace.layout_feedback，精修时与评审意见合并；初稿被替换时自动取消。
+    check 可替换默认的单模板校验（如 --template auto 的多模板选择）。
+    """
+    graph = workspace.steps
+    layout = graph.add(
+        "layout",
+        check or (lambda: check_workspace_layout(workspace, pdf_on=pdf_on)),
+        speculative=True,
+    )
+    critique = graph.add("critique", lambda: run_critique(workspace, model, prompts, status))
+    return layout, critique
 
 
 def register_critique_tool(
@@ -30,10 +58,17 @@ def register_critique_tool(
             )
         if ctx.deps.critique_calls >= MAX_CRITIQUE_CALLS:
             return "评审次数已达上限。请直接输出最终 Resume，勿再调用工具。"
-        await run_critique(ctx.deps, model, prompts, status)
+        _, critique = schedule_review(ctx.deps, model, prompts, status)
+        await ctx.deps.steps.result(critique)
         c = ctx.deps.critique
         assert c is not None
+        layout = ctx.deps.layout_feedback
+        layout_note = (
+            f" 版面: {layout.status.value}（精修时自动合并）。"
+            if layout is not None
+            else " 版面校验在后台进行。"
+        )
         return (
             f"评审完成。score={c.score}，needs_revision={c.needs_revision}。"
-            f" 要点: {one_line(c.critique, 200)}"
+            f" 要点: {one_line(c.critique, 200)}{layout_note}"
         )
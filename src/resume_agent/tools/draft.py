@@ -17,7 +17,7 @@ def register_draft_tool(
     @agent.tool
     async def draft_resume(ctx: RunContext[ResumeWorkspace]) -> str:
         """根据当前工作区中的 JD 与思绪生成 STAR 简历初稿（结构化）。"""
-        await run_draft(ctx.deps, model, prompts, status)
+        await ctx.deps.steps.run("draft", lambda: run_draft(ctx.deps, model, prompts, status))
         d = ctx.deps.draft
         assert d is not None
         return (
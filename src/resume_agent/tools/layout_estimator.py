@@ -0,0 +1,246 @@
+"""
+纯 Python 版面估算：按模板度量（templates/layout_profiles.yaml）从 Resume 字段推算渲染高度，
+仅在估算值落在判定阈值附近时才交给 Playwright 实测。
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Container, Iterable
+
+import yaml
+
+from ..context import ResumeWorkspace
+from ..models import LayoutStatus, Resume
+from ..tracing import span
+from ..utils import render_html
+from .layout_validator import (
+    A4_HEIGHT_PX,
+    MIN_INNER_FILL_RATIO,
+    OVERFLOW_THRESHOLD_PX,
+    USABLE_CONTENT_PX,
+    _PAD_VERTICAL_PX,
+    LayoutReport,
+    classify_layout,
+    inspect_html_layout,
+)
+
+_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+PROFILES_PATH = os.path.join(_TEMPLATES_DIR, "layout_profiles.yaml")
+CALIBRATION_PATH = os.path.join(_TEMPLATES_DIR, "layout_calibration.json")
+
+# 字宽（em）：CJK/全角 ≈ 1，拉丁小写 ≈ 0.52，大写与数字略宽，空格最窄
+_CJK_EM = 1.0
+_LATIN_EM = 0.52
+_WIDE_LATIN_EM = 0.62
+_SPACE_EM = 0.28
+# 未标定的档案误差未知，不做定论（一律实测）；先运行
+#   python -m resume_agent.bench.layout_calibration --write
+UNCALIBRATED_MARGIN_PX = math.inf
+
+# 进程内计数：本地估算直接判定 vs 交给 Playwright 实测
+estimator_stats = {"estimated": 0, "measured": 0}
+
+
+def format_estimator_stats() -> str:
+    """本进程版面校验中本地估算定论 / Chromium 实测的次数；尚无校验时为空串。"""
+    estimated, measured = estimator_stats["estimated"], estimator_stats["measured"]
+    if not estimated + measured:
+        return ""
+    return f"📏 版面校验：本地估算定论 {estimated} / Chromium 实测 {measured}（{estimated / (estimated + measured):.0%} 免开页面）"
+
+
+@dataclass(frozen=True)
+class LayoutEstimate:
+    total_height: int
+    inner_height: int
+    margin_px: float
+
+    def is_decisive(self) -> bool:
+        """与两条判定边界（溢出阈值、最低填充）都相距超过误差余量时，估算即可定论。"""
+        min_inner_px = USABLE_CONTENT_PX * MIN_INNER_FILL_RATIO
+        content_height = self.inner_height + _PAD_VERTICAL_PX
+        return (
+            abs(content_height - OVERFLOW_THRESHOLD_PX) > self.margin_px
+            and abs(self.inner_height - min_inner_px) > self.margin_px
+        )
+
+
+def text_width_em(text: str) -> float:
+    width = 0.0
+    for ch in text:
+        if ch.isspace():
+            width += _SPACE_EM
+        elif ord(ch) >= 0x2E80:
+            width += _CJK_EM
+        elif ch.isupper() or ch.isdigit():
+            width += _WIDE_LATIN_EM
+        else:
+            width += _LATIN_EM
+    return width
+
+
+def _lines(text: str, font_px: float, width_px: float) -> int:
+    return max(1, math.ceil(text_width_em(text) * font_px / width_px))
+
+
+def _pill_rows(items: Iterable[str], pill: dict[str, float], width_px: float) -> int:
+    """胶囊按行贪心排布（与 flex-wrap / inline-block 换行一致）。"""
+    rows, used = 0, width_px
+    for item in items:
+        w = text_width_em(item) * pill["font"] + pill["extra_px"]
+        if used + w > width_px:
+            rows += 1
+            used = 0.0
+        used += w
+    return rows
+
+
+def _section_body(name: str, resume: Resume, p: dict[str, Any], width_px: float) -> float:
+    if name == "summary":
+        s = p["summary"]
+        return _lines(resume.summary, s["font"], width_px) * s["line_px"]
+    if name == "experience":
+        b, bullet_width = p["bullet"], width_px - p["bullet"]["indent_px"]
+        total = 0.0
+        for proj in resume.experience:
+            total += p["project_px"]
+            total += _pill_rows(proj.matched_skills, p["project_pill"], width_px) * p["project_pill"]["row_px"]
+            lines = sum(_lines(t, b["font"], bullet_width) for t in proj.optimized_bullets)
+            total += lines * b["line_px"] + max(0, len(proj.optimized_bullets) - 1) * b["gap_px"]
+        return total
+    if name == "education":
+        h, total = p["honor"], 0.0
+        for edu in resume.education:
+            total += p["education_px"]
+            if edu.honors:
+                text = "荣誉: " + ", ".join(edu.honors)
+                total += _lines(text, h["font"], width_px) * h["line_px"] + h["extra_px"]
+        return total
+    if name == "skills":
+        return _pill_rows(resume.skills, p["skill_pill"], width_px) * p["skill_pill"]["row_px"]
+    raise ValueError(f"未知版面区块: {name}")
+
+
+def _has_section(name: str, resume: Resume) -> bool:
+    return bool(getattr(resume, name))
+
+
+def estimate_inner_raw(resume: Resume, profile: dict[str, Any]) -> float:
+    """未校正的正文块高度估算：页眉 + 各栏（双栏取较高者）。"""
+    heights = []
+    for column_name, column in profile["columns"].items():
+        title_px = profile["section_title_px"]
+        if column_name == "side":
+            title_px = profile.get("side_section_title_px", title_px)
+        present = [s for s in column["sections"] if _has_section(s, resume)]
+        height = sum(
+            title_px + _section_body(s, resume, profile, column["width_px"]) for s in present
+        )
+        heights.append(height + max(0, len(present) - 1) * profile["section_gap_px"])
+    return profile["header_px"] + max(heights, default=0.0)
+
+
+@lru_cache(maxsize=1)
+def load_profiles() -> dict[str, dict[str, Any]]:
+    with open(PROFILES_PATH, "r", encoding="utf-8") as f:
+        profiles: dict[str, dict[str, Any]] = yaml.safe_load(f)
+    calibration: dict[str, dict[str, float]] = {}
+    if os.path.exists(CALIBRATION_PATH):
+        with open(CALIBRATION_PATH, "r", encoding="utf-8") as f:
+            calibration = json.load(f)
+    for name, profile in profiles.items():
+        profile["calibration"] = calibration.get(name)
+    return profiles
+
+
+def estimate_layout(resume: Resume, template_name: str) -> LayoutEstimate | None:
+    """按模板度量估算 (整页高度, 正文块高度)；模板无度量档案时返回 None。"""
+    profile = load_profiles().get(template_name)
+    if profile is None:
+        return None
+    raw = estimate_inner_raw(resume, profile)
+    cal = profile["calibration"]
+    if cal:
+        inner = raw * cal["scale"] + cal["offset"]
+        margin = cal["margin_px"]
+    else:
+        inner, margin = raw, UNCALIBRATED_MARGIN_PX
+    inner_px = int(round(inner))
+    # .page-container 为 border-box 且 min-height 297mm：整页高度不低于 A4
+    total_px = max(A4_HEIGHT_PX, inner_px + _PAD_VERTICAL_PX)
+    return LayoutEstimate(total_height=total_px, inner_height=inner_px, margin_px=margin)
+
+
+def fit_calibration(raw: list[float], measured: list[float]) -> dict[str, float]:
+    """最小二乘拟合 measured ≈ scale·raw + offset；余量取最大残差的 1.25 倍加 8px。"""
+    n = len(raw)
+    if n < 2:
+        raise ValueError("标定至少需要 2 个样本")
+    mean_x, mean_y = sum(raw) / n, sum(measured) / n
+    var_x = sum((x - mean_x) ** 2 for x in raw)
+    scale = (
+        sum((x - mean_x) * (y - mean_y) for x, y in zip(raw, measured)) / var_x
+        if var_x
+        else 1.0
+    )
+    offset = mean_y - scale * mean_x
+    max_err = max(abs(scale * x + offset - y) for x, y in zip(raw, measured))
+    return {
+        "scale": round(scale, 5),
+        "offset": round(offset, 2),
+        "margin_px": round(max_err * 1.25 + 8, 1),
+        "max_abs_err_px": round(max_err, 1),
+        "samples": n,
+    }
+
+
+def save_calibration(calibration: dict[str, dict[str, float]]) -> None:
+    with open(CALIBRATION_PATH, "w", encoding="utf-8") as f:
+        json.dump(calibration, f, ensure_ascii=False, indent=2)
+    load_profiles.cache_clear()
+
+
+async def check_resume_layout(
+    resume: Resume,
+    template_name: str,
+    html_content: str,
+    *,
+    pdf_on: Container[LayoutStatus] = (),
+) -> LayoutReport:
+    """先本地估算；落在阈值余量内（或模板无档案）才用 Chromium 实测。
+
+    估算结论命中 pdf_on（需要出 PDF）时仍走 Chromium，度量与打印共用一次页面加载。
+    """
+    with span("layout.check", template=template_name) as sp:
+        est = estimate_layout(resume, template_name)
+        if est is not None and est.is_decisive():
+            status, feedback = classify_layout(est.total_height, est.inner_height, source="本地估算")
+            if status not in pdf_on:
+                estimator_stats["estimated"] += 1
+                sp.set(source="estimate", status=status.value)
+                return LayoutReport(status, feedback, est.total_height, est.inner_height)
+        estimator_stats["measured"] += 1
+        report = await inspect_html_layout(html_content, pdf_on=pdf_on)
+        sp.set(source="chromium", status=report.status.value, pdf=report.pdf is not None)
+        return report
+
+
+async def check_workspace_layout(
+    workspace: ResumeWorkspace,
+    *,
+    pdf_on: Container[LayoutStatus] = (),
+) -> tuple[str, LayoutReport]:
+    """渲染并校验工作区当前初稿，结果记入 workspace.layout_feedback；返回 (HTML, 报告)。"""
+    if workspace.draft is None:
+        raise RuntimeError("check_workspace_layout: draft 为空")
+    draft = workspace.draft
+    html_content = render_html(draft.model_dump(), workspace.template_name)
+    report = await check_resume_layout(draft, workspace.template_name, html_content, pdf_on=pdf_on)
+    # 校验期间初稿若已被替换，结论作废
+    if workspace.draft is draft:
+        workspace.layout_feedback = report
+    return html_content, report
@@ -0,0 +1,194 @@
+"""
+本地版面拟合：不调用 LLM，只在 Resume 结构上增删 bullet / 收紧 skills，
+按 bullet 预算二分查找，直到版面判定为 PERFECT。收敛失败再交给 refine_layout。
+"""
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Sequence
+
+from ..context import ResumeWorkspace, StatusCallback
+from ..models import LayoutStatus, Resume
+from ..utils import render_html
+from .layout_estimator import check_resume_layout
+from .layout_validator import LayoutReport
+
+# 单个项目最多保留的 bullet 数；每个项目至少保留 1 条
+MAX_BULLETS_PER_PROJECT = 5
+# 删减技能时的下限（与 prompt「6-8 个」一致）
+MIN_SKILLS = 6
+# 早期版本中被删掉、现可恢复的 bullet 略降权：同等价值时优先保留当前文本
+_RESTORED_PENALTY = 0.5
+_DIGIT = re.compile(r"\d")
+
+
+@dataclass(frozen=True)
+class _Candidate:
+    project: int
+    text: str
+    value: float
+    order: float
+
+
+@dataclass
+class FitResult:
+    resume: Resume
+    bullets_before: int
+    bullets_after: int
+    skills_before: int
+    skills_after: int
+    probes: int
+    html: str  # 终点的渲染结果与版面结论（已判定 PERFECT，调用方无需重测）
+    report: LayoutReport
+
+
+def bullet_value(text: str, keywords: Sequence[str], position: int) -> float:
+    """bullet 价值：含量化数字 +2，命中关键词每个 +1（至多 3），靠前的略高。"""
+    lowered = text.lower()
+    hits = sum(1 for k in keywords if k and k.lower() in lowered)
+    return (2.0 if _DIGIT.search(text) else 0.0) + min(hits, 3) - 0.1 * position
+
+
+def _candidates(resume: Resume, history: Sequence[Resume]) -> list[list[_Candidate]]:
+    """每个项目的候选 bullet：当前版本 + 历史版本中同名项目被删掉的条目。"""
+    out: list[list[_Candidate]] = []
+    for i, proj in enumerate(resume.experience):
+        keywords = [*proj.matched_skills, *resume.skills]
+        seen = set(proj.optimized_bullets)
+        pool = [
+            _Candidate(i, t, bullet_value(t, keywords, j), j)
+            for j, t in enumerate(proj.optimized_bullets)
+        ]
+        for old in history:
+            for old_proj in old.experience:
+                if old_proj.project_name != proj.project_name:
+                    continue
+                for j, t in enumerate(old_proj.optimized_bullets):
+                    if t in seen:
+                        continue
+                    seen.add(t)
+                    # 恢复条目排在当前条目之后（保持原有阅读顺序）
+                    value = bullet_value(t, keywords, j) - _RESTORED_PENALTY
+                    pool.append(_Candidate(i, t, value, len(proj.optimized_bullets) + j))
+        out.append(pool)
+    return out
+
+
+def _ranked(pools: list[list[_Candidate]], max_per_project: int) -> list[_Candidate]:
+    """预算递增时按此顺序加入：先保证每个项目最有价值的一条，其余按价值贪心（受单项目上限约束）。
+
+    前缀嵌套 → 预算越大内容越多，高度单调，可二分。
+    """
+    ranked: list[_Candidate] = []
+    rest: list[_Candidate] = []
+    for pool in pools:
+        by_value = sorted(pool, key=lambda c: -c.value)
+        ranked.extend(by_value[:1])
+        rest.extend(by_value[1:max_per_project])
+    ranked.extend(sorted(rest, key=lambda c: -c.value))
+    return ranked
+
+
+def _with_budget(resume: Resume, ranked: list[_Candidate], budget: int, n_skills: int) -> Resume:
+    chosen: dict[int, list[_Candidate]] = {}
+    for c in ranked[:budget]:
+        chosen.setdefault(c.project, []).append(c)
+    experience = [
+        proj.model_copy(
+            update={
+                "optimized_bullets": [c.text for c in sorted(chosen.get(i, []), key=lambda c: c.order)]
+            }
+        )
+        for i, proj in enumerate(resume.experience)
+    ]
+    return resume.model_copy(update={"experience": experience, "skills": resume.skills[:n_skills]})
+
+
+async def fit_resume_layout(
+    resume: Resume,
+    template_name: str,
+    *,
+    history: Sequence[Resume] = (),
+    max_per_project: int = MAX_BULLETS_PER_PROJECT,
+    min_skills: int = MIN_SKILLS,
+) -> FitResult | None:
+    """二分 bullet 预算，找到「不溢出的最多内容」；该点为 PERFECT 则返回，否则 None（交给 LLM）。
+
+    每次探测走 check_resume_layout（本地估算可定论时不开页面）。
+    """
+    if not resume.experience:
+        return None
+    ranked = _ranked(_candidates(resume, history), max_per_project)
+    min_budget, max_budget = len(resume.experience), len(ranked)
+    probes = 0
+    memo: dict[tuple[int, int], tuple[str, LayoutReport]] = {}
+
+    async def status_at(budget: int, n_skills: int) -> LayoutStatus:
+        nonlocal probes
+        if (budget, n_skills) not in memo:
+            probes += 1
+            candidate = _with_budget(resume, ranked, budget, n_skills)
+            html_content = render_html(candidate.model_dump(), template_name)
+            report = await check_resume_layout(candidate, template_name, html_content)
+            memo[(budget, n_skills)] = html_content, report
+        return memo[(budget, n_skills)][1].status
+
+    n_skills = len(resume.skills)
+    if await status_at(min_budget, n_skills) == LayoutStatus.OVERFLOW:
+        # 每项目一条仍溢出：收紧技能栏再试
+        n_skills = min(n_skills, min_skills)
+        if await status_at(min_budget, n_skills) == LayoutStatus.OVERFLOW:
+            return None
+    # 不变式：lo 不溢出；找最大不溢出预算
+    lo, hi = min_budget, max_budget
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if await status_at(mid, n_skills) == LayoutStatus.OVERFLOW:
+            hi = mid - 1
+        else:
+            lo = mid
+    if await status_at(lo, n_skills) != LayoutStatus.PERFECT:
+        return None
+    return FitResult(
+        resume=_with_budget(resume, ranked, lo, n_skills),
+        bullets_before=sum(len(p.optimized_bullets) for p in resume.experience),
+        bullets_after=lo,
+        skills_before=len(resume.skills),
+        skills_after=n_skills,
+        probes=probes,
+        html=memo[(lo, n_skills)][0],
+        report=memo[(lo, n_skills)][1],
+    )
+
+
+async def run_fit_layout(
+    workspace: ResumeWorkspace,
+    status: StatusCallback,
+    layout_status: LayoutStatus,
+) -> tuple[str, LayoutReport] | None:
+    """对工作区初稿做本地拟合；成功则写回 draft（旧版本入历史）并返回终点的 (HTML, PERFECT 报告)。"""
+    if workspace.draft is None:
+        raise RuntimeError("run_fit_layout: draft 为空")
+    started = time.perf_counter()
+    fit = await fit_resume_layout(
+        workspace.draft, workspace.template_name, history=workspace.draft_history
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if fit is None:
+        status(
+            f"🧩 本地版面拟合未收敛（{layout_status.value}，{elapsed_ms:.0f}ms），交给 LLM 精修",
+            "\033[90m",
+        )
+        return None
+    workspace.steps.cancel_speculative()
+    workspace.draft_history.append(workspace.draft)
+    workspace.draft = fit.resume
+    workspace.layout_feedback = fit.report
+    status(
+        f"🧩 本地版面拟合 | {layout_status.value}→PERFECT | bullets {fit.bullets_before}→{fit.bullets_after} | "
+        f"skills {fit.skills_before}→{fit.skills_after} | 探测 {fit.probes} 次 | {elapsed_ms:.0f}ms",
+        "\033[35m",
+    )
+    return fit.html, fit.report
@@ -3,9 +3,13 @@ Playwright 渲染 HTML，感知相对 A4 单页的溢出/留白（与 utils.save
 """
 from __future__ import annotations
 
-from playwright.async_api import async_playwright
+from dataclasses import dataclass
+from typing import Container
 
+from ..browser_pool import get_browser_pool
 from ..models import LayoutStatus
+from ..tracing import span
+from ..utils import page_to_pdf
 
 # 与 utils.save_as_pdf 中 A4 @ 96dpi 一致（297mm ≈ 1123px）
 A4_HEIGHT_PX = 1123
@@ -18,21 +22,8 @@ USABLE_CONTENT_PX = A4_HEIGHT_PX - _PAD_VERTICAL_PX
 MIN_INNER_FILL_RATIO = 0.88
 
 
-async def validate_html_layout(html_content: str) -> tuple[LayoutStatus, str]:
-    """渲染 HTML，返回版面状态与人读反馈文案。"""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        try:
-            # A4 宽 @96dpi ≈ 794px，与打印换行一致
-            context = await browser.new_context(
-                viewport={"width": 794, "height": A4_HEIGHT_PX},
-                device_scale_factor=1,
-            )
-            page = await context.new_page()
-            await page.set_content(html_content, wait_until="domcontentloaded")
-
-            metrics = await page.evaluate(
-                """() => {
+# 与版面判定同口径的两项度量：整页高度、.page-container 子块高度和
+_METRICS_JS = """() => {
   const docH = Math.max(
     document.body ? document.body.scrollHeight : 0,
     document.documentElement ? document.documentElement.scrollHeight : 0
@@ -46,32 +37,76 @@ async def validate_html_layout(html_content: str) -> tuple[LayoutStatus, str]:
   }
   return { docH, inner };
 }"""
-            )
-            total_height = int(metrics["docH"])
-            inner_sum = int(metrics["inner"])
 
-        finally:
-            await browser.close()
 
+async def _load_and_measure(page, html_content: str) -> tuple[int, int]:
+    with span("layout.set_content", html_bytes=len(html_content)):
+        await page.set_content(html_content, wait_until="domcontentloaded")
+    with span("layout.evaluate"):
+        metrics = await page.evaluate(_METRICS_JS)
+    return int(metrics["docH"]), int(metrics["inner"])
+
+
+async def measure_html_layout(html_content: str) -> tuple[int, int]:
+    """Chromium 实测 (整页高度, 正文块高度和)。"""
+    with span("layout.measure"):
+        async with get_browser_pool().page() as page:
+            return await _load_and_measure(page, html_content)
+
+
+def classify_layout(
+    total_height: int, inner_sum: int, *, source: str = ""
+) -> tuple[LayoutStatus, str]:
+    """按溢出/填充阈值判定版面，返回状态与人读反馈；source 标注度量来源（如「本地估算」）。"""
     min_inner_px = int(USABLE_CONTENT_PX * MIN_INNER_FILL_RATIO)
+    tag = f"（{source}）" if source else ""
 
     if total_height > OVERFLOW_THRESHOLD_PX:
         msg = (
-            f"OVERFLOW: 当前简历超过一页（渲染高度约 {total_height}px，"
+            f"OVERFLOW: 当前简历超过一页（渲染高度约 {total_height}px{tag}，"
             f"单页上限约 {A4_HEIGHT_PX}px）。请精简项目描述、合并技能点或缩短 summary，确保一页内。"
         )
         return LayoutStatus.OVERFLOW, msg
 
     if inner_sum > 0 and inner_sum < min_inner_px:
         msg = (
-            f"UNDERFLOW: 正文块（.page-container 内子元素）高度约 {inner_sum}px，"
+            f"UNDERFLOW: 正文块（.page-container 内子元素）高度约 {inner_sum}px{tag}，"
             f"低于「可排版区约 {USABLE_CONTENT_PX}px」的 {int(MIN_INNER_FILL_RATIO * 100)}%（阈值 {min_inner_px}px）；"
             "模板仍会占满一张 A4，底部易显空。请扩充项目经历/技能等（须来自用户思绪）。"
         )
         return LayoutStatus.UNDERFLOW, msg
 
     return LayoutStatus.PERFECT, (
-        f"PERFECT: 未超页（总高约 {total_height}px）；"
+        f"PERFECT: 未超页（总高约 {total_height}px{tag}）；"
         f"正文块高约 {inner_sum}px（≥{min_inner_px}px）。"
         "注意：这是像素规则，不是「肉眼铺满」；纸面留白还与字号、段距有关。"
     )
+
+
+@dataclass
+class LayoutReport:
+    status: LayoutStatus
+    feedback: str
+    total_height: int
+    inner_height: int
+    # 判定结果落在 pdf_on 内时，直接由同一页面打印的 PDF
+    pdf: bytes | None = None
+
+
+async def inspect_html_layout(
+    html_content: str, *, pdf_on: Container[LayoutStatus] = ()
+) -> LayoutReport:
+    """一次页面加载内完成度量与判定；状态命中 pdf_on 时复用已测高度直接出 PDF。"""
+    with span("layout.inspect") as sp:
+        async with get_browser_pool().page() as page:
+            total_height, inner_sum = await _load_and_measure(page, html_content)
+            status, feedback = classify_layout(total_height, inner_sum)
+            pdf = await page_to_pdf(page, total_height) if status in pdf_on else None
+        sp.set(status=status.value, total_height=total_height, inner_height=inner_sum)
+    return LayoutReport(status, feedback, total_height, inner_sum, pdf)
+
+
+async def validate_html_layout(html_content: str) -> tuple[LayoutStatus, str]:
+    """渲染 HTML，返回版面状态与人读反馈文案。"""
+    report = await inspect_html_layout(html_content)
+    return report.status, report.feedback
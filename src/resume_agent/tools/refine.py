@@ -25,7 +25,7 @@ def register_refine_tool(
             return (
                 "精修次数已达上限。请直接输出最终 Resume JSON，禁止再调用 refine_resume。"
             )
-        await run_refine(ctx.deps, model, prompts, status)
+        await ctx.deps.steps.run("refine", lambda: run_refine(ctx.deps, model, prompts, status))
         d = ctx.deps.draft
         assert d is not None
         return (
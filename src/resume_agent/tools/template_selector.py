@@ -0,0 +1,89 @@
+"""
+--template auto：同一份初稿渲染到全部模板，并发校验（浏览器池多页并行），
+选 PERFECT（或最接近 PERFECT）的模板，避免为「换个模板就放得下」的内容花 LLM 改写。
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Container
+
+from ..context import ResumeWorkspace, StatusCallback
+from ..models import LayoutStatus, Resume
+from ..template_registry import get_template_registry
+from .layout_estimator import check_resume_layout
+from .layout_validator import (
+    MIN_INNER_FILL_RATIO,
+    OVERFLOW_THRESHOLD_PX,
+    USABLE_CONTENT_PX,
+    _PAD_VERTICAL_PX,
+    LayoutReport,
+)
+
+AUTO_TEMPLATE = "auto"
+
+
+@dataclass
+class TemplateFit:
+    template_name: str
+    html: str
+    report: LayoutReport
+
+    @property
+    def distance_px(self) -> float:
+        """距 PERFECT 区间的像素差：溢出看超出阈值多少，留白看距最低填充多少。"""
+        if self.report.status == LayoutStatus.OVERFLOW:
+            content_height = self.report.inner_height + _PAD_VERTICAL_PX
+            return max(self.report.total_height, content_height) - OVERFLOW_THRESHOLD_PX
+        if self.report.status == LayoutStatus.UNDERFLOW:
+            return USABLE_CONTENT_PX * MIN_INNER_FILL_RATIO - self.report.inner_height
+        return 0.0
+
+
+async def evaluate_templates(
+    resume: Resume,
+    template_names: list[str] | None = None,
+    *,
+    pdf_on: Container[LayoutStatus] = (),
+) -> list[TemplateFit]:
+    """渲染到各模板（默认全部）并发校验；本地估算可定论的模板不开页面。"""
+    rendered = get_template_registry().render_many(resume.model_dump(), template_names)
+    reports = await asyncio.gather(
+        *(check_resume_layout(resume, name, html, pdf_on=pdf_on) for name, html in rendered.items())
+    )
+    return [
+        TemplateFit(name, html, report)
+        for (name, html), report in zip(rendered.items(), reports)
+    ]
+
+
+def pick_template(fits: list[TemplateFit]) -> TemplateFit:
+    """PERFECT 中取正文最满的；都不达标时取距 PERFECT 最近的。"""
+    if not fits:
+        raise ValueError("pick_template: 没有候选模板")
+    return min(fits, key=lambda f: (f.distance_px, -f.report.inner_height))
+
+
+async def run_select_template(
+    workspace: ResumeWorkspace,
+    status: StatusCallback,
+    *,
+    pdf_on: Container[LayoutStatus] = (),
+) -> tuple[str, LayoutReport]:
+    """为工作区初稿选模板：写回 workspace.template_name 与 layout_feedback，返回 (HTML, 报告)。"""
+    if workspace.draft is None:
+        raise RuntimeError("run_select_template: draft 为空")
+    draft = workspace.draft
+    fits = await evaluate_templates(draft, pdf_on=pdf_on)
+    best = pick_template(fits)
+    summary = " | ".join(
+        f"{f.template_name.removesuffix('.html')} {f.report.status.value} "
+        f"{f.report.inner_height}px"
+        for f in fits
+    )
+    status(f"🗂  模板自动选择 | {summary}", "\033[90m")
+    status(f"🗂  选用 {best.template_name}（{best.report.status.value}）", "\033[92m")
+    if workspace.draft is draft:
+        workspace.template_name = best.template_name
+        workspace.layout_feedback = best.report
+    return best.html, best.report
@@ -0,0 +1,211 @@
+"""
+轻量结构化追踪：流水线各阶段的 span（含属性与父子关系），可导出为 Chrome trace JSON
+（chrome://tracing / Perfetto 可直接打开，附按 span 名汇总的 p50/p95），
+并可选同步到 OpenTelemetry（需安装 opentelemetry-sdk）。
+
+未启用时 span() 为空操作，开销可忽略。
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: int
+    parent_id: int | None
+    lane: str
+    start_ns: int
+    end_ns: int | None = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    _otel: Any = field(default=None, repr=False)
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.perf_counter_ns()) - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar(
+    "resume_agent_span", default=None
+)
+
+
+def _otel_value(value: Any) -> Any:
+    return value if isinstance(value, (bool, int, float, str)) else str(value)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """已升序列表的 q 分位（最近秩法，0 ≤ q ≤ 1）；列表须非空。"""
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class Tracer:
+    def __init__(self) -> None:
+        # 内存缓冲只随 start()（--profile / 基准）开启；--otel 单独导出，不在进程内累积 span
+        self.recording = False
+        self.spans: list[Span] = []
+        self._ids = itertools.count(1)
+        self._t0_ns = time.perf_counter_ns()
+        self._otel_tracer: Any = None
+        self._otel_provider: Any = None
+
+    def start(self) -> None:
+        """开始记录（清空已有 span）。"""
+        self.spans.clear()
+        self._t0_ns = time.perf_counter_ns()
+        self.recording = True
+
+    @property
+    def enabled(self) -> bool:
+        return self.recording or self._otel_tracer is not None
+
+    @contextmanager
+    def _span(self, name: str, attrs: dict[str, Any]) -> Iterator[Span]:
+        parent = _current.get()
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        sp = Span(
+            name=name,
+            span_id=next(self._ids),
+            parent_id=parent.span_id if parent else None,
+            lane=task.get_name() if task is not None else "main",
+            start_ns=time.perf_counter_ns(),
+            attrs=attrs,
+        )
+        if self._otel_tracer is not None:
+            from opentelemetry import trace
+
+            ctx = trace.set_span_in_context(parent._otel) if parent and parent._otel else None
+            sp._otel = self._otel_tracer.start_span(name, context=ctx)
+        token = _current.set(sp)
+        try:
+            yield sp
+        except BaseException as e:
+            sp.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current.reset(token)
+            sp.end_ns = time.perf_counter_ns()
+            if self.recording:
+                self.spans.append(sp)
+            if sp._otel is not None:
+                sp._otel.set_attributes({k: _otel_value(v) for k, v in sp.attrs.items()})
+                if sp.error:
+                    sp._otel.set_attribute("error", sp.error)
+                sp._otel.end()
+
+    def span(self, name: str, **attrs: Any):
+        """with span("layout.evaluate", template=...) as sp: ...；sp.set(...) 追加属性。"""
+        if not self.enabled:
+            return nullcontext(_NOOP)
+        return self._span(name, attrs)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """按 span 名汇总：次数、总耗时、p50 / p95 / 最大值（毫秒）。"""
+        by_name: dict[str, list[float]] = {}
+        for sp in self.spans:
+            by_name.setdefault(sp.name, []).append(sp.duration_ms)
+        out = {}
+        for name, values in by_name.items():
+            values.sort()
+            out[name] = {
+                "count": len(values),
+                "total_ms": round(sum(values), 2),
+                "p50_ms": round(percentile(values, 0.5), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "max_ms": round(values[-1], 2),
+            }
+        return dict(sorted(out.items(), key=lambda kv: -kv[1]["total_ms"]))
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Chrome Trace Event 格式（complete 事件）；每个 asyncio 任务一条泳道。"""
+        lanes: dict[str, int] = {}
+        events = []
+        for sp in sorted(self.spans, key=lambda s: s.start_ns):
+            tid = lanes.setdefault(sp.lane, len(lanes) + 1)
+            args = {k: _otel_value(v) for k, v in sp.attrs.items()}
+            if sp.error:
+                args["error"] = sp.error
+            events.append(
+                {
+                    "name": sp.name,
+                    "ph": "X",
+                    "ts": (sp.start_ns - self._t0_ns) / 1e3,
+                    "dur": sp.duration_ms * 1e3,
+                    "pid": os.getpid(),
+                    "tid": tid,
+                    "args": {"span_id": sp.span_id, "parent_id": sp.parent_id, **args},
+                }
+            )
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": lane}}
+            for lane, tid in lanes.items()
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms", "summary": self.summary()}
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, ensure_ascii=False)
+
+    def enable_otel(self) -> None:
+        """同步到 OpenTelemetry：未配置全局 TracerProvider 时自建一个，
+        优先 OTLP 导出（遵循 OTEL_EXPORTER_OTLP_* 环境变量），否则输出到控制台。"""
+        try:
+            from opentelemetry import trace
+            from opentelemetry.sdk.trace import TracerProvider
+            from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+        except ImportError as e:
+            raise RuntimeError(
+                "OpenTelemetry 导出需要 opentelemetry-sdk：pip install 'resume-agent[otel]'"
+            ) from e
+        if not isinstance(trace.get_tracer_provider(), TracerProvider):
+            try:
+                from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+                exporter = OTLPSpanExporter()
+            except ImportError:
+                exporter = ConsoleSpanExporter()
+            self._otel_provider = TracerProvider()
+            self._otel_provider.add_span_processor(BatchSpanProcessor(exporter))
+            trace.set_tracer_provider(self._otel_provider)
+        self._otel_tracer = trace.get_tracer("resume_agent")
+
+    def shutdown(self) -> None:
+        """刷新并关闭自建的 OpenTelemetry provider。"""
+        if self._otel_provider is not None:
+            self._otel_provider.shutdown()
+            self._otel_provider = None
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def span(name: str, **attrs: Any):
+    """进程级 tracer 的 span 快捷方式。"""
+    return _tracer.span(name, **attrs)
@@ -1,6 +1,11 @@
+import asyncio
 import os
-from jinja2 import Environment, FileSystemLoader
-from playwright.sync_api import sync_playwright
+from typing import Iterable
+
+from .browser_pool import get_browser_pool, shutdown_browser_pool
+from .context import ResumeBuild
+from .template_registry import get_template_registry
+from .tracing import span
 
 
 def load_text(file_path: str) -> str:
@@ -17,11 +22,12 @@ def save_text(content: str, file_path: str) -> None:
 
 
 def render_html(data: dict, template_name: str = "swiss_single_column.html") -> str:
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    templates_dir = os.path.join(current_dir, "templates")
-    env = Environment(loader=FileSystemLoader(templates_dir))
-    template = env.get_template(template_name)
-    return template.render(**data)
+    return get_template_registry().render(data, template_name)
+
+
+def render_html_many(data: dict, template_names: Iterable[str] | None = None) -> dict[str, str]:
+    """一份数据渲染到多个模板（默认全部），返回 {模板名: HTML}。"""
+    return get_template_registry().render_many(data, template_names)
 
 def save_as_html(data: dict, output_path: str, template_name: str = "swiss_single_column.html"):
     html_content = render_html(data, template_name)
@@ -30,34 +36,92 @@ def save_as_html(data: dict, output_path: str, template_name: str = "swiss_singl
         f.write(html_content)
     # 保持安静，不输出日志
 
-def save_as_pdf(html_path: str, output_path: str):
-    abs_html_path = os.path.abspath(html_path)
-    if not os.path.exists(abs_html_path):
-        raise FileNotFoundError(f"HTML 文件未找到: {abs_html_path}")
+A4_HEIGHT_PX = 1123  # A4 @ 96dpi
 
-    # 简化输出
-    print("📄 正在生成 PDF (智能排版中)...")
-    
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.goto(f"file://{abs_html_path}")
-        page.wait_for_load_state("networkidle")
-
-        A4_HEIGHT_PX = 1123  # A4 @ 96dpi
-        content_height = page.evaluate("document.body.scrollHeight")
-        scale = min(A4_HEIGHT_PX / content_height, 1.0) if content_height > A4_HEIGHT_PX else 1.0
-        scale = max(scale, 0.75)
-
-        page.pdf(
-            path=output_path,
+
+async def page_to_pdf(page, content_height: int, path: str | None = None) -> bytes:
+    """按已测内容高度把页面缩放进单张 A4（最小 0.75 倍）并打印为 PDF。"""
+    scale = min(A4_HEIGHT_PX / content_height, 1.0) if content_height > A4_HEIGHT_PX else 1.0
+    scale = max(scale, 0.75)
+    with span("pdf.print", scale=round(scale, 3)) as sp:
+        pdf = await page.pdf(
+            path=path,
             format="A4",
             print_background=True,
             margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
             scale=scale,
         )
-        browser.close()
-    
+        sp.set(pdf_bytes=len(pdf))
+    return pdf
+
+
+async def html_to_pdf_async(html_content: str) -> bytes:
+    """内存 HTML 直接出 PDF（无需先落盘再 file:// 加载）。"""
+    with span("pdf.export"):
+        async with get_browser_pool().page() as page:
+            await page.set_content(html_content, wait_until="domcontentloaded")
+            content_height = await page.evaluate("document.body.scrollHeight")
+            return await page_to_pdf(page, content_height)
+
+
+async def save_as_pdf_async(html_path: str, output_path: str, *, quiet: bool = False):
+    abs_html_path = os.path.abspath(html_path)
+    if not os.path.exists(abs_html_path):
+        raise FileNotFoundError(f"HTML 文件未找到: {abs_html_path}")
+
+    # 简化输出
+    if not quiet:
+        print("📄 正在生成 PDF (智能排版中)...")
+
+    # 模板无外部资源：直接 set_content，不走 file:// 导航、不等 networkidle
+    async with get_browser_pool().page() as page:
+        await page.set_content(load_text(abs_html_path), wait_until="domcontentloaded")
+        content_height = await page.evaluate("document.body.scrollHeight")
+        await page_to_pdf(page, content_height, path=output_path)
+
     # 只输出最终的成功文件路径，使用相对路径更友好
-    rel_path = os.path.relpath(output_path)
-    print(f"🎉 简历生成成功！\n👉 {rel_path}")
+    if not quiet:
+        rel_path = os.path.relpath(output_path)
+        print(f"🎉 简历生成成功！\n👉 {rel_path}")
+
+def save_as_pdf(html_path: str, output_path: str):
+    """同步入口：独占一个事件循环，结束时关闭浏览器池。"""
+    async def _run() -> None:
+        try:
+            await save_as_pdf_async(html_path, output_path)
+        finally:
+            await shutdown_browser_pool()
+
+    asyncio.run(_run())
+
+
+def _write_files(files: dict[str, str | bytes]) -> None:
+    for path, content in files.items():
+        if isinstance(content, str):
+            save_text(content, path)
+        else:
+            with open(path, "wb") as f:
+                f.write(content)
+
+
+async def save_build_async(
+    build: ResumeBuild,
+    output_path: str,
+    *,
+    write_pdf: bool = True,
+    write_json: bool = True,
+) -> dict[str, str]:
+    """落盘一次流水线产物：HTML 必写；PDF 优先用校验页已出的字节；JSON 为最终 Resume。
+    写文件放到线程里，批量 / 服务模式下不阻塞事件循环。"""
+    stem = os.path.splitext(output_path)[0]
+    paths = {"html": output_path}
+    files: dict[str, str | bytes] = {output_path: build.html}
+    with span("artifacts.save", pdf_reused=build.pdf is not None):
+        if write_json:
+            paths["json"] = f"{stem}.json"
+            files[paths["json"]] = build.resume.model_dump_json(indent=2)
+        if write_pdf:
+            paths["pdf"] = f"{stem}.pdf"
+            files[paths["pdf"]] = build.pdf if build.pdf is not None else await html_to_pdf_async(build.html)
+        await asyncio.to_thread(_write_files, files)
+    return paths
@@ -0,0 +1,52 @@
+"""基准工具单元测试：fake LLM 替身服务与基线对比"""
+
+import asyncio
+
+from pydantic_ai import Agent
+from pydantic_ai.models.openai import OpenAIChatModel
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from resume_agent.bench.fake_llm import FakeLLMConfig, FakeLLMServer
+from resume_agent.bench.pipeline import compare
+from resume_agent.models import Resume, ResumeCritique
+from resume_agent.token_usage import run_usage
+
+
+def test_fake_llm_serves_canned_outputs_with_prefix_cache() -> None:
+    """按输出 schema 返回 Resume / ResumeCritique；同前缀的第二次请求报告缓存命中；流式可用"""
+    with FakeLLMServer(FakeLLMConfig(latency_s=0, tokens_per_s=0)) as server:
+        model = OpenAIChatModel(
+            "fake", provider=OpenAIProvider(api_key="fake-bench-key", base_url=server.base_url)
+        )
+        prefix = "共用前缀" * 200
+
+        async def _run() -> None:
+            first = await Agent(model, output_type=Resume, instructions="x").run(prefix + "A")
+            assert first.output.experience
+            second = await Agent(model, output_type=ResumeCritique, instructions="x").run(prefix + "B")
+            assert second.output.needs_revision is False
+            assert run_usage(second).cache_read_tokens > 0
+            async with Agent(model, output_type=Resume).run_stream("流式") as streamed:
+                assert (await streamed.get_output()) == first.output
+
+        asyncio.run(_run())
+        assert server.requests == 3
+
+
+def test_compare_flags_regressions_beyond_tolerance() -> None:
+    baseline = {
+        "results": [
+            {"scenario": "e2e", "concurrency": 4, "failed": 0, "p95_s": 2.0, "throughput_per_s": 2.0},
+            {"scenario": "layout", "concurrency": 4, "failed": 0, "p95_s": 0.5, "throughput_per_s": 10.0},
+        ]
+    }
+    current = {
+        "results": [
+            {"scenario": "e2e", "concurrency": 4, "failed": 0, "p95_s": 2.2, "throughput_per_s": 1.9},
+            {"scenario": "layout", "concurrency": 4, "failed": 1, "p95_s": 0.8, "throughput_per_s": 6.0},
+            {"scenario": "batch", "concurrency": 1, "failed": 0, "p95_s": 9.0, "throughput_per_s": 0.1},
+        ]
+    }
+    regressions = compare(current, baseline, tolerance=0.25)
+    assert len(regressions) == 3
+    assert all(r.startswith("layout@4") for r in regressions)
@@ -0,0 +1,79 @@
+"""best-of-N 初稿：并发起草、写完即评审，达标即取消在途候选并跳过精修"""
+
+import asyncio
+import time
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent import orchestrator
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.models import LayoutStatus
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.steps import fabrications
+from resume_agent.tools.layout_validator import LayoutReport
+
+
+class _Pool:
+    async def warm_up(self) -> None:
+        pass
+
+
+def test_best_of_n_picks_clean_high_scoring_draft_and_cancels_stragglers(tmp_path, monkeypatch) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    good, weak = synthetic_resumes(2)
+    # 弱候选评审不达标（且项目名不在思绪中）
+    weak = weak.model_copy(update={"summary": "weak"})
+    calls: list[str] = []
+    delays = {0.2: (0.01, weak), 0.5: (0.05, good), 0.9: (5.0, weak)}
+
+    async def fn(messages, info):
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            calls.append("critique")
+            ok = '"summary":"weak"' not in messages[-1].parts[-1].content
+            args = {"critique": "c", "missing_keywords": [], "score": 92 if ok else 60, "needs_revision": not ok}
+        elif "operations" in props:
+            calls.append("refine")
+            args = {"operations": [], "match_score": 80}
+        else:
+            calls.append("draft")
+            delay, resume = delays[info.model_settings["temperature"]]
+            await asyncio.sleep(delay)
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    async def check(workspace, *, pdf_on=()):
+        return "<html></html>", LayoutReport(LayoutStatus.PERFECT, "ok", 0, 0)
+
+    monkeypatch.setattr(orchestrator, "get_browser_pool", lambda: _Pool())
+    monkeypatch.setattr(orchestrator, "check_workspace_layout", check)
+    started = time.perf_counter()
+    out = asyncio.run(
+        orchestrator.build_resume_artifacts_async(
+            "JD",
+            good.model_dump_json(),
+            "fake",
+            ResumePrompts(),
+            model=FunctionModel(fn),
+            export_pdf=False,
+            n_drafts=3,
+            draft_temperatures=[0.2, 0.5, 0.9],
+        )
+    )
+    assert out.resume == good and out.layout_status == LayoutStatus.PERFECT
+    assert calls.count("draft") == 3 and calls.count("critique") == 2 and "refine" not in calls
+    assert time.perf_counter() - started < 2
+    assert out.tokens["draft"].requests == 2
+
+
+def test_reworded_project_name_is_not_a_fabrication() -> None:
+    resume = synthetic_resumes(1)[0]
+    thoughts = "去年主导重构了订单系统，把 Kafka 消息链路迁到新集群。"
+    projects = [
+        p.model_copy(update={"project_name": name})
+        for p, name in zip(resume.experience * 2, ["订单系统重构", "Kafka 消息链路迁移", "智能推荐平台"])
+    ]
+    suspects = fabrications(resume.model_copy(update={"experience": projects}), None, thoughts)
+    assert suspects == ["智能推荐平台"]
@@ -0,0 +1,135 @@
+"""BrowserPool 记账：断连 / 轮换的浏览器归还后不再回到在用表（以假浏览器代替 Chromium）"""
+
+import asyncio
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent import orchestrator
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.browser_pool import BrowserPool
+from resume_agent.models import LayoutStatus
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.tools import critique as critique_tool
+from resume_agent.tools.layout_estimator import LayoutEstimate
+from resume_agent.tools.layout_validator import LayoutReport
+
+
+class _Context:
+    async def new_page(self):
+        return object()
+
+    async def close(self) -> None:
+        pass
+
+
+class _Browser:
+    def __init__(self) -> None:
+        self.connected = True
+        self.closed = 0
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        return _Context()
+
+    async def close(self) -> None:
+        self.closed += 1
+        self.connected = False
+
+
+def test_disconnected_and_retired_browsers_are_not_tracked_after_release(monkeypatch) -> None:
+    pool = BrowserPool(max_pages_per_browser=1)
+    launched: list[_Browser] = []
+
+    async def launch():
+        browser = _Browser()
+        launched.append(browser)
+        pool.launches += 1
+        pool._served = 0
+        pool._in_use[browser] = 0
+        return browser
+
+    monkeypatch.setattr(pool, "_launch", launch)
+
+    async def _run() -> None:
+        async with pool.page():
+            launched[0].connected = False  # 使用中崩溃
+            async with pool.page():  # 发现不健康，换新浏览器
+                pass
+        assert launched[0] not in pool._in_use and pool.is_healthy()
+        async with pool.page():  # 发满 1 页：轮换，旧浏览器空闲即关闭
+            pass
+        assert launched[1].closed == 1 and launched[1] not in pool._in_use
+        assert list(pool._in_use) == [launched[2]] and pool._in_use[launched[2]] == 0
+
+    asyncio.run(_run())
+
+
+def test_cancelled_caller_does_not_abort_a_launch_in_progress(monkeypatch) -> None:
+    pool = BrowserPool()
+    launched: list[_Browser] = []
+
+    async def launch():
+        pool.launches += 1
+        await asyncio.sleep(0.05)
+        browser = _Browser()
+        launched.append(browser)
+        pool._in_use[browser] = 0
+        return browser
+
+    monkeypatch.setattr(pool, "_launch", launch)
+
+    async def _run() -> None:
+        warm = asyncio.ensure_future(pool.warm_up())
+        await asyncio.sleep(0.01)
+        warm.cancel()
+        await asyncio.gather(warm, return_exceptions=True)
+        async with pool.page():  # 接手同一次启动，而不是再起一个
+            pass
+        assert pool.launches == len(launched) == 1 and pool.is_healthy()
+
+    asyncio.run(_run())
+
+
+def test_pipeline_warms_browser_only_when_it_will_be_used(tmp_path, monkeypatch) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    resume = synthetic_resumes(1)[0]
+    warmed: list[int] = []
+
+    def fn(messages, info):
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            args = {"critique": "ok", "missing_keywords": [], "score": 95, "needs_revision": False}
+        else:
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    class _Pool:
+        async def warm_up(self) -> None:
+            warmed.append(1)
+
+    async def check(workspace, *, pdf_on=()):
+        return "<html></html>", LayoutReport(LayoutStatus.PERFECT, "ok", 0, 0)
+
+    monkeypatch.setattr(orchestrator, "get_browser_pool", lambda: _Pool())
+    monkeypatch.setattr(orchestrator, "check_workspace_layout", check)
+    monkeypatch.setattr(critique_tool, "check_workspace_layout", check)
+
+    def build(margin: float, export_pdf: bool = False) -> None:
+        monkeypatch.setattr(orchestrator, "estimate_layout", lambda r, t: LayoutEstimate(1123, 500, margin))
+        warmed.clear()
+        asyncio.run(
+            orchestrator.build_resume_artifacts_async(
+                "JD", "思绪", "fake", ResumePrompts(), model=FunctionModel(fn), export_pdf=export_pdf
+            )
+        )
+
+    build(margin=20)
+    assert warmed == []  # 估算可定论且不出 PDF：不启动 Chromium
+    build(margin=float("inf"))
+    assert warmed == [1]
+    build(margin=20, export_pdf=True)
+    assert warmed == [1]
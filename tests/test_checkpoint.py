@@ -0,0 +1,108 @@
+"""检查点：版面阶段崩溃后从首个未完成阶段继续，指纹不符拒绝复用"""
+
+import asyncio
+
+import pytest
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent import orchestrator
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.checkpoint import CheckpointMismatch, load_checkpoint
+from resume_agent.models import LayoutStatus
+from resume_agent.resilience import DeadlineExceeded
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.tools import critique as critique_tool
+from resume_agent.tools.layout_validator import LayoutReport
+
+
+class _Pool:
+    async def warm_up(self) -> None:
+        pass
+
+
+def test_resume_from_checkpoint_skips_completed_llm_steps(tmp_path, monkeypatch) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    resume = synthetic_resumes(1)[0]
+    calls: list[str] = []
+
+    def fn(messages, info):
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            calls.append("critique")
+            args = {"critique": "c", "missing_keywords": [], "score": 70, "needs_revision": True}
+        elif "operations" in props:
+            calls.append("refine")
+            args = {"operations": [], "match_score": 80}
+        else:
+            calls.append("draft")
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    crash = {"on": True}
+
+    async def check(workspace, *, pdf_on=()):
+        if crash["on"]:
+            raise RuntimeError("浏览器崩溃")
+        return "<html></html>", LayoutReport(LayoutStatus.PERFECT, "ok", 0, 0)
+
+    monkeypatch.setattr(orchestrator, "get_browser_pool", lambda: _Pool())
+    monkeypatch.setattr(orchestrator, "check_workspace_layout", check)
+    monkeypatch.setattr(critique_tool, "check_workspace_layout", check)
+    model, path = FunctionModel(fn), str(tmp_path / "job.ckpt.json.gz")
+
+    def build(jd: str = "JD", **kw):
+        return asyncio.run(
+            orchestrator.build_resume_artifacts_async(
+                jd, "思绪", "fake", ResumePrompts(), model=model, export_pdf=False, **kw
+            )
+        )
+
+    with pytest.raises(RuntimeError):
+        build(checkpoint=path)
+    assert calls == ["draft", "critique", "refine"]
+    assert load_checkpoint(path).stage == "refine"
+
+    crash["on"] = False
+    out = build(resume_from=path)
+    assert calls == ["draft", "critique", "refine"]
+    assert out.layout_status == LayoutStatus.PERFECT and out.tokens["draft"].requests == 1
+    assert load_checkpoint(path).stage == "layout"
+
+    with pytest.raises(CheckpointMismatch, match="jd"):
+        build("另一份 JD", resume_from=path)
+
+
+def test_timed_out_stage_is_not_checkpointed_as_done(tmp_path, monkeypatch) -> None:
+    """精修超时：检查点停在评审，续跑时重新精修（而不是记为已完成、连同版面一并跳过）"""
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    resume = synthetic_resumes(1)[0]
+
+    def fn(messages, info):
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            args = {"critique": "c", "missing_keywords": [], "score": 70, "needs_revision": True}
+        elif "operations" in props:
+            args = {"operations": [], "match_score": 80}
+        else:
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    async def check(workspace, *, pdf_on=()):
+        return "<html></html>", LayoutReport(LayoutStatus.PERFECT, "ok", 0, 0)
+
+    async def refine_times_out(*args, **kwargs):
+        raise DeadlineExceeded("refine 超时")
+
+    monkeypatch.setattr(orchestrator, "get_browser_pool", lambda: _Pool())
+    monkeypatch.setattr(orchestrator, "check_workspace_layout", check)
+    monkeypatch.setattr(critique_tool, "check_workspace_layout", check)
+    monkeypatch.setattr(orchestrator, "run_refine", refine_times_out)
+    path = str(tmp_path / "job.ckpt.json.gz")
+    asyncio.run(
+        orchestrator.build_resume_artifacts_async(
+            "JD", "思绪", "fake", ResumePrompts(), model=FunctionModel(fn), export_pdf=False, checkpoint=path
+        )
+    )
+    assert load_checkpoint(path).stage == "critique"
@@ -0,0 +1,87 @@
+"""Tool 模式外层 Agent 的上下文压缩：旧工具结果换成工作区摘要、受 token 上限约束、逐轮计数"""
+
+import asyncio
+from types import SimpleNamespace
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, ToolCallPart, ToolReturnPart, UserPromptPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.context import ResumeWorkspace
+from resume_agent.history import SUMMARY_HEAD, HistoryCompactor, format_context_report
+from resume_agent.models import LayoutStatus
+from resume_agent.orchestrator import run_resume_agent_async
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.tools import critique as critique_tool
+from resume_agent.tools.layout_validator import LayoutReport
+
+
+def test_tool_mode_history_is_compacted_each_turn(tmp_path, monkeypatch) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    resume = synthetic_resumes(1)[0]
+    plan = ["draft_resume", "bad_output", "critique_resume", "final_result"]
+    sent: list[list] = []
+    lines: list[str] = []
+
+    def fn(messages, info):
+        if info.function_tools:
+            sent.append(messages)
+            step = plan[len(sent) - 1]
+            out = info.output_tools[0].name
+            if step == "bad_output":
+                return ModelResponse(parts=[ToolCallPart(out, {**resume.model_dump(), "education": "x"})])
+            if step == "final_result":
+                return ModelResponse(parts=[ToolCallPart(out, ws.draft.model_dump())])
+            return ModelResponse(parts=[ToolCallPart(step, {})])
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            args = {"critique": "补充量化", "missing_keywords": [], "score": 70, "needs_revision": True}
+        elif "operations" in props:
+            args = {"operations": [], "match_score": 88}
+        else:
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    async def check(workspace, *, pdf_on=()):
+        # 推测性版面校验比整个运行还慢：运行结束时须被取消，而不是遗留在后台
+        await asyncio.sleep(30)
+        return "<html></html>", LayoutReport(LayoutStatus.PERFECT, "ok", 0, 0)
+
+    monkeypatch.setattr(critique_tool, "check_workspace_layout", check)
+    ws = ResumeWorkspace(jd_text="JD " * 50, raw_thoughts=resume.model_dump_json())
+    async def _run():
+        output = await run_resume_agent_async(
+            ws, "fake", ResumePrompts(), lambda m, c: lines.append(m), model=FunctionModel(fn)
+        )
+        return output, ws.steps.timings["layout"].state
+
+    output, layout_state = asyncio.run(_run())
+    assert output == ws.draft and ws.critique_calls == 1 and layout_state == "cancelled"
+    last = sent[-1]
+    returns = [p for m in last if isinstance(m, ModelRequest) for p in m.parts if isinstance(p, ToolReturnPart)]
+    assert all("已压缩" in p.content for p in returns[:-1]) and "已压缩" not in returns[-1].content
+    summaries = [p for m in last for p in m.parts if isinstance(p, UserPromptPart) and p.content.startswith(SUMMARY_HEAD)]
+    assert len(summaries) == 1 and "精修 0/1" in summaries[0].content
+    # 未通过校验的整份 Resume 参数已清空
+    assert all(p.args == {} for m in last if isinstance(m, ModelResponse) for p in m.parts if p.tool_name == "final_result")
+
+    turns = ws.context_turns
+    assert len(turns) == len(plan) and turns[-1].sent_tokens < turns[-1].raw_tokens
+    assert all(t.input_tokens > 0 for t in turns)
+    assert format_context_report(turns) in lines
+
+
+def test_ceiling_drops_oldest_exchange_pairs() -> None:
+    ws = ResumeWorkspace(jd_text="JD", raw_thoughts="")
+    messages = [ModelRequest(parts=[UserPromptPart("开始")])]
+    for i in range(6):
+        messages.append(ModelResponse(parts=[ToolCallPart("critique_resume", {}, tool_call_id=f"c{i}")]))
+        messages.append(ModelRequest(parts=[ToolReturnPart("critique_resume", "长结果" * 200, tool_call_id=f"c{i}")]))
+    out = HistoryCompactor(ceiling=60)(SimpleNamespace(deps=ws), messages)
+
+    assert out[0] == messages[0] and out[-2:] == messages[-2:]
+    # 配对完整：每个保留的工具调用都紧跟其结果
+    ids = [p.tool_call_id for m in out[1:] for p in m.parts]
+    assert ids == [x for x in ids[::2] for _ in (0, 1)] and len(out) < len(messages)
+    assert ws.context_turns[0].sent_tokens < ws.context_turns[0].raw_tokens
@@ -0,0 +1,21 @@
+"""启动预算：轻量 CLI 入口不加载 LLM 栈 / Playwright，导入耗时不超预算"""
+
+from resume_agent.bench.imports import IMPORT_BUDGET_MS, check_budget, parse_importtime, profile_import
+
+
+def test_parse_importtime() -> None:
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   encodings\n"
+        "import time:      2000 |       5000 | resume_agent.main\n"
+    )
+    assert parse_importtime(stderr) == [("encodings", 120.0, 120.0), ("resume_agent.main", 2000.0, 5000.0)]
+
+
+def test_cli_entry_points_stay_within_import_budget() -> None:
+    problems = []
+    for module, budget in IMPORT_BUDGET_MS.items():
+        # 取两次中较快的一次，避免偶发调度抖动
+        profile = min((profile_import(module) for _ in range(2)), key=lambda p: p.total_ms)
+        problems += check_budget(profile, budget)
+    assert problems == []
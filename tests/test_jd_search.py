@@ -0,0 +1,77 @@
+"""JD 语料 BM25 索引：排序、增量同步、持久化"""
+
+import json
+import os
+
+from resume_agent.batch import load_jobs_from_index
+from resume_agent.jd_search import JDIndex
+
+THOUGHTS = "三年 Go 后端，用 Kafka 做订单削峰，Redis 缓存，k8s 部署，做过高并发支付链路。"
+
+
+def test_bm25_ranks_relevant_postings_first() -> None:
+    index = JDIndex()
+    index.add("go", "招聘 Golang 后端：熟悉 Kafka、Redis，有高并发支付经验，了解 Kubernetes。")
+    index.add("java", "招聘 Java 后端：熟悉 Spring Boot、MySQL。")
+    index.add("fe", "招聘前端：熟悉 React、TypeScript、小程序。")
+    index.add("ml", "算法工程师：PyTorch、推荐系统、大模型微调。")
+    hits = index.search(THOUGHTS, 3)
+    assert hits[0].doc_id == "go"
+    index.remove("go")
+    assert "go" not in [h.doc_id for h in index.search(THOUGHTS, 3)]
+
+
+def test_sync_is_incremental_and_index_round_trips(tmp_path) -> None:
+    jd_dir = tmp_path / "jds"
+    jd_dir.mkdir()
+    (jd_dir / "a.txt").write_text("Go 后端，Kafka、Redis，高并发", encoding="utf-8")
+    (jd_dir / "b.txt").write_text("Java 后端，Spring Boot", encoding="utf-8")
+    corpus = tmp_path / "more.jsonl"
+    corpus.write_text(
+        json.dumps({"id": "c", "jd": "支付链路 Go 开发，k8s"}, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    index = JDIndex()
+    assert index.sync(str(jd_dir)) == (2, 0, 0)
+    assert index.sync(str(corpus)) == (1, 0, 0)
+    assert index.sync(str(jd_dir)) == (0, 0, 0)
+
+    (jd_dir / "b.txt").unlink()
+    (jd_dir / "a.txt").write_text("Go 后端，Kafka、Redis，高并发，支付", encoding="utf-8")
+    os.utime(jd_dir / "a.txt", ns=(1, 1))
+    assert index.sync(str(jd_dir)) == (0, 1, 1)
+    assert len(index) == 2 and index.tombstones == 0
+
+    path = str(tmp_path / "index.pkl")
+    index.save(path)
+    loaded = JDIndex.load(path)
+    assert [(h.doc_id, h.score) for h in loaded.search(THOUGHTS)] == [
+        (h.doc_id, h.score) for h in index.search(THOUGHTS)
+    ]
+    jobs = load_jobs_from_index(path, THOUGHTS, top_k=2)
+    assert {j.job_id for j in jobs} == {"jds_a", "more_c"}
+    assert next(j for j in jobs if j.job_id == "more_c").jd_text == "支付链路 Go 开发，k8s"
+
+
+def test_ids_are_namespaced_by_source_and_jd_path_edits_reindex(tmp_path) -> None:
+    for parent in ("x", "y"):
+        (tmp_path / parent / "jds").mkdir(parents=True)
+        (tmp_path / parent / "jds" / "a.txt").write_text(f"{parent} 岗位 Go 后端", encoding="utf-8")
+    (tmp_path / "ref.txt").write_text("Java 后端", encoding="utf-8")
+    corpus = tmp_path / "c.jsonl"
+    lines = [{"jd_path": "ref.txt"}, {"jd": "支付链路 Go 开发"}]
+    corpus.write_text("".join(json.dumps(x, ensure_ascii=False) + "\n" for x in lines), encoding="utf-8")
+
+    index = JDIndex()
+    assert index.sync(str(tmp_path / "x" / "jds")) == (1, 0, 0)
+    assert index.sync(str(tmp_path / "y" / "jds")) == (1, 0, 0)
+    assert index.sync(str(tmp_path / "x" / "jds")) == (0, 0, 0) and len(index) == 2
+    assert index.sync(str(corpus)) == (2, 0, 0) and "c/ref.txt" in index
+
+    # 被引用的 JD 文件改动即重建；前面插入一行不影响其余文档
+    (tmp_path / "ref.txt").write_text("Go 后端，Kafka", encoding="utf-8")
+    os.utime(tmp_path / "ref.txt", ns=(1, 1))
+    lines.insert(0, {"id": "new", "jd": "前端 React"})
+    corpus.write_text("".join(json.dumps(x, ensure_ascii=False) + "\n" for x in lines), encoding="utf-8")
+    assert index.sync(str(corpus)) == (1, 1, 0)
+    hit = next(h for h in index.search("支付链路", 5) if h.doc_id.startswith("c/"))
+    assert hit.read() == "支付链路 Go 开发"
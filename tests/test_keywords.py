@@ -0,0 +1,69 @@
+"""本地 JD 关键词比对与评审门控"""
+
+import asyncio
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent.context import ResumeWorkspace
+from resume_agent.keywords import extract_terms, match_keywords
+from resume_agent.models import EducationEntry, Resume, WorkProject
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.steps import run_critique, run_refine
+
+JD = "熟悉 Golang/Python，有 k8s、Redis、Kafka 经验；了解微服务、高并发，熟悉 MySQL 分库分表，Spring Boot 加分。"
+THOUGHTS = "用 Go 和 Python 写过订单服务，Redis 缓存、Kafka 削峰，部署在 k8s 上；MySQL 做了分库分表，微服务改造，扛住高并发。"
+
+
+def _resume(skills: list[str], bullets: list[str]) -> Resume:
+    return Resume(
+        name="张三",
+        title="后端工程师",
+        contact={},
+        summary="s",
+        skills=skills,
+        experience=[WorkProject(project_name="订单服务", role="dev", optimized_bullets=bullets, matched_skills=[])],
+        education=[EducationEntry(school="X", degree="本科", major="CS", start_year="2014", end_year="2018")],
+        match_score=80,
+    )
+
+
+def test_extract_terms_normalises_aliases_and_mixed_text() -> None:
+    terms = extract_terms(JD)
+    assert {"Go", "Python", "Kubernetes", "微服务", "分库分表", "Spring Boot"} <= set(terms)
+    # 词典命中的片段不再拆成英文弱候选
+    assert "boot" not in terms and "golang/python" not in terms
+
+
+def test_match_keywords_reports_coverage_and_fabricated_skills() -> None:
+    resume = _resume(["Go", "Python", "Kubernetes", "Rust"], ["Redis 缓存与 Kafka 削峰支撑高并发"])
+    report = match_keywords(JD, resume, THOUGHTS)
+    assert "Spring Boot" in report.missing and "MySQL" in report.missing
+    assert "MySQL" in report.missing_in_thoughts and "Spring Boot" not in report.missing_in_thoughts
+    assert report.unsupported_skills == ["Rust"]
+    assert not report.confident and report.to_critique().needs_revision
+
+
+def test_confident_local_match_skips_llm_critique_and_gaps_reach_refine(tmp_path) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    prompts: list[str] = []
+    covered = _resume(
+        ["Go", "Python", "Kubernetes", "Redis", "Kafka", "MySQL"],
+        ["微服务改造：Redis + Kafka 扛住高并发，MySQL 分库分表，Spring Boot 网关"],
+    )
+
+    def fn(messages, info):
+        prompts.append(messages[-1].parts[-1].content)
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, {"operations": [], "match_score": 80})])
+
+    model = FunctionModel(fn)
+    ws = ResumeWorkspace(jd_text=JD, raw_thoughts=THOUGHTS + " Spring Boot", draft=covered)
+    asyncio.run(run_critique(ws, model, ResumePrompts(), lambda m, c: None))
+    assert prompts == [] and ws.critique is not None and not ws.critique.needs_revision
+
+    ws = ResumeWorkspace(jd_text=JD, raw_thoughts=THOUGHTS, draft=_resume(["Go"], ["订单服务"]))
+    ws.keywords = match_keywords(JD, ws.draft, THOUGHTS)
+    ws.critique = ws.keywords.to_critique()
+    asyncio.run(run_refine(ws, model, ResumePrompts(), lambda m, c: None))
+    assert "【本地关键词比对】" in prompts[-1] and "MySQL" in prompts[-1]
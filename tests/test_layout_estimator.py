@@ -0,0 +1,72 @@
+"""layout_estimator 模块单元测试"""
+
+import asyncio
+
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.models import LayoutStatus
+from resume_agent.tools import layout_estimator
+from resume_agent.tools.layout_estimator import (
+    LayoutEstimate,
+    LayoutReport,
+    check_resume_layout,
+    estimate_inner_raw,
+    fit_calibration,
+    load_profiles,
+    text_width_em,
+)
+
+
+def test_cjk_wider_than_latin() -> None:
+    """同字符数下中文应比英文宽"""
+    assert text_width_em("简历生成工具") > text_width_em("resume")
+
+
+def test_more_bullets_estimate_taller() -> None:
+    """每个模板：追加 bullet 后估算高度上升"""
+    resume = synthetic_resumes(1, seed=3)[0]
+    longer = resume.model_copy(deep=True)
+    longer.experience[0].optimized_bullets.extend(["补充一条较长的项目描述，覆盖 Redis 缓存与 Kafka 异步链路。"] * 3)
+    for profile in load_profiles().values():
+        assert estimate_inner_raw(longer, profile) > estimate_inner_raw(resume, profile)
+
+
+def test_fit_calibration_recovers_linear_map() -> None:
+    """测得值为估算值的线性变换时，拟合应还原系数且残差为 0"""
+    raw = [400.0, 650.0, 900.0, 1200.0]
+    cal = fit_calibration(raw, [1.1 * x - 30 for x in raw])
+    assert cal["scale"] == 1.1 and cal["offset"] == -30
+    assert cal["max_abs_err_px"] == 0 and cal["margin_px"] == 8
+
+
+def test_decisive_only_away_from_thresholds() -> None:
+    """远离阈值可定论；落在余量内需实测"""
+    assert LayoutEstimate(1123, 500, margin_px=20).is_decisive()
+    assert LayoutEstimate(1900, 1824, margin_px=20).is_decisive()
+    assert not LayoutEstimate(1123, 930, margin_px=20).is_decisive()
+    assert not LayoutEstimate(1123, 500, margin_px=float("inf")).is_decisive()
+
+
+def test_only_calibrated_templates_skip_chromium(monkeypatch) -> None:
+    """标定后明显过短 / 明显溢出直接由估算定论；未标定（误差未知）一律交给 Chromium 实测"""
+    measured: list[str] = []
+
+    async def inspect(html, *, pdf_on=()):
+        measured.append(html)
+        return LayoutReport(LayoutStatus.PERFECT, "", 1123, 900)
+
+    monkeypatch.setattr(layout_estimator, "inspect_html_layout", inspect)
+    identity = {"scale": 1.0, "offset": 0.0, "margin_px": 60.0}
+    resume = synthetic_resumes(1, seed=3)[0]
+    first = resume.experience[0]
+    short = resume.model_copy(
+        update={"experience": [first.model_copy(update={"optimized_bullets": first.optimized_bullets[:1]})]}
+    )
+    overlong = resume.model_copy(update={"experience": resume.experience * 4})
+    for cal in (identity, None):
+        profiles = {name: {**p, "calibration": cal} for name, p in load_profiles().items()}
+        monkeypatch.setattr(layout_estimator, "load_profiles", lambda: profiles)
+        for name in profiles:
+            for sample, expected in ((short, LayoutStatus.UNDERFLOW), (overlong, LayoutStatus.OVERFLOW)):
+                report = asyncio.run(check_resume_layout(sample, name, "<html></html>"))
+                assert report.status == (expected if cal else LayoutStatus.PERFECT)
+        assert len(measured) == (0 if cal else 2 * len(profiles))
@@ -0,0 +1,115 @@
+"""layout_fitter 模块单元测试（以 bullet 条数为高度的假判定器代替浏览器）"""
+
+import asyncio
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent import orchestrator
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.models import EducationEntry, LayoutStatus, Resume, WorkProject
+from resume_agent.tools import critique as critique_tool
+from resume_agent.tools import layout_fitter
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.tools.layout_validator import LayoutReport
+
+
+def _resume(bullets: list[list[str]]) -> Resume:
+    return Resume(
+        name="张三",
+        title="后端工程师",
+        contact={},
+        summary="s",
+        skills=["Python", "Redis", "Kafka", "Go", "MySQL", "Docker", "K8s", "gRPC"],
+        experience=[
+            WorkProject(
+                project_name=f"P{i}",
+                role="dev",
+                optimized_bullets=b,
+                matched_skills=["Redis"],
+            )
+            for i, b in enumerate(bullets)
+        ],
+        education=[
+            EducationEntry(school="X", degree="本科", major="CS", start_year="2014", end_year="2018")
+        ],
+        match_score=80,
+    )
+
+
+def _fake_oracle(monkeypatch, perfect: range) -> None:
+    """bullet 总数落在 perfect 区间为 PERFECT，多则溢出、少则留白"""
+
+    async def check(resume, template_name, html_content, *, pdf_on=()):
+        n = sum(len(p.optimized_bullets) for p in resume.experience)
+        if n in perfect:
+            status = LayoutStatus.PERFECT
+        else:
+            status = LayoutStatus.OVERFLOW if n > perfect.stop - 1 else LayoutStatus.UNDERFLOW
+        return LayoutReport(status, "", 0, 0)
+
+    monkeypatch.setattr(layout_fitter, "check_resume_layout", check)
+
+
+def test_overflow_drops_lowest_value_bullets(monkeypatch) -> None:
+    _fake_oracle(monkeypatch, range(4, 6))
+    resume = _resume([["Redis 缓存 QPS 提升 30%", "写文档", "开会"], ["Kafka 延迟降低 50%", "日常维护", "杂项"]])
+    fit = asyncio.run(layout_fitter.fit_resume_layout(resume, "swiss_single_column.html"))
+    assert fit is not None and fit.bullets_after == 5
+    assert fit.report.status == LayoutStatus.PERFECT and "Kafka 延迟降低 50%" in fit.html
+    kept = [b for p in fit.resume.experience for b in p.optimized_bullets]
+    assert "Redis 缓存 QPS 提升 30%" in kept and "Kafka 延迟降低 50%" in kept
+    # 原有阅读顺序保持不变
+    assert fit.resume.experience[0].optimized_bullets[0] == "Redis 缓存 QPS 提升 30%"
+
+
+def test_underflow_restores_bullets_from_history(monkeypatch) -> None:
+    _fake_oracle(monkeypatch, range(4, 6))
+    current = _resume([["a1"], ["b1", "b2"]])
+    earlier = _resume([["a1", "a2 提升 20%"], ["b1", "b2", "b3"]])
+    fit = asyncio.run(layout_fitter.fit_resume_layout(current, "swiss_single_column.html", history=[earlier]))
+    assert fit is not None
+    assert fit.resume.experience[0].optimized_bullets == ["a1", "a2 提升 20%"]
+
+
+def test_returns_none_when_cannot_converge(monkeypatch) -> None:
+    _fake_oracle(monkeypatch, range(10, 12))
+    assert asyncio.run(layout_fitter.fit_resume_layout(_resume([["a"], ["b"]]), "swiss_single_column.html")) is None
+
+
+def test_pipeline_stops_on_fitted_report_without_remeasuring(tmp_path, monkeypatch) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    resume = synthetic_resumes(1)[0]
+    checks: list[str] = []
+
+    def fn(messages, info):
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            args = {"critique": "ok", "missing_keywords": [], "score": 95, "needs_revision": False}
+        else:
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    class _Pool:
+        async def warm_up(self) -> None:
+            pass
+
+    async def check(workspace, *, pdf_on=()):
+        checks.append("layout")
+        return "<html>overflow</html>", LayoutReport(LayoutStatus.OVERFLOW, "溢出", 1300, 1200)
+
+    async def fit(workspace, status, layout_status):
+        return "<html>fitted</html>", LayoutReport(LayoutStatus.PERFECT, "刚好一页", 1123, 1000)
+
+    monkeypatch.setattr(orchestrator, "get_browser_pool", lambda: _Pool())
+    monkeypatch.setattr(orchestrator, "check_workspace_layout", check)
+    monkeypatch.setattr(critique_tool, "check_workspace_layout", check)
+    monkeypatch.setattr(orchestrator, "run_fit_layout", fit)
+    build = asyncio.run(
+        orchestrator.build_resume_artifacts_async(
+            "JD", resume.model_dump_json(), "fake", ResumePrompts(), model=FunctionModel(fn), export_pdf=False
+        )
+    )
+    assert checks == ["layout"] and build.layout_status == LayoutStatus.PERFECT
+    assert build.html == "<html>fitted</html>"
@@ -0,0 +1,45 @@
+"""模型客户端与子 Agent 注册表单元测试"""
+
+import asyncio
+
+from pydantic_ai.models.test import TestModel
+
+from resume_agent import model_factory
+from resume_agent.model_factory import ModelRegistry
+from resume_agent.models import Resume, ResumeCritique
+
+
+def test_chat_model_shared_within_loop_and_rebuilt_per_loop(monkeypatch) -> None:
+    """同一事件循环内复用同一模型 / 连接池；新循环重建，旧循环条目被丢弃；aclose 清空"""
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", "http://127.0.0.1:9/v1")
+    registry = ModelRegistry()
+
+    async def _pair():
+        return registry.chat_model("m"), registry.chat_model("m"), registry.chat_model("other")
+
+    a, b, other = asyncio.run(_pair())
+    assert a is b and other is not a
+    c, _, _ = asyncio.run(_pair())
+    assert c is not a
+    assert registry.stats()["clients"] == 1
+
+    async def _close() -> None:
+        registry.chat_model("m")
+        await registry.aclose()
+
+    asyncio.run(_close())
+    assert registry.stats() == {"clients": 0, "models": 0, "sub_agents": 0}
+
+
+def test_sub_agents_cached_per_model_output_and_instructions(monkeypatch) -> None:
+    monkeypatch.setattr(model_factory, "MAX_SUB_AGENTS", 2)
+    registry = ModelRegistry()
+    model = TestModel()
+    draft = registry.sub_agent(model, Resume, "v1")
+    assert registry.sub_agent(model, Resume, "v1") is draft
+    assert registry.sub_agent(model, Resume, "v2") is not draft
+    registry.sub_agent(model, ResumeCritique, "v2")
+    # LRU 上限 2：最久未用的 (Resume, v1) 被淘汰
+    assert registry.stats()["sub_agents"] == 2
+    assert registry.sub_agent(model, Resume, "v1") is not draft
@@ -0,0 +1,97 @@
+"""精修补丁：确定性应用、校验与整份重写回退"""
+
+import asyncio
+
+import pytest
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from resume_agent.context import ResumeWorkspace
+from resume_agent.models import (
+    EducationEntry,
+    PatchOp,
+    PatchOperation,
+    Resume,
+    ResumeCritique,
+    ResumePatch,
+    WorkProject,
+)
+from resume_agent.patching import PatchError, apply_patch
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.steps import run_refine
+
+THOUGHTS = "做过订单系统重构（Redis 缓存）和 GIS 围栏平台，用 Python、Go。"
+
+
+def _resume() -> Resume:
+    return Resume(
+        name="张三",
+        title="后端工程师",
+        contact={},
+        summary="旧总结",
+        skills=["Python", "Go", "Redis", "Rust"],
+        experience=[
+            WorkProject(project_name="订单系统", role="dev", optimized_bullets=["a0", "a1", "a2"], matched_skills=[]),
+            WorkProject(project_name="围栏", role="dev", optimized_bullets=["b0"], matched_skills=[]),
+            WorkProject(project_name="虚构项目", role="dev", optimized_bullets=["c0"], matched_skills=[]),
+        ],
+        education=[EducationEntry(school="X", degree="本科", major="CS", start_year="2014", end_year="2018")],
+        match_score=80,
+    )
+
+
+def _op(op: PatchOp, **kw) -> PatchOperation:
+    return PatchOperation(op=op, **kw)
+
+
+def test_apply_patch_uses_original_indices() -> None:
+    patch = ResumePatch(
+        operations=[
+            _op(PatchOp.DROP_BULLET, project_index=0, bullet_index=0),
+            _op(PatchOp.REPLACE_BULLET, project_index=0, bullet_index=2, text="A2"),
+            _op(PatchOp.ADD_BULLET, project_index=1, text="b1"),
+            _op(PatchOp.DROP_PROJECT, project_index=2),
+            _op(PatchOp.RENAME_PROJECT, project_index=1, text="GIS 围栏平台"),
+            _op(PatchOp.EDIT_SUMMARY, text="新总结"),
+            _op(PatchOp.REORDER_SKILLS, skills=["redis", "Python", "Go"]),
+        ],
+        match_score=83,
+    )
+    out = apply_patch(_resume(), patch, THOUGHTS)
+    assert [p.optimized_bullets for p in out.experience] == [["a1", "A2"], ["b0", "b1"]]
+    assert out.experience[1].project_name == "GIS 围栏平台"
+    assert (out.summary, out.skills, out.match_score) == ("新总结", ["Redis", "Python", "Go"], 83)
+    assert out.education == _resume().education
+
+
+@pytest.mark.parametrize(
+    "op",
+    [
+        _op(PatchOp.RENAME_PROJECT, project_index=2, text="区块链交易所"),
+        _op(PatchOp.REORDER_SKILLS, skills=["Python", "Kubernetes"]),
+        _op(PatchOp.REPLACE_BULLET, project_index=0, bullet_index=9, text="x"),
+        _op(PatchOp.DROP_BULLET, project_index=1, bullet_index=0),
+        _op(PatchOp.ADD_BULLET, project_index=5, text="x"),
+    ],
+)
+def test_apply_patch_rejects_invalid_operations(op: PatchOperation) -> None:
+    with pytest.raises(PatchError):
+        apply_patch(_resume(), ResumePatch(operations=[op], match_score=80), THOUGHTS)
+
+
+def test_refine_falls_back_to_full_rewrite_when_patch_is_invalid(tmp_path) -> None:
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    rewritten = _resume().model_copy(update={"summary": "整份重写"})
+    bad = ResumePatch(operations=[_op(PatchOp.RENAME_PROJECT, project_index=0, text="不存在")], match_score=90)
+
+    def fn(messages, info):
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        args = bad.model_dump() if "operations" in props else rewritten.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    ws = ResumeWorkspace(jd_text="JD", raw_thoughts=THOUGHTS, draft=_resume())
+    ws.critique = ResumeCritique(critique="c", missing_keywords=[], score=70, needs_revision=True)
+    asyncio.run(run_refine(ws, FunctionModel(fn), ResumePrompts(), lambda m, c: None))
+    assert ws.draft is not None and ws.draft.summary == "整份重写"
+    assert set(ws.tokens) == {"refine", "refine_full"}
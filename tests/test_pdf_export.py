@@ -0,0 +1,53 @@
+"""批量 PDF 导出：导出清单与进程内并发落盘"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.pdf_export import export_async, plan_exports
+
+
+class _Page:
+    def __init__(self) -> None:
+        self.html = ""
+
+    async def set_content(self, html, wait_until=None):
+        self.html = html
+
+    async def evaluate(self, expr):
+        return 1000
+
+    async def pdf(self, path=None, **kw):
+        data = b"%PDF" + self.html[:8].encode()
+        with open(path, "wb") as f:
+            f.write(data)
+        return data
+
+
+class _Pool:
+    @asynccontextmanager
+    async def page(self):
+        yield _Page()
+
+
+def test_plan_and_export_html_and_json_inputs(tmp_path) -> None:
+    src = tmp_path / "batch"
+    src.mkdir()
+    (src / "a.html").write_text("<html>a</html>", encoding="utf-8")
+    (src / "a.json").write_text(synthetic_resumes(1)[0].model_dump_json(), encoding="utf-8")
+    (src / "b.json").write_text("{}", encoding="utf-8")
+    (src / "manifest.json").write_text("{}", encoding="utf-8")
+    out = tmp_path / "pdf"
+    out.mkdir()
+
+    items = plan_exports([str(src)], str(out), "swiss_single_column,modern_two_column")
+    assert sorted(i.output.rsplit("/", 1)[1] for i in items) == [
+        "a.modern_two_column.pdf", "a.pdf", "a.swiss_single_column.pdf",
+        "b.modern_two_column.pdf", "b.swiss_single_column.pdf",
+    ]
+    done = []
+    results = asyncio.run(export_async(items, _Pool(), done.append))
+    assert len(done) == len(items) == len(results)
+    assert sorted(r.source.rsplit("/", 1)[1] for r in results if not r.ok) == ["b.json", "b.json"]
+    assert (out / "a.pdf").read_bytes() == b"%PDF<html>a<"
+    assert (out / "a.swiss_single_column.pdf").stat().st_size > 4
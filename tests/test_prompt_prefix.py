@@ -0,0 +1,85 @@
+"""各步骤请求共用前缀与 token 记账"""
+
+import asyncio
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+from pydantic_ai.usage import RunUsage
+
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.context import ResumeWorkspace
+from resume_agent.models import LayoutStatus
+from resume_agent.resilience import CallPolicy, _latencies, set_call_policy
+from resume_agent.resume_prompts import ResumePrompts
+from resume_agent.step_cache import StepCache, set_step_cache
+from resume_agent.steps import run_critique, run_draft, run_refine, run_refine_layout
+from resume_agent.token_usage import StepTokens
+
+
+def test_all_steps_share_prompt_prefix(tmp_path) -> None:
+    """instructions + 思绪 + JD 在 draft / critique / refine / refine_layout 间逐字节一致"""
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    resume = synthetic_resumes(1)[0]
+    seen: list[tuple[str, str]] = []
+
+    def fn(messages, info):
+        request = messages[-1]
+        seen.append((request.instructions, request.parts[-1].content))
+        props = info.output_tools[0].parameters_json_schema["properties"]
+        if "critique" in props:
+            args = {"critique": "ok", "missing_keywords": [], "score": 70, "needs_revision": True}
+        elif "operations" in props:
+            args = {"operations": [], "match_score": 70}
+        else:
+            args = resume.model_dump()
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    ws = ResumeWorkspace(jd_text="JD 正文", raw_thoughts="我的思绪")
+    model, prompts = FunctionModel(fn), ResumePrompts()
+    quiet = lambda m, c: None  # noqa: E731
+
+    async def main() -> None:
+        await run_draft(ws, model, prompts, quiet)
+        await run_critique(ws, model, prompts, quiet)
+        await run_refine(ws, model, prompts, quiet)
+        await run_refine_layout(ws, model, prompts, quiet, LayoutStatus.OVERFLOW, "太长")
+
+    asyncio.run(main())
+    assert len(seen) == 4
+    assert len({instructions for instructions, _ in seen}) == 1
+    prefix = seen[0][1][: seen[0][1].index("【本步任务】")]
+    assert "我的思绪" in prefix and "JD 正文" in prefix
+    assert all(prompt.startswith(prefix) for _, prompt in seen)
+    assert set(ws.tokens) == {"draft", "critique", "refine", "refine_layout"}
+    assert all(t.requests == 1 and t.input_tokens > 0 for t in ws.tokens.values())
+
+
+def test_cached_tokens_fall_back_to_provider_details() -> None:
+    t = StepTokens()
+    t.add(RunUsage(input_tokens=100, output_tokens=10, requests=1, details={"prompt_cache_hit_tokens": 60}))
+    t.add(RunUsage(input_tokens=100, output_tokens=10, requests=1, cache_read_tokens=80))
+    assert (t.input_tokens, t.cached_tokens, t.output_tokens) == (200, 140, 20)
+    assert t.cache_hit_ratio == 0.7
+
+
+def test_losing_hedge_attempt_is_charged(tmp_path) -> None:
+    """对冲落败被取消的那一路也计入该步骤用量与 CallStats.discarded_tokens"""
+    set_step_cache(StepCache(str(tmp_path), enabled=False))
+    set_call_policy(CallPolicy(timeout_s=5, hedge=True, hedge_min_samples=1))
+    _latencies.record("critique", 0.01)
+    calls = {"n": 0}
+
+    async def fn(messages, info):
+        calls["n"] += 1
+        await asyncio.sleep(1.0 if calls["n"] == 1 else 0)
+        args = {"critique": "ok", "missing_keywords": [], "score": 70, "needs_revision": False}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+
+    ws = ResumeWorkspace(jd_text="JD 正文", raw_thoughts="我的思绪", draft=synthetic_resumes(1)[0])
+    try:
+        asyncio.run(run_critique(ws, FunctionModel(fn), ResumePrompts(), lambda m, c: None))
+    finally:
+        set_call_policy(None)
+    winner_input = ws.tokens["critique"].input_tokens // 2
+    assert ws.llm_stats.hedges == 1 and ws.tokens["critique"].requests == 2
+    assert ws.llm_stats.discarded_tokens == winner_input > 0
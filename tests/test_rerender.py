@@ -0,0 +1,41 @@
+"""仅重渲染：保存的 Resume JSON 直接出多模板 HTML/PDF，不经 LLM"""
+
+import asyncio
+
+import pytest
+
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.models import LayoutStatus
+from resume_agent.rerender import rerender_many_async, resolve_templates
+from resume_agent.template_registry import get_template_registry
+from resume_agent.tools import layout_estimator
+from resume_agent.tools.layout_validator import LayoutReport
+
+
+def test_resolve_templates() -> None:
+    names = get_template_registry().names()
+    assert resolve_templates("all") == names
+    assert resolve_templates(names[0].removesuffix(".html")) == [names[0]]
+    with pytest.raises(ValueError, match="模板不存在"):
+        resolve_templates("nope")
+
+
+def test_rerender_directory_to_every_template(tmp_path, monkeypatch) -> None:
+    async def inspect(html, *, pdf_on=()):
+        return LayoutReport(LayoutStatus.PERFECT, "ok", 1100, 1000, b"%PDF" if LayoutStatus.PERFECT in pdf_on else None)
+
+    monkeypatch.setattr(layout_estimator, "inspect_html_layout", inspect)
+    src = tmp_path / "saved"
+    src.mkdir()
+    for i, resume in enumerate(synthetic_resumes(2)):
+        (src / f"job{i}.json").write_text(resume.model_dump_json(), encoding="utf-8")
+    (src / "manifest.json").write_text("{}", encoding="utf-8")
+    (src / "broken.json").write_text('{"name": 1}', encoding="utf-8")
+
+    out = tmp_path / "out"
+    results = asyncio.run(rerender_many_async(str(src), str(out), "all"))
+    names = get_template_registry().names()
+    ok = [r for r in results if r.error is None]
+    assert len(ok) == 2 * len(names) and [r.source for r in results if r.error] == [str(src / "broken.json")]
+    tpl = names[0].removesuffix(".html")
+    assert (out / f"job0.{tpl}.html").exists() and (out / f"job0.{tpl}.pdf").read_bytes() == b"%PDF"
@@ -0,0 +1,84 @@
+"""LLM 调用韧性策略单元测试：重试、对冲、整单截止"""
+
+import asyncio
+import time
+
+import pytest
+from pydantic_ai.exceptions import ModelHTTPError, UnexpectedModelBehavior
+
+from resume_agent.resilience import (
+    CallPolicy,
+    CallStats,
+    DeadlineExceeded,
+    _latencies,
+    call_with_policy,
+    is_retryable,
+)
+
+_FAST = CallPolicy(timeout_s=5, max_retries=2, backoff_base_s=0, backoff_max_s=0)
+
+
+def test_retries_transient_errors_but_not_others() -> None:
+    stats = CallStats()
+    calls = {"n": 0}
+
+    async def flaky() -> str:
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    async def broken() -> str:
+        raise ValueError("bad prompt")
+
+    assert asyncio.run(call_with_policy("t-retry", flaky, stats, policy=_FAST)) == "ok"
+    assert stats.retries == 2
+    with pytest.raises(ValueError):
+        asyncio.run(call_with_policy("t-retry", broken, stats, policy=_FAST))
+    assert stats.retries == 2
+
+
+def test_only_transient_statuses_are_retryable() -> None:
+    """408 / 429 / 5xx 与传输错误重试；409、其余 4xx 与模型输出不合格不重试"""
+    for status in (408, 429, 500, 503):
+        assert is_retryable(ModelHTTPError(status, "m"))
+    for status in (400, 401, 409, 422):
+        assert not is_retryable(ModelHTTPError(status, "m"))
+    assert is_retryable(TimeoutError()) and is_retryable(ConnectionResetError())
+    assert not is_retryable(UnexpectedModelBehavior("bad output"))
+    assert not is_retryable(DeadlineExceeded())
+
+
+def test_hedge_fires_after_p90_and_takes_first_result() -> None:
+    """样本足够后，慢于历史 p90 的调用会再发一路，先返回者胜出"""
+    for _ in range(10):
+        _latencies.record("t-hedge", 0.01)
+    stats = CallStats()
+    calls = {"n": 0}
+
+    async def slow_first() -> int:
+        calls["n"] += 1
+        n = calls["n"]
+        await asyncio.sleep(1.0 if n == 1 else 0.01)
+        return n
+
+    policy = CallPolicy(timeout_s=5, hedge=True, hedge_min_samples=5)
+    started = time.perf_counter()
+    assert asyncio.run(call_with_policy("t-hedge", slow_first, stats, policy=policy)) == 2
+    assert time.perf_counter() - started < 0.5
+    assert (stats.hedges, stats.hedge_wins) == (1, 1)
+
+
+def test_deadline_bounds_attempts() -> None:
+    stats = CallStats()
+
+    async def hang() -> None:
+        await asyncio.sleep(10)
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(
+            call_with_policy("t-deadline", hang, stats, deadline_at=time.monotonic() + 0.1, policy=_FAST)
+        )
+    assert time.perf_counter() - started < 1
+    assert stats.timeouts == 1 and stats.deadline_hits == 1
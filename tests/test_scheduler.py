@@ -0,0 +1,45 @@
+"""scheduler 模块单元测试"""
+
+import asyncio
+
+from resume_agent.scheduler import StepGraph
+
+
+def test_dependencies_and_parallel_savings() -> None:
+    """依赖完成后才开跑；互不依赖的步骤并行，墙钟小于串行合计"""
+    order: list[str] = []
+
+    async def step(name: str, delay: float) -> str:
+        order.append(f"{name}:start")
+        await asyncio.sleep(delay)
+        order.append(f"{name}:end")
+        return name
+
+    async def main() -> tuple[float, float]:
+        graph = StepGraph()
+        graph.add("draft", lambda: step("draft", 0.02))
+        graph.add("layout", lambda: step("layout", 0.05), after=["draft"], speculative=True)
+        critique = graph.add("critique", lambda: step("critique", 0.05), after=["draft"])
+        assert await graph.result(critique) == "critique"
+        await graph.result("layout")
+        return graph.summary()
+
+    serial, wall = asyncio.run(main())
+    assert order[:2] == ["draft:start", "draft:end"]
+    assert serial - wall > 0.03
+
+
+def test_cancel_speculative_and_unique_names() -> None:
+    async def main() -> StepGraph:
+        graph = StepGraph()
+        graph.add("layout", lambda: asyncio.sleep(10), speculative=True)
+        second = await graph.run("layout", lambda: asyncio.sleep(0, "ok"))
+        assert second == "ok"
+        assert graph.cancel_speculative() == 1
+        await graph.aclose()
+        return graph
+
+    graph = asyncio.run(main())
+    assert graph.timings["layout"].state == "cancelled"
+    assert graph.timings["layout#2"].state == "done"
+    assert "layout✗" in graph.report()
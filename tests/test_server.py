@@ -0,0 +1,90 @@
+"""任务服务 HTTP 层单元测试（不启动 worker，不调用模型）"""
+
+import asyncio
+import json
+
+from resume_agent.httpd import MAX_HEADER_LINES, serve_connection
+from resume_agent.server import JobService
+
+
+async def _call(port: int, method: str, path: str, payload: dict | None = None) -> tuple[int, dict, dict]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: x\r\nConnection: close\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    raw = await reader.read()
+    writer.close()
+    head, _, data = raw.partition(b"\r\n\r\n")
+    lines = head.decode().split("\r\n")
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return int(lines[0].split()[1]), headers, json.loads(data)
+
+
+def test_bounded_queue_backpressure_and_job_endpoints() -> None:
+    """队列满返回 429 + Retry-After；未完成任务取结果 409；未知任务 404；metrics 反映队列深度"""
+    service = JobService(queue_size=1, default_thoughts="思绪")
+
+    async def _run() -> None:
+        server = await asyncio.start_server(
+            lambda r, w: serve_connection(r, w, service.handle), "127.0.0.1", 0
+        )
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            status, _, job = await _call(port, "POST", "/jobs", {"jd": "后端工程师"})
+            assert status == 202 and job["status"] == "queued"
+            status, headers, _ = await _call(port, "POST", "/jobs", {"jd": "另一份"})
+            assert status == 429 and int(headers["Retry-After"]) >= 1
+            assert (await _call(port, "POST", "/jobs", {"thoughts": "x"}))[0] == 400
+            assert (await _call(port, "POST", "/jobs", {"jd": "x", "pdf": "false"}))[0] == 400
+            assert (await _call(port, "GET", f"/jobs/{job['id']}"))[2]["status"] == "queued"
+            assert (await _call(port, "GET", f"/jobs/{job['id']}/result"))[0] == 409
+            assert (await _call(port, "GET", "/jobs/nope"))[0] == 404
+            metrics = (await _call(port, "GET", "/metrics"))[2]
+            assert metrics["queue"] == {"depth": 1, "capacity": 1}
+            assert metrics["jobs"]["rejected"] == 1
+        await service.close()
+        assert service.get(job["id"]).status == "cancelled"
+
+    asyncio.run(_run())
+
+
+def test_unhandled_handler_error_returns_500_and_closes() -> None:
+    async def boom(request, writer):
+        raise RuntimeError("chromium crashed")
+
+    async def _run() -> None:
+        server = await asyncio.start_server(lambda r, w: serve_connection(r, w, boom), "127.0.0.1", 0)
+        async with server:
+            status, headers, body = await _call(server.sockets[0].getsockname()[1], "GET", "/jobs/x/result")
+        assert status == 500 and headers["Connection"] == "close"
+        assert body == {"error": "RuntimeError: chromium crashed"}
+
+    asyncio.run(_run())
+
+
+def test_malformed_requests_get_4xx_instead_of_crashing() -> None:
+    """Content-Length 非数字 / 为负 → 400；请求头行数超限或单行超长 → 431"""
+    async def echo(request, writer):
+        raise AssertionError("不应到达 handler")
+
+    async def _send(port: int, head: bytes) -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"POST /jobs HTTP/1.1\r\n" + head + b"\r\n")
+        raw = await reader.read()
+        writer.close()
+        return int(raw.split(b" ", 2)[1])
+
+    async def _run() -> None:
+        server = await asyncio.start_server(
+            lambda r, w: serve_connection(r, w, echo), "127.0.0.1", 0, limit=1024
+        )
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            assert await _send(port, b"Content-Length: abc\r\n") == 400
+            assert await _send(port, b"Content-Length: -5\r\n") == 400
+            assert await _send(port, b"X-A: b\r\n" * (MAX_HEADER_LINES + 1)) == 431
+            assert await _send(port, b"X-Long: " + b"a" * 2048 + b"\r\n") == 431
+
+    asyncio.run(_run())
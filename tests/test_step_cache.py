@@ -0,0 +1,70 @@
+"""step_cache 模块单元测试"""
+
+import os
+import time
+
+from resume_agent.models import ResumeCritique
+from resume_agent.step_cache import StepCache
+
+
+def _critique(score: int = 80) -> ResumeCritique:
+    return ResumeCritique(critique="ok", missing_keywords=["Go"], score=score, needs_revision=False)
+
+
+def test_key_depends_on_every_input() -> None:
+    """模型、base_url、指令、prompt 任一变化都应换键"""
+    base = ("deepseek-chat", "https://api.deepseek.com", "inst", "prompt", ResumeCritique)
+    key = StepCache.make_key(*base)
+    assert key == StepCache.make_key(*base)
+    for i, alt in enumerate(["other", "http://local", "inst2", "prompt2"]):
+        changed = list(base)
+        changed[i] = alt
+        assert StepCache.make_key(*changed) != key
+
+
+def test_hit_miss_and_bypass(tmp_path) -> None:
+    """写入后命中；关闭缓存时不读不写"""
+    cache = StepCache(str(tmp_path))
+    key = StepCache.make_key("m", None, "i", "p", ResumeCritique)
+    assert cache.get(key, ResumeCritique) is None
+    cache.put(key, _critique())
+    assert cache.get(key, ResumeCritique) == _critique()
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+    off = StepCache(str(tmp_path), enabled=False)
+    assert off.get(key, ResumeCritique) is None
+    assert off.stats() == {"hits": 0, "misses": 0}
+
+
+def test_eviction_by_age_and_count(tmp_path) -> None:
+    """过期条目读时失效；超过条数上限时淘汰最久未用"""
+    cache = StepCache(str(tmp_path), max_entries=2, max_age_s=60)
+    keys = [StepCache.make_key("m", None, "i", str(n), ResumeCritique) for n in range(3)]
+    for n, key in enumerate(keys):
+        cache.put(key, _critique(n))
+        path = cache._path(key)
+        stamp = time.time() - 30 + n
+        os.utime(path, (stamp, stamp))
+    cache.evict()
+    assert cache.get(keys[0], ResumeCritique) is None
+    assert cache.get(keys[2], ResumeCritique) == _critique(2)
+
+    old = time.time() - 120
+    os.utime(cache._path(keys[2]), (old, old))
+    assert cache.get(keys[2], ResumeCritique) is None
+    assert not os.path.exists(cache._path(keys[2]))
+
+
+def test_put_scans_cache_only_when_limits_are_crossed(tmp_path, monkeypatch) -> None:
+    """首次写入扫描一次得出条数，此后增量累计；超过条数上限才再次全量扫描"""
+    cache = StepCache(str(tmp_path), max_entries=3)
+    scans = []
+    entries = cache._entries
+    monkeypatch.setattr(cache, "_entries", lambda: scans.append(1) or entries())
+    keys = [StepCache.make_key("m", None, "i", str(n), ResumeCritique) for n in range(4)]
+    for key in keys[:3]:
+        cache.put(key, _critique())
+    cache.put(keys[0], _critique(1))  # 覆盖已有条目不增加条数
+    assert len(scans) == 1
+    cache.put(keys[3], _critique())
+    assert len(scans) == 2 and len(entries()) == 3
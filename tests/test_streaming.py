@@ -0,0 +1,25 @@
+"""streaming 模块单元测试"""
+
+import json
+
+from pydantic_core import from_json
+
+from resume_agent.bench.samples import synthetic_resumes
+from resume_agent.streaming import partial_resume
+
+
+def test_partial_resume_keeps_only_complete_items() -> None:
+    """截断的 JSON 只保留已写完的项目经历；完整 JSON 还原原对象"""
+    resume = synthetic_resumes(1)[0]
+    text = json.dumps(resume.model_dump(), ensure_ascii=False)
+    cut = text.index(resume.experience[1].project_name) + 2
+    partial = partial_resume(from_json(text[:cut], allow_partial=True))
+    assert partial.name == resume.name
+    assert partial.experience == resume.experience[:1]
+    assert partial.education == []
+    assert partial_resume(from_json(text)) == resume
+
+
+def test_partial_resume_tolerates_empty_prefix() -> None:
+    partial = partial_resume(from_json('{"na', allow_partial=True))
+    assert partial.name == "" and partial.experience == [] and partial.match_score == 0
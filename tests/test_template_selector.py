@@ -0,0 +1,26 @@
+"""template_selector 模块单元测试"""
+
+from resume_agent.models import LayoutStatus
+from resume_agent.tools.layout_validator import LayoutReport
+from resume_agent.tools.template_selector import TemplateFit, pick_template
+
+
+def _fit(name: str, status: LayoutStatus, total: int, inner: int) -> TemplateFit:
+    return TemplateFit(name, "", LayoutReport(status, "", total, inner))
+
+
+def test_prefers_fullest_perfect_template() -> None:
+    fits = [
+        _fit("a", LayoutStatus.OVERFLOW, 1180, 1120),
+        _fit("b", LayoutStatus.PERFECT, 1123, 900),
+        _fit("c", LayoutStatus.PERFECT, 1123, 1000),
+    ]
+    assert pick_template(fits).template_name == "c"
+
+
+def test_falls_back_to_closest_when_none_fit() -> None:
+    fits = [
+        _fit("over", LayoutStatus.OVERFLOW, 1400, 1330),
+        _fit("under", LayoutStatus.UNDERFLOW, 1123, 850),
+    ]
+    assert pick_template(fits).template_name == "under"
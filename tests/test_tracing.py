@@ -0,0 +1,61 @@
+"""tracing 模块单元测试"""
+
+import asyncio
+
+from resume_agent.tracing import Tracer
+
+
+def test_disabled_tracer_records_nothing() -> None:
+    tracer = Tracer()
+    with tracer.span("noop", a=1) as sp:
+        sp.set(b=2)
+    assert tracer.spans == []
+
+
+def test_spans_nest_across_tasks_and_export() -> None:
+    """子任务继承父 span；导出为 Chrome trace 并带 p50/p95 汇总"""
+    tracer = Tracer()
+    tracer.start()
+
+    async def child(i: int) -> None:
+        with tracer.span("child", index=i):
+            await asyncio.sleep(0.01)
+
+    async def main() -> None:
+        with tracer.span("root") as root:
+            await asyncio.gather(*(asyncio.create_task(child(i)) for i in range(3)))
+            root.set(status="PERFECT")
+
+    asyncio.run(main())
+    root = next(s for s in tracer.spans if s.name == "root")
+    children = [s for s in tracer.spans if s.name == "child"]
+    assert len(children) == 3 and all(c.parent_id == root.span_id for c in children)
+    assert root.attrs["status"] == "PERFECT"
+    trace = tracer.to_chrome_trace()
+    complete = [e for e in trace["traceEvents"] if e["ph"] == "X"]
+    assert len(complete) == 4
+    # 并发子任务各占一条泳道
+    assert len({e["tid"] for e in complete if e["name"] == "child"}) == 3
+    assert trace["summary"]["child"]["count"] == 3
+
+
+def test_otel_only_does_not_buffer_spans() -> None:
+    """只开 OTel 导出（未 start）时 span 照常导出，但不留在进程内存里"""
+    ended = []
+
+    class _OtelSpan:
+        def set_attributes(self, attrs) -> None:
+            pass
+
+        def end(self) -> None:
+            ended.append(1)
+
+    class _OtelTracer:
+        def start_span(self, name, context=None):
+            return _OtelSpan()
+
+    tracer = Tracer()
+    tracer._otel_tracer = _OtelTracer()
+    with tracer.span("batch.job"):
+        pass
+    assert ended == [1] and tracer.spans == []